@@ -0,0 +1,91 @@
+"""Benchmark batch search: looping VectorStore.search vs VectorStore.search_batch.
+
+Looping search pays one embedding round-trip and one FAISS call per query;
+search_batch embeds all queries in one call and searches the query matrix in
+one FAISS call. The embedding service is simulated with a fixed per-call
+latency (set --embedding-latency-ms 0 to measure the FAISS side alone).
+
+Usage:
+    python benchmarks/batch_search.py --size 20000 --batch-sizes 1 8 32 128
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import SyntheticEmbedder, generate_metadata, generate_vectors
+from src.rag.vectorstore import VectorStore
+
+
+class RemoteEmbedder(SyntheticEmbedder):
+    """SyntheticEmbedder that sleeps for a fixed round-trip latency per embedding call."""
+
+    def __init__(self, dimension: int, latency_ms: float):
+        super().__init__(dimension)
+        self.latency_s = latency_ms / 1000
+
+    def embed_text(self, text: str) -> List[float]:
+        time.sleep(self.latency_s)
+        return super().embed_text(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency_s)
+        return [SyntheticEmbedder.embed_text(self, text) for text in texts]
+
+
+def main():
+    """Run the batch search benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="Number of vectors in the corpus")
+    parser.add_argument("--dimension", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128], help="Queries per batch")
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0, help="Simulated embedding round-trip")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repetitions per configuration")
+    args = parser.parse_args()
+
+    vectors = generate_vectors(args.size, args.dimension)
+    print(
+        f"Corpus: {args.size} vectors x {args.dimension} dims, k={args.k}, "
+        f"embedding latency {args.embedding_latency_ms:.0f} ms/call\n"
+    )
+    header = f"{'batch':>6} | {'loop q/s':>9} | {'batch q/s':>9} | {'speedup':>7}"
+    print(header)
+    print("-" * len(header))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = VectorStore(
+            vectorstore_path=tmp_dir,
+            embedder=RemoteEmbedder(args.dimension, args.embedding_latency_ms),
+            dimension=args.dimension
+        )
+        store.create_index()
+        store.add_embeddings(vectors, generate_metadata(args.size))
+
+        for batch_size in args.batch_sizes:
+            queries = [f"benchmark query {i}" for i in range(batch_size)]
+            loop_seconds = batch_seconds = float("inf")
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                looped = [store.search(query, k=args.k) for query in queries]
+                loop_seconds = min(loop_seconds, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                batched = store.search_batch(queries, k=args.k)
+                batch_seconds = min(batch_seconds, time.perf_counter() - start)
+
+            assert [[r["id"] for r in results] for results in looped] == \
+                [[r["id"] for r in results] for results in batched], "batch results differ from looped search"
+            print(
+                f"{batch_size:>6} | {batch_size / loop_seconds:>9.1f} | {batch_size / batch_seconds:>9.1f} | "
+                f"{loop_seconds / batch_seconds:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Load test /chat with sync vs async agent nodes on one uvicorn worker.
+
+Starts the API in a single uvicorn worker process per node mode, with the
+OpenAI chat model replaced by a simulated model that answers after a fixed
+latency (blocking on the sync path like an HTTP client, awaiting on the
+async path). Each request runs the supervisor and one agent, i.e. two LLM
+calls. For every concurrency level, that many sessions send their messages
+back to back, and the throughput and latency percentiles are reported. The
+FAQ fast path and answer cache are disabled, so every request runs the
+graph, and session state goes to a temporary database.
+
+Usage:
+    python benchmarks/chat_load.py --concurrency 1 8 32 128 --llm-latency-ms 300
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import latency_summary
+
+NODE_MODES = ("sync", "async")
+
+
+def make_simulated_chat_model(latency_ms: float, route_to: str, answer: str = "Simulated answer."):
+    """Create a chat model that replies after a fixed latency, routing the supervisor to one agent."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    class SimulatedChatModel(BaseChatModel):
+        """Chat model answering after a fixed delay, without network calls."""
+
+        @property
+        def _llm_type(self) -> str:
+            return "simulated"
+
+        def bind_tools(self, tools, **kwargs):
+            return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+        @staticmethod
+        def _reply(tools: Optional[List[Dict[str, Any]]]) -> ChatResult:
+            names = [tool["function"]["name"] for tool in tools or []]
+            if "Router" in names:
+                message = AIMessage(
+                    content="", tool_calls=[{"name": "Router", "args": {"next": route_to}, "id": uuid.uuid4().hex}]
+                )
+            else:
+                message = AIMessage(content=answer)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            time.sleep(latency_ms / 1000)
+            return self._reply(kwargs.get("tools"))
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            await asyncio.sleep(latency_ms / 1000)
+            return self._reply(kwargs.get("tools"))
+
+    return SimulatedChatModel()
+
+
+def serve(args: argparse.Namespace):
+    """Run the API in this process with the simulated chat model (server side of the load test)."""
+    import langchain_openai
+    import uvicorn
+
+    os.environ.setdefault("OPENAI_API_KEY", "simulated")
+    os.environ.setdefault("TAVILY_API_KEY", "simulated")
+    model = make_simulated_chat_model(args.llm_latency_ms, "faq_agent")
+    # Patched before the agents module creates its model
+    langchain_openai.ChatOpenAI = lambda *_, **__: model
+
+    import main
+    from src.graph.chatgrapgh import build_research_graph
+    from src.state import StateDB
+
+    main.state_db = StateDB(db_path=str(Path(args.db_dir) / "state.db"))
+    main.faq_fast_path_enabled = False
+    main.answer_cache_enabled = False
+    main.research_graph = build_research_graph(async_nodes="async" in args.nodes)
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, workers=1, log_level="warning")
+
+
+async def run_level(url: str, concurrency: int, requests_per_session: int, timeout: float) -> Dict[str, Any]:
+    """Run one concurrency level: each session sends its messages back to back."""
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def session(client: httpx.AsyncClient):
+        nonlocal errors
+        session_id = uuid.uuid4().hex
+        for turn in range(requests_per_session):
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    f"{url}/chat", json={"message": f"Question {turn} about my account", "session_id": session_id}
+                )
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(session(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    summary = latency_summary(np.array(latencies or [0.0]))
+    summary.update({
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+    })
+    return summary
+
+
+def wait_for_server(url: str, process: subprocess.Popen, timeout: float = 120.0):
+    """Wait until the API answers its health check."""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"{url}/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("API server did not start")
+
+
+def free_port() -> int:
+    """Pick a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    """Run the chat load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128], help="Concurrent sessions")
+    parser.add_argument("--requests-per-session", type=int, default=3, help="Messages each session sends")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Simulated latency per LLM call")
+    parser.add_argument("--nodes", nargs="+", choices=NODE_MODES, default=list(NODE_MODES), help="Node modes to test")
+    parser.add_argument(
+        "--slo-ms", type=float,
+        help="p99 latency a level must stay under to count as sustained (default: 2x the two LLM calls)"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0, help="Request timeout in seconds")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    slo_ms = args.slo_ms or 2 * 2 * args.llm_latency_ms
+    print(f"Simulated LLM latency {args.llm_latency_ms:.0f} ms/call, {args.requests_per_session} messages/session, "
+          f"sustained = p99 <= {slo_ms:.0f} ms\n")
+    header = f"{'nodes':<6} | {'sessions':>8} | {'req/s':>7} | {'p50 ms':>8} | {'p99 ms':>8} | {'errors':>6}"
+    print(header)
+    print("-" * len(header))
+
+    sustained = {}
+    for nodes in args.nodes:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        with tempfile.TemporaryDirectory() as db_dir:
+            server = subprocess.Popen(
+                [sys.executable, __file__, "--serve", "--nodes", nodes, "--port", str(port), "--db-dir", db_dir,
+                 "--llm-latency-ms", str(args.llm_latency_ms)],
+                cwd=Path(__file__).parent.parent,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            try:
+                wait_for_server(url, server)
+                sustained[nodes] = 0
+                for concurrency in args.concurrency:
+                    row = asyncio.run(run_level(url, concurrency, args.requests_per_session, args.timeout))
+                    print(
+                        f"{nodes:<6} | {concurrency:>8} | {row['requests_per_second']:>7.1f} | "
+                        f"{row['p50_ms']:>8.0f} | {row['p99_ms']:>8.0f} | {row['errors']:>6}"
+                    )
+                    if row["errors"] == 0 and row["p99_ms"] <= slo_ms:
+                        sustained[nodes] = concurrency
+            finally:
+                server.terminate()
+                server.wait()
+        print("-" * len(header))
+
+    for nodes, concurrency in sustained.items():
+        print(f"{nodes} nodes: sustained up to {concurrency} concurrent sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark vector store cold start: eager loading vs memory-mapped loading.
+
+Builds a synthetic vector store, then starts several worker processes at
+once for each load mode. Every worker loads the store, runs one filtered
+query and reports its load time and resident memory, split into private
+(anonymous) pages and file-backed pages that the OS page cache shares
+between workers.
+
+Usage:
+    python benchmarks/cold_start.py --size 100000 --workers 4
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import (
+    SyntheticEmbedder,
+    generate_metadata,
+    generate_queries,
+    generate_vectors,
+    read_rss_kb,
+)
+from src.rag.vectorstore import VectorStore
+
+
+def run_worker(store_path: str, dimension: int, mode: str) -> Dict[str, Any]:
+    """Load the store in this process and measure load time, first query time and memory."""
+    baseline = read_rss_kb()
+    store = VectorStore(vectorstore_path=store_path, embedder=SyntheticEmbedder(dimension), dimension=dimension)
+
+    start = time.perf_counter()
+    store.load(mmap=(mode == "mmap"))
+    load_ms = (time.perf_counter() - start) * 1000
+
+    query = np.asarray(store.vectors[:1], dtype='float32')
+    start = time.perf_counter()
+    store.search_by_vector(query, k=5, document_type="market_analysis")
+    first_query_ms = (time.perf_counter() - start) * 1000
+
+    rss = read_rss_kb()
+    return {
+        "load_ms": load_ms,
+        "first_query_ms": first_query_ms,
+        "rss_anon_mb": (rss["RssAnon"] - baseline["RssAnon"]) / 1024,
+        "rss_file_mb": (rss["RssFile"] - baseline["RssFile"]) / 1024,
+    }
+
+
+def main():
+    """Run the cold start benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000, help="Number of vectors in the store")
+    parser.add_argument("--dimension", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent worker processes per mode")
+    parser.add_argument("--worker", nargs=2, metavar=("STORE_PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker[0], args.dimension, args.worker[1])))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"Building store: {args.size} vectors x {args.dimension} dims...")
+        store = VectorStore(vectorstore_path=tmp_dir, embedder=SyntheticEmbedder(args.dimension), dimension=args.dimension)
+        store.create_index(n_vectors=args.size)
+        store.add_embeddings(generate_vectors(args.size, args.dimension), generate_metadata(args.size))
+        store.save()
+        del store
+
+        header = f"{'mode':<6} | {'load ms':>9} | {'1st query ms':>12} | {'private MB':>10} | {'shared MB':>9}"
+        print(f"\n{args.workers} concurrent workers per mode (mean per worker)\n")
+        print(header)
+        print("-" * len(header))
+        for mode in ("eager", "mmap"):
+            command = [sys.executable, __file__, "--dimension", str(args.dimension), "--worker", tmp_dir, mode]
+            workers = [subprocess.Popen(command, stdout=subprocess.PIPE, text=True) for _ in range(args.workers)]
+            results = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+            mean = {key: float(np.mean([r[key] for r in results])) for key in results[0]}
+            print(
+                f"{mode:<6} | {mean['load_ms']:>9.1f} | {mean['first_query_ms']:>12.2f} | "
+                f"{mean['rss_anon_mb']:>10.1f} | {mean['rss_file_mb']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
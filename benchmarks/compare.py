@@ -0,0 +1,120 @@
+"""Compare two retrieval benchmark result files and flag regressions.
+
+Matches result rows of two retrieval_suite.py JSON files by configuration and
+reports the relative change of the tracked metrics. Latency, build time, size
+and memory regress when they grow, recall and throughput when they shrink.
+Exits with status 1 if any metric regressed by more than the threshold, so it
+can gate CI.
+
+Usage:
+    python benchmarks/compare.py benchmarks/results/base.json benchmarks/results/new.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# (metric path, True if higher is better)
+INDEX_METRICS = [
+    ("build.seconds", False),
+    ("build.index_bytes", False),
+    ("build.rss_anon_mb", False),
+    ("single.p50_ms", False),
+    ("single.p99_ms", False),
+    ("single.recall_at_k", True),
+    ("batch.p50_ms", False),
+    ("batch.queries_per_second", True),
+    ("filtered.p50_ms", False),
+    ("filtered.recall_at_k", True),
+]
+RETRIEVER_METRICS = [("p50_ms", False), ("p99_ms", False)]
+
+
+def row_key(row: Dict[str, Any]) -> Tuple:
+    """Identify the configuration a result row was measured for."""
+    if row["kind"] == "retriever":
+        return ("retriever", row["size"], row["mode"])
+    return (
+        "index", row["size"], row["index_type"],
+        json.dumps(row["build_params"], sort_keys=True), json.dumps(row["settings"], sort_keys=True)
+    )
+
+
+def metric_value(row: Dict[str, Any], path: str) -> Any:
+    """Read a dotted metric path from a result row."""
+    value = row
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def compare(base: List[Dict[str, Any]], new: List[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare matching rows of two result lists.
+
+    Args:
+        base: Result rows of the baseline run
+        new: Result rows of the new run
+        threshold: Relative change above which a worse metric counts as a regression
+
+    Returns:
+        One entry per compared metric with base and new values, change and regression flag
+    """
+    base_rows = {row_key(row): row for row in base}
+    changes = []
+    for row in new:
+        key = row_key(row)
+        previous = base_rows.get(key)
+        if previous is None:
+            continue
+        metrics = RETRIEVER_METRICS if row["kind"] == "retriever" else INDEX_METRICS
+        for path, higher_is_better in metrics:
+            old_value, new_value = metric_value(previous, path), metric_value(row, path)
+            if not isinstance(old_value, (int, float)) or not isinstance(new_value, (int, float)) or old_value == 0:
+                continue
+            change = (new_value - old_value) / abs(old_value)
+            worse = -change if higher_is_better else change
+            changes.append({
+                "config": key,
+                "metric": path,
+                "base": old_value,
+                "new": new_value,
+                "change": change,
+                "regression": worse > threshold,
+            })
+    return changes
+
+
+def main():
+    """Compare two benchmark result files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path, help="Baseline results JSON")
+    parser.add_argument("new", type=Path, help="New results JSON")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as a regression")
+    parser.add_argument("--all", action="store_true", help="Show all metrics, not only regressions")
+    args = parser.parse_args()
+
+    with open(args.base, "r") as f:
+        base = json.load(f)
+    with open(args.new, "r") as f:
+        new = json.load(f)
+    print(f"Base: {base['meta']['commit']} ({base['meta']['started_at']})")
+    print(f"New:  {new['meta']['commit']} ({new['meta']['started_at']})\n")
+
+    changes = compare(base["results"], new["results"], args.threshold)
+    regressions = [change for change in changes if change["regression"]]
+    for change in changes if args.all else regressions:
+        config = " ".join(str(part) for part in change["config"][1:])
+        marker = "REGRESSION" if change["regression"] else ""
+        print(
+            f"{config:<60} {change['metric']:<26} {change['base']:>12.4g} -> {change['new']:>12.4g} "
+            f"({change['change']:+.1%}) {marker}"
+        )
+    print(f"\n{len(changes)} metrics compared, {len(regressions)} regressions above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark context packing: prompt tokens of verbatim vs packed retrieval context.
+
+Runs the evaluation questions against the committed vector store and counts
+the tokens of the context string built from the same top-k results, once
+concatenated verbatim and once packed by ContextPacker (overlap between
+adjacent chunks stripped, near-duplicates collapsed, token budget applied).
+Retrieval runs in lexical mode, so no embeddings API is needed.
+
+Usage:
+    python benchmarks/context_packing.py --top-k 3 5 8 --token-budget 1500
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import SyntheticEmbedder
+from src.rag.context_packer import count_tokens
+from src.rag.retriever import Retriever
+from src.rag.vectorstore import VectorStore
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def main():
+    """Run the context packing benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectorstore", default=str(PROJECT_ROOT / "data" / "vectorstore"), help="Vector store path")
+    parser.add_argument(
+        "--questions", default=str(PROJECT_ROOT / "data" / "evaluation" / "ground_truth.yaml"),
+        help="Evaluation YAML with test_cases[].question"
+    )
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 5, 8], help="Retrieved chunks per question")
+    parser.add_argument("--token-budget", type=int, default=1500, help="Packed context token budget")
+    parser.add_argument("--output", type=Path, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    store = VectorStore(vectorstore_path=args.vectorstore, embedder=SyntheticEmbedder())
+    store.load(mmap=True)
+    with open(args.questions, "r") as f:
+        questions = [case["question"] for case in yaml.safe_load(f)["test_cases"]]
+    print(f"{len(questions)} questions, {store.index.ntotal} chunks, token budget {args.token_budget}\n")
+
+    header = f"{'top-k':>5} | {'verbatim tok':>12} | {'packed tok':>10} | {'saved':>6} | {'chunks in':>9} | {'passages out':>12}"
+    print(header)
+    print("-" * len(header))
+    rows = []
+    for k in args.top_k:
+        retriever = Retriever(vectorstore=store, top_k=k, mode="lexical", context_token_budget=args.token_budget)
+        verbatim_tokens, packed_tokens, chunks_in, passages_out = [], [], [], []
+        for question in questions:
+            results = retriever.retrieve(question)
+            verbatim_tokens.append(count_tokens(retriever.format_context(results)))
+            packed_tokens.append(count_tokens(retriever.pack_context(results)))
+            chunks_in.append(len(results))
+            passages_out.append(len(retriever.context_packer.pack(results)))
+        row = {
+            "top_k": k,
+            "verbatim_tokens_mean": float(np.mean(verbatim_tokens)),
+            "packed_tokens_mean": float(np.mean(packed_tokens)),
+            "token_reduction": 1 - float(np.sum(packed_tokens)) / float(np.sum(verbatim_tokens)),
+            "chunks_mean": float(np.mean(chunks_in)),
+            "passages_mean": float(np.mean(passages_out)),
+        }
+        rows.append(row)
+        print(
+            f"{k:>5} | {row['verbatim_tokens_mean']:>12.0f} | {row['packed_tokens_mean']:>10.0f} | "
+            f"{row['token_reduction']:>6.1%} | {row['chunks_mean']:>9.1f} | {row['passages_mean']:>12.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"token_budget": args.token_budget, "questions": len(questions), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
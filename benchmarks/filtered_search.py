@@ -0,0 +1,94 @@
+"""Benchmark filtered vector search: oversample-and-filter vs predicate pushdown.
+
+Compares the previous VectorStore.search strategy (fetch k * 3 neighbours and
+drop the ones with the wrong document_type) against pushing the metadata
+filter into FAISS as an ID selector. The market_analysis share of the corpus
+is varied to show how the oversampling path degrades as the filtered type
+becomes rarer.
+
+Usage:
+    python benchmarks/filtered_search.py --size 20000 --queries 200
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import (
+    SyntheticEmbedder,
+    generate_metadata,
+    generate_queries,
+    generate_vectors,
+    latency_summary,
+    time_calls,
+)
+from src.rag.vectorstore import VectorStore
+
+
+def oversample_search(store: VectorStore, query_vector: np.ndarray, k: int, document_type: str) -> list:
+    """Previous filtering strategy: over-fetch k * 3 results and filter afterwards."""
+    distances, indices = store.index.search(query_vector, k * 3)
+    results = []
+    for i, idx in enumerate(indices[0]):
+        if 0 <= idx < len(store.metadata) and store.metadata[idx].get("document_type") == document_type:
+            results.append({"metadata": store.metadata[idx], "score": float(distances[0][i])})
+            if len(results) >= k:
+                break
+    return results
+
+
+def main():
+    """Run the filtered search benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="Number of vectors in the corpus")
+    parser.add_argument("--dimension", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per configuration")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument(
+        "--shares", type=float, nargs="+", default=[0.5, 0.2, 0.05, 0.01, 0.002],
+        help="market_analysis shares of the corpus to test"
+    )
+    args = parser.parse_args()
+
+    vectors = generate_vectors(args.size, args.dimension)
+    queries = [(q.reshape(1, -1),) for q in generate_queries(vectors, args.queries)]
+
+    print(f"Corpus: {args.size} vectors x {args.dimension} dims, {args.queries} queries, k={args.k}\n")
+    header = f"{'share':>7} | {'path':<10} | {'mean ms':>8} | {'p99 ms':>8} | {'avg hits':>8} | {'short %':>7}"
+    print(header)
+    print("-" * len(header))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for share in args.shares:
+            store = VectorStore(
+                vectorstore_path=tmp_dir,
+                embedder=SyntheticEmbedder(args.dimension),
+                dimension=args.dimension
+            )
+            store.create_index()
+            store.add_embeddings(vectors, generate_metadata(args.size, market_share=share))
+            store.get_filter_index()
+
+            paths = {
+                "unfiltered": lambda qv: store.search_by_vector(qv, k=args.k),
+                "oversample": lambda qv: oversample_search(store, qv, args.k, "market_analysis"),
+                "pushdown": lambda qv: store.search_by_vector(qv, k=args.k, document_type="market_analysis"),
+            }
+            for name, func in paths.items():
+                hits = [len(func(*q)) for q in queries]
+                summary = latency_summary(time_calls(func, queries))
+                short = 100.0 * sum(h < args.k for h in hits) / len(hits)
+                print(
+                    f"{share:>7.3f} | {name:<10} | {summary['mean_ms']:>8.3f} | {summary['p99_ms']:>8.3f} | "
+                    f"{np.mean(hits):>8.2f} | {short:>6.1f}%"
+                )
+            print("-" * len(header))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark the per-turn graph overhead with and without direct agent finish.
+
+Runs chat turns through the supervisor graph the way /chat does, with the
+OpenAI chat model replaced by a simulated model (no latency by default, so
+only the graph's own work is measured). With direct finish, an agent's
+answer ends the turn; without it, every answer goes back to the supervisor,
+which then finishes the turn. For each topology the per-turn latency, the
+node runs and checkpoint writes per turn, and the size of the serialised
+checkpoints written per turn are reported.
+
+Usage:
+    python benchmarks/graph_overhead.py --sessions 20 --turns 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.chat_load import make_simulated_chat_model
+from benchmarks.synthetic import latency_summary
+
+
+async def run_topology(graph, checkpointer, sessions: int, turns: int) -> Dict[str, Any]:
+    """Run every session's turns back to back; returns per-turn latency, checkpoint and node counts."""
+    from langchain_core.messages import HumanMessage
+
+    latencies, checkpoints, checkpoint_bytes, node_runs = [], [], [], []
+    for _ in range(sessions):
+        config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+        for turn in range(turns):
+            initial_state = {
+                "messages": [HumanMessage(content=f"Question {turn} about my account")],
+                "next": "supervisor",
+                "response": "",
+                "handoff": None,
+            }
+            before = len(list(checkpointer.list(config)))
+            start = time.perf_counter()
+            # Each "updates" chunk is one node's state update
+            runs = 0
+            async for _ in graph.astream(initial_state, config, stream_mode="updates"):
+                runs += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            node_runs.append(runs)
+
+            # Checkpoints are listed newest first
+            history = list(checkpointer.list(config))
+            written = history[:len(history) - before]
+            checkpoints.append(len(written))
+            checkpoint_bytes.append(sum(len(checkpointer.serde.dumps_typed(c.checkpoint)[1]) for c in written))
+    return latency_summary(np.array(latencies), {
+        "checkpoints_per_turn": float(np.mean(checkpoints)),
+        "node_runs_per_turn": float(np.mean(node_runs)),
+        "checkpoint_kb_per_turn": float(np.mean(checkpoint_bytes)) / 1024,
+    })
+
+
+def main():
+    """Run the graph overhead benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions per topology")
+    parser.add_argument("--turns", type=int, default=10, help="Turns per session")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency per LLM call")
+    args = parser.parse_args()
+
+    import langchain_openai
+
+    os.environ.setdefault("OPENAI_API_KEY", "simulated")
+    os.environ.setdefault("TAVILY_API_KEY", "simulated")
+    # Every supervisor decision goes through the (simulated) routing LLM
+    os.environ["INTENT_ROUTER_ENABLED"] = "false"
+    model = make_simulated_chat_model(args.llm_latency_ms, "faq_agent")
+    # Patched before the agents module creates its model
+    langchain_openai.ChatOpenAI = lambda *_, **__: model
+
+    from langgraph.checkpoint.memory import MemorySaver
+    from src.graph.chatgrapgh import build_research_graph
+
+    print(f"{args.sessions} sessions x {args.turns} turns, simulated LLM latency {args.llm_latency_ms:.0f} ms/call\n")
+    header = (f"{'topology':<16} | {'p50 ms':>7} | {'p99 ms':>7} | {'nodes/turn':>10} | "
+              f"{'checkpoints/turn':>16} | {'checkpoint KB/turn':>18}")
+    print(header)
+    print("-" * len(header))
+    for name, direct_finish in (("via supervisor", False), ("direct finish", True)):
+        checkpointer = MemorySaver()
+        graph = build_research_graph(checkpointer=checkpointer, direct_finish=direct_finish)
+        row = asyncio.run(run_topology(graph, checkpointer, args.sessions, args.turns))
+        print(
+            f"{name:<16} | {row['p50_ms']:>7.2f} | {row['p99_ms']:>7.2f} | {row['node_runs_per_turn']:>10.1f} | "
+            f"{row['checkpoints_per_turn']:>16.1f} | {row['checkpoint_kb_per_turn']:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark FAISS index types: recall, latency, memory and build time.
+
+Builds every supported VectorStore index type over synthetic corpora and
+reports recall@k against the exact flat index, single-query p50/p99 latency
+for several nprobe/efSearch settings, serialized index size and build time.
+
+Note that a 1M x 1536 corpus needs roughly 12 GB of RAM (vectors plus the flat
+reference index); pass a smaller --dimension or --sizes on smaller machines.
+
+Usage:
+    python benchmarks/index_types.py --sizes 10000 100000 1000000 --queries 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import (
+    SyntheticEmbedder,
+    generate_metadata,
+    generate_queries,
+    generate_vectors,
+    latency_summary,
+    time_calls,
+)
+from src.rag.vectorstore import VectorStore
+
+# (index type, build params, list of runtime search settings)
+INDEX_CONFIGS = [
+    ("flat", {}, [{}]),
+    ("flat", {"quantization": "fp16"}, [{}]),
+    ("flat", {"quantization": "sq8"}, [{}, {"rerank_factor": 4}]),
+    ("ivf_flat", {}, [{"nprobe": 4}, {"nprobe": 16}, {"nprobe": 64}]),
+    ("ivf_flat", {"quantization": "sq8"}, [{"nprobe": 16}]),
+    ("ivf_pq", {}, [{"nprobe": 16}, {"nprobe": 64}, {"nprobe": 16, "rerank_factor": 4}]),
+    ("hnsw", {}, [{"ef_search": 32}, {"ef_search": 64}, {"ef_search": 256}]),
+]
+
+
+def index_size_bytes(index: faiss.Index) -> int:
+    """Return the serialized size of an index."""
+    with tempfile.NamedTemporaryFile(suffix=".index") as tmp:
+        faiss.write_index(index, tmp.name)
+        return os.path.getsize(tmp.name)
+
+
+def recall_at_k(results: List[np.ndarray], ground_truth: np.ndarray, k: int) -> float:
+    """Mean fraction of the exact top-k found by each query."""
+    hits = [len(np.intersect1d(found, truth[:k])) for found, truth in zip(results, ground_truth)]
+    return float(np.mean(hits)) / k
+
+
+def benchmark_size(size: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Benchmark all index configurations for one corpus size."""
+    vectors = generate_vectors(size, args.dimension)
+    metadata = generate_metadata(size)
+    queries = generate_queries(vectors, args.queries)
+
+    exact = faiss.IndexFlatL2(args.dimension)
+    exact.add(vectors)
+    _, ground_truth = exact.search(queries, args.k)
+    del exact
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for index_type, build_params, search_settings in INDEX_CONFIGS:
+            if args.index_types and index_type not in args.index_types:
+                continue
+            params = dict(build_params)
+            if index_type == "ivf_pq":
+                params["pq_m"] = args.pq_m
+            store = VectorStore(
+                vectorstore_path=tmp_dir,
+                embedder=SyntheticEmbedder(args.dimension),
+                dimension=args.dimension,
+                index_type=index_type,
+                index_params=params
+            )
+
+            start = time.perf_counter()
+            store.create_index(n_vectors=size)
+            store.add_embeddings(vectors, metadata)
+            build_seconds = time.perf_counter() - start
+            size_bytes = index_size_bytes(store.index)
+
+            for settings in search_settings:
+                query_args = [(q.reshape(1, -1),) for q in queries]
+                found = [
+                    [r["id"] for r in store.search_by_vector(qv, k=args.k, **settings)]
+                    for (qv,) in query_args
+                ]
+                latencies = time_calls(
+                    lambda qv: store.search_by_vector(qv, k=args.k, **settings), query_args
+                )
+                row = latency_summary(latencies, {
+                    "size": size,
+                    "index_type": index_type,
+                    "factory": store.get_index_info()["index_params"]["factory"],
+                    "settings": settings,
+                    "recall_at_k": recall_at_k(found, ground_truth, args.k),
+                    "index_bytes": size_bytes,
+                    "build_seconds": build_seconds,
+                })
+                rows.append(row)
+                print_row(row)
+            del store
+    return rows
+
+
+def print_row(row: Dict[str, Any]):
+    """Print one result row."""
+    settings = ",".join(f"{key}={value}" for key, value in row["settings"].items()) or "-"
+    print(
+        f"{row['size']:>9} | {row['factory']:<22} | {settings:<26} | {row['recall_at_k']:>6.3f} | "
+        f"{row['p50_ms']:>8.3f} | {row['p99_ms']:>8.3f} | {row['index_bytes'] / 2**20:>9.1f} | "
+        f"{row['build_seconds']:>8.2f}"
+    )
+
+
+def main():
+    """Run the index type benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Corpus sizes")
+    parser.add_argument("--dimension", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (recall@k)")
+    parser.add_argument("--pq-m", type=int, default=64, help="PQ sub-quantizers for ivf_pq")
+    parser.add_argument("--index-types", nargs="+", help="Only benchmark these index types")
+    args = parser.parse_args()
+
+    header = (
+        f"{'size':>9} | {'factory':<22} | {'settings':<26} | {'recall':>6} | "
+        f"{'p50 ms':>8} | {'p99 ms':>8} | {'size MiB':>9} | {'build s':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for size in args.sizes:
+        benchmark_size(size, args)
+        print("-" * len(header))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Retrieval benchmark suite: build time, memory, latency and recall per index configuration.
+
+Builds a VectorStore over a synthetic corpus (vectors, metadata and texts, no
+API calls) for every index configuration and corpus size, and measures:
+- build: build and save time, index and on-disk store size, resident memory growth
+- single: single-query latency percentiles and recall@k against brute force
+- batch: per-batch latency percentiles and throughput of search_by_vectors
+- filtered: latency and recall@k of searches filtered to a rare document type
+- retriever: end-to-end Retriever latency per retrieval mode (flat index)
+
+Results are written as JSON together with the git commit and environment, so
+runs of different commits can be compared with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/retrieval_suite.py --sizes 10000 100000 --output benchmarks/results/latest.json
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.index_types import INDEX_CONFIGS, index_size_bytes, recall_at_k
+from benchmarks.synthetic import (
+    SyntheticEmbedder,
+    generate_metadata,
+    generate_queries,
+    generate_texts,
+    generate_vectors,
+    latency_summary,
+    read_rss_kb,
+    time_calls,
+)
+from src.rag.retriever import RETRIEVAL_MODES, Retriever
+from src.rag.vectorstore import VectorStore
+
+FILTER_TYPE = "market_analysis"
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int, ids: np.ndarray = None) -> np.ndarray:
+    """Brute-force L2 top-k ids of each query, optionally among a subset of ids."""
+    subset = vectors if ids is None else vectors[ids]
+    _, found = faiss.knn(queries, subset, min(k, len(subset)))
+    return found if ids is None else ids[found]
+
+
+def directory_bytes(path: Path) -> int:
+    """Total size of the files under a directory."""
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def benchmark_config(
+    store_dir: Path,
+    index_type: str,
+    build_params: Dict[str, Any],
+    search_settings: List[Dict[str, Any]],
+    corpus: Dict[str, Any],
+    args: argparse.Namespace
+) -> List[Dict[str, Any]]:
+    """Build one index configuration and benchmark each of its search settings."""
+    size = len(corpus["vectors"])
+    params = dict(build_params)
+    if index_type == "ivf_pq":
+        params["pq_m"] = args.pq_m
+    store = VectorStore(
+        vectorstore_path=str(store_dir),
+        embedder=SyntheticEmbedder(args.dimension),
+        dimension=args.dimension,
+        index_type=index_type,
+        index_params=params
+    )
+
+    gc.collect()
+    rss_before = read_rss_kb()["RssAnon"]
+    # Keep training and save messages out of the results table
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        store.create_index(n_vectors=size)
+        store.add_embeddings(corpus["vectors"], corpus["metadata"], texts=corpus["texts"])
+        build_seconds = time.perf_counter() - start
+        rss_after = read_rss_kb()["RssAnon"]
+
+        start = time.perf_counter()
+        store.save()
+        save_seconds = time.perf_counter() - start
+    build = {
+        "seconds": round(build_seconds, 4),
+        "save_seconds": round(save_seconds, 4),
+        "index_bytes": index_size_bytes(store.index),
+        "store_bytes": directory_bytes(store.snapshot_path),
+        "rss_anon_mb": round((rss_after - rss_before) / 1024, 1),
+    }
+
+    queries = corpus["queries"]
+    batches = [queries[i:i + args.batch_size] for i in range(0, len(queries), args.batch_size)]
+    rows = []
+    for settings in search_settings:
+        single_found = [
+            [r["id"] for r in store.search_by_vector(query, k=args.k, **settings)] for query in queries
+        ]
+        single = latency_summary(time_calls(
+            lambda query: store.search_by_vector(query, k=args.k, **settings), [(q,) for q in queries]
+        ))
+        single["recall_at_k"] = recall_at_k(single_found, corpus["ground_truth"], args.k)
+
+        batch_latencies = time_calls(
+            lambda batch: store.search_by_vectors(batch, k=args.k, **settings), [(b,) for b in batches]
+        )
+        batch = latency_summary(batch_latencies)
+        batch["batch_size"] = args.batch_size
+        batch["queries_per_second"] = len(queries) / (float(np.sum(batch_latencies)) / 1000)
+
+        filtered_found = [
+            [r["id"] for r in store.search_by_vector(query, k=args.k, document_type=FILTER_TYPE, **settings)]
+            for query in queries
+        ]
+        filtered = latency_summary(time_calls(
+            lambda query: store.search_by_vector(query, k=args.k, document_type=FILTER_TYPE, **settings),
+            [(q,) for q in queries]
+        ))
+        filtered["recall_at_k"] = recall_at_k(filtered_found, corpus["filtered_ground_truth"], args.k)
+        filtered["selectivity"] = corpus["filter_selectivity"]
+
+        row = {
+            "kind": "index",
+            "size": size,
+            "index_type": index_type,
+            "factory": store.get_index_info()["index_params"]["factory"],
+            "build_params": build_params,
+            "settings": settings,
+            "build": build,
+            "single": single,
+            "batch": batch,
+            "filtered": filtered,
+        }
+        rows.append(row)
+        print_index_row(row)
+    return rows
+
+
+def benchmark_retriever(store_dir: Path, corpus: Dict[str, Any], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Measure end-to-end Retriever latency per mode on a flat store with text queries."""
+    store = VectorStore(
+        vectorstore_path=str(store_dir), embedder=SyntheticEmbedder(args.dimension), dimension=args.dimension
+    )
+    store.create_index()
+    store.add_embeddings(corpus["vectors"], corpus["metadata"], texts=corpus["texts"])
+
+    # Text queries made of words from corpus texts, so lexical search has matches
+    rng = np.random.default_rng(2)
+    query_texts = [
+        " ".join(rng.choice(corpus["texts"][i].split(), size=4))
+        for i in rng.integers(0, len(corpus["texts"]), size=len(corpus["queries"]))
+    ]
+    rows = []
+    for mode in RETRIEVAL_MODES:
+        retriever = Retriever(vectorstore=store, top_k=args.k, mode=mode)
+        row = latency_summary(time_calls(retriever.retrieve, [(text,) for text in query_texts]))
+        row.update({"kind": "retriever", "size": len(corpus["vectors"]), "mode": mode})
+        rows.append(row)
+        print(
+            f"{row['size']:>9} | {'retriever ' + mode:<22} | {'-':<24} | {'':>6} | "
+            f"{row['p50_ms']:>8.3f} | {row['p99_ms']:>8.3f} |"
+        )
+    return rows
+
+
+def print_index_row(row: Dict[str, Any]):
+    """Print the headline numbers of one index result row."""
+    settings = ",".join(f"{key}={value}" for key, value in row["settings"].items()) or "-"
+    print(
+        f"{row['size']:>9} | {row['factory']:<22} | {settings:<24} | {row['single']['recall_at_k']:>6.3f} | "
+        f"{row['single']['p50_ms']:>8.3f} | {row['single']['p99_ms']:>8.3f} | "
+        f"{row['batch']['queries_per_second']:>9.0f} | {row['filtered']['p50_ms']:>8.3f} | "
+        f"{row['filtered']['recall_at_k']:>6.3f} | {row['build']['seconds']:>7.2f} | "
+        f"{row['build']['index_bytes'] / 2**20:>8.1f}"
+    )
+
+
+def git_commit() -> str:
+    """Return the current git commit, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    """Run the retrieval benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Corpus sizes")
+    parser.add_argument("--dimension", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (recall@k)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Queries per batch search call")
+    parser.add_argument("--market-share", type=float, default=0.05, help="Share of chunks matching the filter")
+    parser.add_argument("--pq-m", type=int, default=48, help="PQ sub-quantizers for ivf_pq (must divide the dimension)")
+    parser.add_argument("--index-types", nargs="+", help="Only benchmark these index types")
+    parser.add_argument(
+        "--output", type=Path,
+        help="JSON results file (default: benchmarks/results/retrieval-<commit>-<timestamp>.json)"
+    )
+    args = parser.parse_args()
+
+    commit = git_commit()
+    started_at = datetime.now()
+    output = args.output or (
+        Path(__file__).parent / "results" / f"retrieval-{commit}-{started_at.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+
+    header = (
+        f"{'size':>9} | {'factory':<22} | {'settings':<24} | {'recall':>6} | {'p50 ms':>8} | {'p99 ms':>8} | "
+        f"{'batch q/s':>9} | {'filt p50':>8} | {'f rec':>6} | {'build s':>7} | {'idx MiB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            vectors = generate_vectors(size, args.dimension)
+            metadata = generate_metadata(size, market_share=args.market_share)
+            queries = generate_queries(vectors, args.queries)
+            filter_ids = np.array(
+                [i for i, m in enumerate(metadata) if m["document_type"] == FILTER_TYPE], dtype=np.int64
+            )
+            corpus = {
+                "vectors": vectors,
+                "metadata": metadata,
+                "texts": generate_texts(size),
+                "queries": queries,
+                "ground_truth": exact_neighbours(vectors, queries, args.k),
+                "filtered_ground_truth": exact_neighbours(vectors, queries, args.k, filter_ids),
+                "filter_selectivity": round(len(filter_ids) / size, 4),
+            }
+
+            for position, (index_type, build_params, search_settings) in enumerate(INDEX_CONFIGS):
+                if args.index_types and index_type not in args.index_types:
+                    continue
+                store_dir = Path(tmp_dir) / f"{size}-{position}"
+                results.extend(benchmark_config(store_dir, index_type, build_params, search_settings, corpus, args))
+            results.extend(benchmark_retriever(Path(tmp_dir) / f"{size}-retriever", corpus, args))
+            print("-" * len(header))
+
+    report = {
+        "meta": {
+            "benchmark": "retrieval_suite",
+            "commit": commit,
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round((datetime.now() - started_at).total_seconds(), 1),
+            "python": platform.python_version(),
+            "faiss": faiss.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "omp_threads": faiss.omp_get_max_threads(),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        "results": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark the local intent router against the LLM supervisor.
+
+Trains the intent router as the API does (routing examples plus the FAQ
+questions of the vector store) and evaluates it on the held-out evaluation
+questions (expected_agent in data/evaluation/ground_truth.yaml). For every
+confidence threshold it reports the share of questions routed locally, the
+accuracy on those, and the local routing latency; the leave-one-out accuracy
+on the training examples is reported as well. With --llm, the supervisor's
+LLM router is run on the same questions (needs OPENAI_API_KEY), and the
+combined router (local when confident, LLM otherwise) is scored with the
+measured LLM decisions and latencies.
+
+Usage:
+    python benchmarks/routing.py --thresholds 0.6 0.8 0.9 --llm
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import latency_summary
+from src.nodes.intent_router import DEFAULT_EXAMPLES_PATH, IntentRouter, load_intent_examples
+from src.rag.faq_index import load_faq_pairs
+
+PROJECT_ROOT = Path(__file__).parent.parent
+GROUND_TRUTH_PATH = PROJECT_ROOT / "data" / "evaluation" / "ground_truth.yaml"
+MEMBERS = ["faq_agent", "task_agent", "market_insights_agent"]
+
+
+def load_test_questions(path: Path = GROUND_TRUTH_PATH) -> List[Tuple[str, str]]:
+    """(question, expected_agent) tuples of the evaluation set."""
+    with open(path, 'r', encoding='utf-8') as f:
+        test_cases = yaml.safe_load(f)["test_cases"]
+    return [(case["question"], case["expected_agent"]) for case in test_cases if case.get("expected_agent")]
+
+
+def leave_one_out_accuracy(examples: List[Tuple[str, str]], min_confidence: float) -> Tuple[float, float]:
+    """Share routed locally and accuracy on those, each example classified by a router trained without it."""
+    routed = correct = 0
+    for position, (message, agent) in enumerate(examples):
+        router = IntentRouter(examples[:position] + examples[position + 1:], min_confidence=min_confidence)
+        prediction = router.classify(message)
+        if prediction["confidence"] >= min_confidence:
+            routed += 1
+            correct += prediction["agent"] == agent
+    return routed / len(examples), correct / routed if routed else 0.0
+
+
+def run_llm_router(questions: List[Tuple[str, str]], model: str) -> Tuple[List[str], np.ndarray]:
+    """Route every question with the supervisor's LLM router; returns its decisions and latencies in ms."""
+    from langchain_core.messages import HumanMessage
+    from langchain_openai import ChatOpenAI
+    from src.nodes.supervisor import make_supervisor_node
+
+    supervisor = make_supervisor_node(ChatOpenAI(model=model), MEMBERS)
+    decisions, latencies = [], []
+    for question, _ in questions:
+        start = time.perf_counter()
+        update = supervisor.invoke({"messages": [HumanMessage(content=question)]})
+        latencies.append((time.perf_counter() - start) * 1000)
+        decisions.append(update["next"])
+    return decisions, np.array(latencies)
+
+
+def main():
+    """Run the routing benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9], help="Confidence thresholds")
+    parser.add_argument("--vectorstore", default=str(PROJECT_ROOT / "data" / "vectorstore"), help="Vector store with the FAQ")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed classifications per question")
+    parser.add_argument("--llm", action="store_true", help="Also run the LLM router (needs OPENAI_API_KEY)")
+    parser.add_argument("--model", default="gpt-4o", help="Model of the LLM router")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        faq_examples = [(question, "faq_agent") for question, _ in load_faq_pairs(args.vectorstore)]
+    examples = load_intent_examples(DEFAULT_EXAMPLES_PATH) + faq_examples
+    questions = load_test_questions()
+    print(f"Training: {len(examples)} examples ({len(faq_examples)} FAQ questions), "
+          f"test: {len(questions)} held-out evaluation questions\n")
+
+    llm_decisions: Optional[List[str]] = None
+    llm_latencies: Optional[np.ndarray] = None
+    if args.llm:
+        if not os.getenv("OPENAI_API_KEY"):
+            parser.error("--llm needs OPENAI_API_KEY")
+        llm_decisions, llm_latencies = run_llm_router(questions, args.model)
+        llm_accuracy = np.mean([decision == agent for decision, (_, agent) in zip(llm_decisions, questions)])
+        summary = latency_summary(llm_latencies)
+        print(f"LLM router ({args.model}): accuracy {llm_accuracy:.3f}, "
+              f"p50 {summary['p50_ms']:.0f} ms, p99 {summary['p99_ms']:.0f} ms\n")
+
+    header = (f"{'threshold':>9} | {'local':>6} | {'local acc':>9} | {'p50 us':>7} | {'p99 us':>7} | "
+              f"{'LOO local':>9} | {'LOO acc':>7} | {'combined acc':>12} | {'mean ms':>8}")
+    print(header)
+    print("-" * len(header))
+    for threshold in args.thresholds:
+        router = IntentRouter(examples, min_confidence=threshold)
+        predictions = [router.classify(question) for question, _ in questions]
+        local = [p["confidence"] >= threshold for p in predictions]
+        local_correct = [p["agent"] == agent for p, (_, agent), is_local in zip(predictions, questions, local) if is_local]
+
+        latencies = []
+        for question, _ in questions:
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                router.route(question)
+            latencies.append((time.perf_counter() - start) * 1e6 / args.repeats)
+        p50_us, p99_us = np.percentile(latencies, [50, 99])
+        loo_local, loo_accuracy = leave_one_out_accuracy(examples, threshold)
+
+        combined = mean_ms = "-"
+        if llm_decisions is not None:
+            decisions = [p["agent"] if is_local else decision
+                         for p, is_local, decision in zip(predictions, local, llm_decisions)]
+            combined = f"{np.mean([d == agent for d, (_, agent) in zip(decisions, questions)]):.3f}"
+            mean_ms = f"{np.mean([0.0 if is_local else ms for is_local, ms in zip(local, llm_latencies)]):.0f}"
+
+        local_accuracy = f"{np.mean(local_correct):.3f}" if local_correct else "-"
+        print(
+            f"{threshold:>9.2f} | {np.mean(local):>6.3f} | {local_accuracy:>9} | {p50_us:>7.0f} | "
+            f"{p99_us:>7.0f} | {loo_local:>9.3f} | {loo_accuracy:>7.3f} | {combined:>12} | {mean_ms:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
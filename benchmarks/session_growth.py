@@ -0,0 +1,216 @@
+"""Track checkpoint size and per-turn latency over a long chat session.
+
+Runs one session of many turns through the supervisor graph the way /chat
+does (each turn passes only the new user message), with the OpenAI chat
+model replaced by a simulated model, and the checkpointer's serializer
+wrapped to count the bytes it writes. Per turn it records the latency, the
+number of messages in the thread state, the serialised size of the state's
+messages, and the checkpoint bytes written that turn. Conversation state
+that is re-sent or re-written on every turn shows up as checkpoint bytes
+per turn growing with the turn number (quadratic total). The prompt tokens
+the supervisor and agents were sent are recorded next to the tokens of the
+full history; when the conversation memory has turns to summarise after a
+turn, the summary refresh the API runs in the background is run before the
+next turn.
+
+The results are written as JSON with the git commit. Given --baseline, the
+summary metrics are compared with an earlier results file and the script
+exits with status 1 if any grew by more than the threshold.
+
+Usage:
+    python benchmarks/session_growth.py --turns 50 --output benchmarks/results/session-new.json
+    python benchmarks/session_growth.py --baseline benchmarks/results/session-base.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.chat_load import make_simulated_chat_model
+from benchmarks.retrieval_suite import git_commit
+
+# Summary metrics checked against a baseline; all of them regress when they grow
+SUMMARY_METRICS = (
+    "p50_ms", "last_10_p50_ms", "final_state_kb", "last_turn_checkpoint_kb", "total_checkpoint_kb",
+    "last_turn_prompt_tokens"
+)
+ANSWER = (
+    "You can check your account balance on the Account tab, which shows your cash balance, equity, "
+    "used and free margin. Trading fees are listed under Fees, and spreads apply to every instrument; "
+    "overnight swaps are charged on positions held past the daily cut-off time."
+)
+
+
+class CountingSerializer:
+    """Serializer wrapper counting the bytes a checkpointer writes."""
+
+    def __init__(self, serde):
+        self.serde = serde
+        self.bytes_written = 0
+
+    def dumps_typed(self, obj):
+        type_name, data = self.serde.dumps_typed(obj)
+        self.bytes_written += len(data)
+        return type_name, data
+
+    def loads_typed(self, data):
+        return self.serde.loads_typed(data)
+
+
+async def run_session(graph, serde: CountingSerializer, memory, turns: int) -> List[Dict[str, Any]]:
+    """Run one session's turns back to back; returns one metrics row per turn."""
+    from langchain_core.messages import HumanMessage
+
+    def memory_tokens():
+        stats = memory.get_stats() if memory is not None else {}
+        return stats.get("prompt_tokens", 0), stats.get("history_tokens", 0)
+
+    config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+    rows = []
+    for turn in range(1, turns + 1):
+        initial_state = {
+            "messages": [HumanMessage(content=f"Question {turn}: how do I check my account balance and fees?")],
+            "next": "supervisor",
+            "response": "",
+            "handoff": None,
+        }
+        written_before = serde.bytes_written
+        prompt_before, history_before = memory_tokens()
+        start = time.perf_counter()
+        state = await graph.ainvoke(initial_state, config)
+        latency_ms = (time.perf_counter() - start) * 1000
+        written = serde.bytes_written - written_before
+        prompt_after, history_after = memory_tokens()
+        if memory is not None and memory.needs_refresh(state):
+            await memory.refresh(graph, config)
+
+        messages = (await graph.aget_state(config)).values.get("messages", [])
+        state_bytes = len(serde.serde.dumps_typed(messages)[1])
+        rows.append({
+            "turn": turn,
+            "latency_ms": round(latency_ms, 3),
+            "messages": len(messages),
+            "state_kb": round(state_bytes / 1024, 2),
+            "checkpoint_kb": round(written / 1024, 2),
+            "prompt_tokens": prompt_after - prompt_before,
+            "history_tokens": history_after - history_before,
+        })
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Summary metrics of a session's per-turn rows."""
+    latencies = np.array([row["latency_ms"] for row in rows])
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "last_10_p50_ms": round(float(np.percentile(latencies[-10:], 50)), 3),
+        "final_state_kb": rows[-1]["state_kb"],
+        "last_turn_checkpoint_kb": rows[-1]["checkpoint_kb"],
+        "total_checkpoint_kb": round(sum(row["checkpoint_kb"] for row in rows), 2),
+        "last_turn_prompt_tokens": rows[-1]["prompt_tokens"],
+        "total_prompt_tokens": sum(row["prompt_tokens"] for row in rows),
+        "total_history_tokens": sum(row["history_tokens"] for row in rows),
+    }
+
+
+def check_baseline(summary: Dict[str, float], baseline_path: Path, threshold: float) -> bool:
+    """Print the change of every summary metric against a baseline file; returns True if any regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["summary"]
+    regressed = False
+    print(f"\nAgainst {baseline_path} (threshold {threshold:.0%}):")
+    for metric in SUMMARY_METRICS:
+        old_value, new_value = baseline.get(metric), summary[metric]
+        if not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        flag = "REGRESSION" if change > threshold else ""
+        regressed = regressed or change > threshold
+        print(f"  {metric:<24} {old_value:>10.2f} -> {new_value:>10.2f} ({change:+.1%}) {flag}")
+    return regressed
+
+
+def main():
+    """Run the session growth benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50, help="Turns in the session")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency per LLM call")
+    parser.add_argument(
+        "--output", type=Path,
+        help="JSON results file (default: benchmarks/results/session-<commit>-<timestamp>.json)"
+    )
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative growth counted as a regression")
+    args = parser.parse_args()
+
+    import langchain_openai
+
+    os.environ.setdefault("OPENAI_API_KEY", "simulated")
+    os.environ.setdefault("TAVILY_API_KEY", "simulated")
+    model = make_simulated_chat_model(args.llm_latency_ms, "faq_agent", answer=ANSWER)
+    # Patched before the agents module creates its model
+    langchain_openai.ChatOpenAI = lambda *_, **__: model
+
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from src.graph.chatgrapgh import build_research_graph
+    from src.nodes.agents import conversation_memory
+
+    commit = git_commit()
+    started_at = datetime.now()
+    output = args.output or (
+        Path(__file__).parent / "results" / f"session-{commit}-{started_at.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+
+    serde = CountingSerializer(JsonPlusSerializer())
+    graph = build_research_graph(checkpointer=MemorySaver(serde=serde))
+    rows = asyncio.run(run_session(graph, serde, conversation_memory, args.turns))
+    summary = summarize(rows)
+
+    header = (f"{'turn':>4} | {'latency ms':>10} | {'messages':>8} | {'state KB':>8} | {'checkpoint KB':>13} | "
+              f"{'prompt tok':>10} | {'history tok':>11}")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        if row["turn"] in (1, args.turns) or row["turn"] % 10 == 0:
+            print(
+                f"{row['turn']:>4} | {row['latency_ms']:>10.2f} | {row['messages']:>8} | "
+                f"{row['state_kb']:>8.1f} | {row['checkpoint_kb']:>13.1f} | "
+                f"{row['prompt_tokens']:>10} | {row['history_tokens']:>11}"
+            )
+    print(f"\nTotal checkpoint bytes written: {summary['total_checkpoint_kb']:.0f} KB")
+    print(f"Prompt tokens sent: {summary['total_prompt_tokens']} of {summary['total_history_tokens']} "
+          f"history tokens")
+
+    report = {
+        "meta": {
+            "benchmark": "session_growth",
+            "commit": commit,
+            "started_at": started_at.isoformat(),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        "summary": summary,
+        "turns": rows,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+    if args.baseline and check_baseline(summary, args.baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
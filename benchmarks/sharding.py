@@ -0,0 +1,101 @@
+"""Benchmark sharded scatter-gather search against a single store.
+
+Builds a synthetic vector store, shards it by hash into each requested
+number of shards and measures search latency and throughput with several
+concurrent clients, for in-process shards ('local') and shard worker
+processes ('process'). Each client sends single queries, as API requests do.
+Results are checked against the unsharded store, which they must match
+exactly for exact (flat) indexes.
+
+Usage:
+    python benchmarks/sharding.py --size 200000 --shards 2 4 --clients 8
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import (
+    SyntheticEmbedder,
+    generate_metadata,
+    generate_queries,
+    generate_vectors,
+    latency_summary,
+)
+from src.rag.sharding import ShardedVectorStore, build_shards
+from src.rag.vectorstore import VectorStore
+
+
+def run_clients(store, queries: np.ndarray, k: int, clients: int) -> Dict[str, Any]:
+    """Search every query once from concurrent clients; returns latency percentiles and throughput."""
+    def timed_search(query: np.ndarray) -> float:
+        start = time.perf_counter()
+        store.search_by_vector(query, k=k)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        start = time.perf_counter()
+        latencies = np.array(list(pool.map(timed_search, queries)))
+        elapsed = time.perf_counter() - start
+    return latency_summary(latencies, {"queries_per_second": len(queries) / elapsed})
+
+
+def main():
+    """Run the sharding benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200000, help="Number of vectors in the corpus")
+    parser.add_argument("--dimension", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=400, help="Queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4], help="Shard counts")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--workers", nargs="+", default=["local", "process"], help="Shard worker modes")
+    args = parser.parse_args()
+
+    vectors = generate_vectors(args.size, args.dimension)
+    metadata = generate_metadata(args.size)
+    queries = generate_queries(vectors, args.queries)
+    embedder = SyntheticEmbedder(args.dimension)
+    print(f"Corpus: {args.size} vectors x {args.dimension} dims, k={args.k}, {args.clients} clients\n")
+    header = f"{'shards':>6} | {'workers':<8} | {'p50 ms':>8} | {'p99 ms':>8} | {'q/s':>8} | {'match':>6}"
+    print(header)
+    print("-" * len(header))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = VectorStore(vectorstore_path=tmp_dir, embedder=embedder, dimension=args.dimension)
+        with contextlib.redirect_stdout(io.StringIO()):
+            store.create_index()
+            store.add_embeddings(vectors, metadata)
+            store.save()
+        expected = [[VectorStore.chunk_id_of(r["metadata"]) for r in store.search_by_vector(q, k=args.k)] for q in queries]
+        row = run_clients(store, queries, args.k, args.clients)
+        print(f"{1:>6} | {'-':<8} | {row['p50_ms']:>8.3f} | {row['p99_ms']:>8.3f} | {row['queries_per_second']:>8.0f} | {'':>6}")
+
+        for n_shards in args.shards:
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_shards(store, n_shards, "hash")
+            for workers in args.workers:
+                sharded = ShardedVectorStore(tmp_dir, embedder=embedder, workers=workers)
+                sharded.load()
+                found = [[VectorStore.chunk_id_of(r["metadata"]) for r in sharded.search_by_vector(q, k=args.k)] for q in queries]
+                match = np.mean([a == b for a, b in zip(expected, found)])
+                row = run_clients(sharded, queries, args.k, args.clients)
+                sharded.close()
+                print(
+                    f"{n_shards:>6} | {workers:<8} | {row['p50_ms']:>8.3f} | {row['p99_ms']:>8.3f} | "
+                    f"{row['queries_per_second']:>8.0f} | {match:>6.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
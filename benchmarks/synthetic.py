@@ -0,0 +1,161 @@
+"""Synthetic corpus generation for retrieval benchmarks.
+
+This module generates clustered embedding vectors and chunk metadata that
+mimic the shape of the real vector store (FAQ, user guide and market analysis
+documents) without calling the embeddings API, so benchmarks can run offline
+at any corpus size.
+"""
+
+import hashlib
+import re
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+DOCUMENT_LAYOUT = [
+    # (document_name, source, document_type)
+    ("faq.yaml", "faq.pdf", "faq_rag"),
+    ("user_guide.pdf", "user_guide.pdf", "faq_rag"),
+    ("market_analysis_instructions.pdf", "market_analysis_instructions.pdf", "market_analysis"),
+]
+
+
+def generate_vectors(n: int, dimension: int, n_clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """
+    Generate clustered float32 vectors.
+
+    Args:
+        n: Number of vectors
+        dimension: Vector dimension
+        n_clusters: Number of Gaussian clusters
+        seed: Random seed
+
+    Returns:
+        Array of shape (n, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dimension), dtype=np.float32)
+    assignments = rng.integers(0, n_clusters, size=n)
+    vectors = np.empty((n, dimension), dtype=np.float32)
+    # Fill in blocks to keep peak memory bounded for large corpora
+    block = 50_000
+    for start in range(0, n, block):
+        end = min(start + block, n)
+        noise = rng.standard_normal((end - start, dimension), dtype=np.float32) * 0.5
+        vectors[start:end] = centers[assignments[start:end]] + noise
+    return vectors
+
+
+def generate_queries(vectors: np.ndarray, n_queries: int, seed: int = 1) -> np.ndarray:
+    """Generate queries as perturbed copies of random corpus vectors."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(vectors), size=n_queries)
+    noise = rng.standard_normal((n_queries, vectors.shape[1]), dtype=np.float32) * 0.3
+    return (vectors[picks] + noise).astype(np.float32)
+
+
+def generate_texts(n: int, words_per_text: int = 60, vocabulary_size: int = 5000, seed: int = 0) -> List[str]:
+    """
+    Generate chunk texts with a Zipf-like word distribution, for the lexical index.
+
+    Args:
+        n: Number of texts
+        words_per_text: Words per text
+        vocabulary_size: Number of distinct words
+        seed: Random seed
+
+    Returns:
+        List of texts
+    """
+    rng = np.random.default_rng(seed)
+    ranks = np.arange(1, vocabulary_size + 1)
+    probabilities = (1.0 / ranks) / np.sum(1.0 / ranks)
+    words = rng.choice(vocabulary_size, size=(n, words_per_text), p=probabilities)
+    return [" ".join(f"w{word}" for word in row) for row in words]
+
+
+def generate_metadata(n: int, market_share: float = 0.1, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate chunk metadata with a given share of market analysis chunks.
+
+    Args:
+        n: Number of chunks
+        market_share: Fraction of chunks with document_type 'market_analysis'
+        seed: Random seed
+
+    Returns:
+        List of metadata dictionaries
+    """
+    rng = np.random.default_rng(seed)
+    is_market = rng.random(n) < market_share
+    faq_pick = rng.integers(0, 2, size=n)
+    counters: Dict[str, int] = {}
+    metadata = []
+    for i in range(n):
+        name, source, doc_type = DOCUMENT_LAYOUT[2] if is_market[i] else DOCUMENT_LAYOUT[faq_pick[i]]
+        chunk_index = counters.get(name, 0)
+        counters[name] = chunk_index + 1
+        metadata.append({
+            "chunk_index": chunk_index,
+            "source": source,
+            "document_name": name,
+            "document_type": doc_type,
+        })
+    return metadata
+
+
+class SyntheticEmbedder:
+    """Deterministic, network-free stand-in for Embedder used by benchmarks."""
+
+    def __init__(self, dimension: int = 1536, model: str = "synthetic"):
+        self.dimension = dimension
+        self.model = model
+        self.backend = "synthetic"
+        self.embeddings = self
+
+    def embed_text(self, text: str) -> List[float]:
+        """Embed a text as a seeded random unit vector."""
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str], checkpoint_dir: Optional[str] = None) -> List[List[float]]:
+        """Embed multiple texts (checkpoint_dir is accepted for interface parity and ignored)."""
+        return [self.embed_text(text) for text in texts]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries."""
+        return self.embed_documents(texts)
+
+
+def read_rss_kb() -> Dict[str, int]:
+    """Read anonymous and file-backed resident memory of this process (Linux only)."""
+    with open("/proc/self/status", 'r') as f:
+        status = f.read()
+    return {
+        name: int(re.search(rf"{name}:\s+(\d+)", status).group(1))
+        for name in ("RssAnon", "RssFile")
+    }
+
+
+def time_calls(func, args_list: List[tuple]) -> np.ndarray:
+    """Call func once per argument tuple and return per-call latencies in milliseconds."""
+    latencies = np.empty(len(args_list), dtype=np.float64)
+    for i, args in enumerate(args_list):
+        start = time.perf_counter()
+        func(*args)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return latencies
+
+
+def latency_summary(latencies_ms: np.ndarray, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Summarise latencies as mean/p50/p95/p99 in milliseconds."""
+    summary = {
+        "mean_ms": float(np.mean(latencies_ms)),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+    if extra:
+        summary.update(extra)
+    return summary
@@ -0,0 +1,91 @@
+"""Benchmark chunk upserts and check that search stays consistent after them.
+
+Builds a synthetic store per index type, saves it with and without the
+full-precision vectors (vectors.npy; stores saved before it existed have
+none), reloads it and times upserts of changed chunks. After the upserts
+every store is checked: its exact vectors must still be row-aligned with
+the index (or be absent), and a re-ranked search must return the upserted
+chunks for their own vectors.
+
+Usage:
+    python benchmarks/upsert.py --size 20000 --upserts 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import SyntheticEmbedder, generate_metadata, generate_texts, generate_vectors
+from src.rag.vectorstore import VectorStore
+
+
+def build_store(path: str, index_type: str, vectors: np.ndarray, texts, keep_vectors: bool) -> VectorStore:
+    """Build, save and reload a store; without keep_vectors its vectors.npy is removed first."""
+    dimension = vectors.shape[1]
+    store = VectorStore(
+        vectorstore_path=path, embedder=SyntheticEmbedder(dimension), dimension=dimension, index_type=index_type
+    )
+    store.create_index(n_vectors=len(vectors))
+    metadatas = generate_metadata(len(vectors))
+    for row, metadata in enumerate(metadatas):
+        metadata["chunk_id"] = f"chunk-{row}"
+    store.add_embeddings(vectors, metadatas, texts=texts)
+    store.save()
+    if not keep_vectors:
+        (store.snapshot_path / "vectors.npy").unlink()
+
+    loaded = VectorStore(vectorstore_path=path, embedder=SyntheticEmbedder(dimension), dimension=dimension)
+    loaded.load()
+    return loaded
+
+
+def main():
+    """Run the upsert benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="Number of vectors in the corpus")
+    parser.add_argument("--dimension", type=int, default=256, help="Vector dimension")
+    parser.add_argument("--upserts", type=int, default=100, help="Chunks upserted, one call each")
+    parser.add_argument("--index-types", nargs="+", default=["flat", "hnsw"], help="Index types to test")
+    args = parser.parse_args()
+
+    vectors = generate_vectors(args.size, args.dimension)
+    texts = generate_texts(args.size)
+    print(f"Corpus: {args.size} vectors x {args.dimension} dims, {args.upserts} upserts\n")
+    header = f"{'index':<6} | {'vectors.npy':>11} | {'p50 ms':>7} | {'p99 ms':>7} | {'exact vectors':>13}"
+    print(header)
+    print("-" * len(header))
+
+    for index_type in args.index_types:
+        for keep_vectors in (True, False):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                store = build_store(tmp_dir, index_type, vectors, texts, keep_vectors)
+                latencies = []
+                for position in range(args.upserts):
+                    chunk = {"chunk_id": f"chunk-{position}", "text": f"updated chunk {position}"}
+                    start = time.perf_counter()
+                    store.upsert([chunk])
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+                assert store.vectors is None or len(store.vectors) == store.index.ntotal, \
+                    "exact vectors are not row-aligned with the index after upserts"
+                query = np.asarray(store.embedder.embed_text("updated chunk 0"), dtype='float32')
+                results = store.search_by_vector(query, k=1, rerank_factor=4)
+                assert results and results[0]["metadata"]["chunk_id"] == "chunk-0", \
+                    "re-ranked search misses an upserted chunk"
+
+                p50, p99 = np.percentile(latencies, [50, 99])
+                aligned = "none" if store.vectors is None else "aligned"
+                print(
+                    f"{index_type:<6} | {'yes' if keep_vectors else 'no':>11} | {p50:>7.2f} | {p99:>7.2f} | "
+                    f"{aligned:>13}"
+                )
+
+
+if __name__ == "__main__":
+    main()
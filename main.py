@@ -4,17 +4,36 @@ This module provides the REST API interface for the stock trading platform.
 It handles chat requests, manages sessions, integrates with Langfuse for
 observability, and invokes the LangGraph workflow to process user queries.
 
+Questions that match a canonical FAQ question (after normalisation) are
+answered directly from the FAQ, without any embedding or LLM call.
+First-turn questions answered by a cacheable agent are kept in a semantic
+answer cache, so paraphrases of the same FAQ are answered without running
+the agent graph.
+
+A background task checks the vector store for newly published snapshots and
+swaps the loaded index between requests, so rebuilds go live without a restart.
+Once turns leave the conversation memory's window, a background task folds
+them into the thread's rolling summary after the response has been sent.
+
 Endpoints:
     GET /: Health check
     POST /chat: Send messages to the agent system
     GET /chat/{session_id}: Retrieve chat history for a session
+    GET /cache/stats: FAQ fast path, semantic answer cache, intent router and conversation memory metrics
+    POST /admin/vectorstore/documents: Upsert and delete vector store chunks
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from contextlib import asynccontextmanager, nullcontext
+from typing import List, Optional
 from pathlib import Path
+import asyncio
+import os
+import secrets
 import sys
+import threading
+import time
 import uuid
 from dotenv import load_dotenv
 
@@ -28,17 +47,51 @@ sys.path.insert(0, str(project_root / "src"))
 
 from langchain_core.messages import HumanMessage
 from src.utils.utils import logger
-from models.models import ChatMessage, ChatRequest, ChatResponse
+from src.rag.registry import DEFAULT_VECTORSTORE_PATH, retrieval_registry
+from src.rag.vectorstore import run_in_search_pool
+from src.rag.answer_cache import SemanticAnswerCache
+from src.rag.faq_index import FAQIndex
+from models.models import (
+    ChatMessage, ChatRequest, ChatResponse, VectorStoreUpdateRequest, VectorStoreUpdateResponse
+)
 from langfuse.langchain import CallbackHandler
 from src.graph.chatgrapgh import research_graph
+from src.nodes.agents import conversation_memory, intent_router
 from src.state import StateDB
 from guardrails import input_guardrails, output_guardrails
 
 
+# Seconds between background checks for a new vector store snapshot
+VECTORSTORE_RELOAD_INTERVAL = float(os.getenv("VECTORSTORE_RELOAD_INTERVAL", "5"))
+
+
+async def reload_vectorstores():
+    """Periodically reload vector stores whose on-disk version changed."""
+    while True:
+        await asyncio.sleep(VECTORSTORE_RELOAD_INTERVAL)
+        try:
+            reloaded = await run_in_search_pool(retrieval_registry.refresh)
+            for path in reloaded:
+                logger.info(f"Vector store at {path} swapped to a new version")
+        except Exception as e:
+            logger.warning(f"Vector store reload check failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the vector store reload task for the lifetime of the app."""
+    reload_task = asyncio.create_task(reload_vectorstores())
+    try:
+        yield
+    finally:
+        reload_task.cancel()
+
+
 app = FastAPI(
     title="Stock Trading Platform Assistant API",
     description="API for interacting with LangGraph-based stock trading platform agent",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -53,6 +106,94 @@ app.add_middleware(
 # SQLite database for state persistence
 state_db = StateDB(db_path="data/db/state.db")
 
+# Semantic cache of first-turn answers (FAQ answers only: task results must never be replayed)
+answer_cache_enabled = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+answer_cache = SemanticAnswerCache(
+    similarity_threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 3600))),
+    cacheable_agents=("faq_agent",)
+)
+
+
+# Direct answers to canonical FAQ questions; the index is rebuilt when the vector store changes
+faq_fast_path_enabled = os.getenv("FAQ_FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+faq_fast_path_threshold = float(os.getenv("FAQ_FAST_PATH_THRESHOLD", "0.85"))
+faq_index: Optional[FAQIndex] = None
+faq_index_version = None
+faq_index_lock = threading.Lock()
+
+
+def match_faq(message: str):
+    """
+    Match a message against the canonical FAQ questions, returning None on a miss or failure.
+
+    Blocking (the version check can reload the vector store and rebuild the
+    index), so /chat runs it on the search pool.
+    """
+    global faq_index, faq_index_version
+    try:
+        version = retrieval_registry.get_store_version()
+        with faq_index_lock:
+            if faq_index is None or version != faq_index_version:
+                faq_index = FAQIndex.from_vectorstore(DEFAULT_VECTORSTORE_PATH, threshold=faq_fast_path_threshold)
+                faq_index_version = version
+                logger.info(f"Built FAQ fast path index with {len(faq_index)} questions")
+            index = faq_index
+        return index.match(message)
+    except Exception as e:
+        logger.warning(f"FAQ fast path unavailable: {e}")
+        return None
+
+
+# Background summary refreshes, referenced until they finish
+summary_tasks = set()
+
+
+def thread_lock(thread_id: str):
+    """Lock serialising a thread's turns with its background summary updates."""
+    return conversation_memory.thread_lock(thread_id) if conversation_memory is not None else nullcontext()
+
+
+def schedule_summary_refresh(thread_id: str, state: dict):
+    """Fold turns that left the memory window into the thread's summary, off the request path."""
+    if conversation_memory is None or not conversation_memory.needs_refresh(state):
+        return
+    task = asyncio.create_task(
+        conversation_memory.refresh(research_graph, {"configurable": {"thread_id": thread_id}})
+    )
+    summary_tasks.add(task)
+    task.add_done_callback(summary_tasks.discard)
+
+
+async def record_direct_answer(config: dict, user_message: str, answer: str, agent: str):
+    """Record a turn answered without running the graph, so follow-up questions keep their context."""
+    async with thread_lock(config["configurable"]["thread_id"]):
+        await research_graph.aupdate_state(
+            config,
+            {
+                "messages": [
+                    HumanMessage(content=user_message),
+                    HumanMessage(content=answer, name=agent)
+                ],
+                "next": "FINISH",
+                "response": answer
+            },
+            as_node="supervisor"
+        )
+
+
+async def embed_for_answer_cache(message: str):
+    """Embed a message for the answer cache, returning None if embedding fails."""
+    try:
+        # Both can reload the vector store, so they run on the search pool
+        store, version = await run_in_search_pool(
+            lambda: (retrieval_registry.get_vectorstore(), retrieval_registry.get_store_version())
+        )
+        return await store.embedder.aembed_text(message), version
+    except Exception as e:
+        logger.warning(f"Answer cache unavailable: {e}")
+        return None
+
 
 @app.get("/")
 async def root():
@@ -92,6 +233,7 @@ async def chat(request: ChatRequest):
         
         # Get or create thread_id for this session
         thread_id = state_db.get_thread_id(session_id)
+        first_turn = not thread_id
         if not thread_id:
             thread_id = str(uuid.uuid4())
             state_db.create_session(session_id, thread_id)
@@ -101,6 +243,28 @@ async def chat(request: ChatRequest):
         
         config = {"configurable": {"thread_id": thread_id}}
         
+        # Answer canonical FAQ questions straight from the FAQ
+        faq_match = await run_in_search_pool(match_faq, user_message) if faq_fast_path_enabled else None
+        if faq_match is not None:
+            logger.info(
+                f"FAQ fast path {faq_match['match']} match for session {session_id} "
+                f"(similarity {faq_match['similarity']:.3f} to '{faq_match['question']}')"
+            )
+            await record_direct_answer(config, user_message, faq_match["answer"], "faq_agent")
+            return build_chat_response(session_id, user_message, faq_match["answer"], "faq_agent")
+        
+        # Answer first-turn paraphrases of previously answered questions from the cache
+        cache_key = await embed_for_answer_cache(user_message) if first_turn and answer_cache_enabled else None
+        if cache_key is not None:
+            cached = answer_cache.lookup(*cache_key)
+            if cached is not None:
+                logger.info(
+                    f"Answer cache hit for session {session_id} "
+                    f"(similarity {cached['similarity']:.3f} to '{cached['question']}')"
+                )
+                await record_direct_answer(config, user_message, cached["answer"], cached["agent"])
+                return build_chat_response(session_id, user_message, cached["answer"], cached["agent"])
+        
         try:
             handler = CallbackHandler()
             config["callbacks"] = [handler]
@@ -109,28 +273,32 @@ async def chat(request: ChatRequest):
         except Exception as e:
             logger.error(f"Failed to initialize Langfuse: {e}", exc_info=True)
         
-        # Get existing messages or start fresh
-        current_messages = [HumanMessage(content=user_message)]
-        try:
-            existing_state = await research_graph.aget_state(config)
-            if existing_state and existing_state.values:
-                existing_messages = existing_state.values.get("messages", [])
-                current_messages = existing_messages + [HumanMessage(content=user_message)]
-        except (KeyError, AttributeError, ValueError) as e:
-            logger.debug(f"No existing state found or invalid state: {e}")
-        
-        # Invoke graph
+        # Invoke graph with the new message only; the checkpointer appends it to the thread's history
         initial_state = {
-            "messages": current_messages,
+            "messages": [HumanMessage(content=user_message)],
             "next": "supervisor",
-            "response": ""
+            "response": "",
+            "handoff": None
         }
-        result = await research_graph.ainvoke(initial_state, config)
+        async with thread_lock(thread_id):
+            result = await research_graph.ainvoke(initial_state, config)
+        schedule_summary_refresh(thread_id, result)
         
         # Extract response
         response_text = result.get("response", "")
         agent_used = None
         
+        # Agents that answered this turn (messages from earlier turns are never from a first turn)
+        turn_agents = []
+        if first_turn:
+            for msg in reversed(result.get("messages", [])):
+                if not (getattr(msg, "name", None) and msg.name.endswith("_agent")):
+                    break
+                turn_agents.append(msg.name)
+        # After a handoff the response joins several agents' answers; cache it only if all of them are cacheable
+        answering_agent = turn_agents[0] if turn_agents else None
+        cacheable_turn = bool(turn_agents) and all(agent in answer_cache.cacheable_agents for agent in turn_agents)
+        
         if not response_text and result.get("messages"):
             # Only use agent messages, not user messages
             for msg in reversed(result["messages"]):
@@ -152,30 +320,123 @@ async def chat(request: ChatRequest):
             elif output_validation.sanitized_output:
                 logger.info(f"Output sanitized for session {session_id}")
                 response_text = output_validation.sanitized_output
+        elif cache_key is not None and cacheable_turn:
+            answer_cache.add(user_message, cache_key[0], response_text, answering_agent, cache_key[1])
         
-        # Save messages to database
-        state_db.add_message(session_id, "user", user_message)
-        state_db.add_message(session_id, "assistant", response_text, agent_used or "supervisor")
-        
-        # Get all messages for response
-        db_messages = state_db.get_messages(session_id)
-        chat_messages = [
-            ChatMessage(role=msg["role"], content=msg["content"], agent=msg.get("agent"))
-            for msg in db_messages
-        ]
-        
-        return ChatResponse(
-            response=response_text,
-            session_id=session_id,
-            agent=agent_used or "supervisor",
-            messages=chat_messages
-        )
+        return build_chat_response(session_id, user_message, response_text, agent_used)
         
     except Exception as e:
         logger.error(f"Error processing chat: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
 
+def build_chat_response(session_id: str, user_message: str, response_text: str, agent_used: str = None) -> ChatResponse:
+    """Save a chat turn to the database and build the chat response.
+    
+    Args:
+        session_id: Session identifier
+        user_message: User message of this turn
+        response_text: Assistant response of this turn
+        agent_used: Agent that produced the response
+    
+    Returns:
+        Chat response with the session's full message history
+    """
+    # Save messages to database
+    state_db.add_message(session_id, "user", user_message)
+    state_db.add_message(session_id, "assistant", response_text, agent_used or "supervisor")
+    
+    # Get all messages for response
+    db_messages = state_db.get_messages(session_id)
+    chat_messages = [
+        ChatMessage(role=msg["role"], content=msg["content"], agent=msg.get("agent"))
+        for msg in db_messages
+    ]
+    
+    return ChatResponse(
+        response=response_text,
+        session_id=session_id,
+        agent=agent_used or "supervisor",
+        messages=chat_messages
+    )
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get FAQ fast path, semantic answer cache, intent router and conversation memory metrics.
+    
+    Returns:
+        Hit/miss counters, hit rate and number of cached answers, the
+        FAQ fast path counters under "faq_fast_path", the supervisor's
+        local routing counters under "intent_router" and the prompt tokens
+        saved by the bounded conversation window under "conversation_memory"
+    """
+    faq_stats = faq_index.get_stats() if faq_index is not None else {}
+    router_stats = intent_router.get_stats() if intent_router is not None else {}
+    memory_stats = conversation_memory.get_stats() if conversation_memory is not None else {}
+    return {
+        "enabled": answer_cache_enabled,
+        **answer_cache.get_stats(),
+        "faq_fast_path": {"enabled": faq_fast_path_enabled, **faq_stats},
+        "intent_router": {"enabled": intent_router is not None, **router_stats},
+        "conversation_memory": {"enabled": conversation_memory is not None, **memory_stats},
+    }
+
+
+@app.post("/admin/vectorstore/documents", response_model=VectorStoreUpdateResponse)
+async def update_vectorstore_documents(
+    request: VectorStoreUpdateRequest,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    Upsert and delete chunks of the live vector store by stable chunk id.
+    
+    Only new and changed chunks are embedded. The update is published as a new
+    snapshot and swapped in without interrupting searches. Requires the
+    X-Admin-Token header to match ADMIN_API_TOKEN; the endpoint is disabled
+    when ADMIN_API_TOKEN is not set.
+    
+    Args:
+        request: Chunks to upsert and chunk ids to delete
+        x_admin_token: Admin token header
+    
+    Returns:
+        Counts of inserted, updated, unchanged and deleted chunks and the new version
+    """
+    admin_token = os.getenv("ADMIN_API_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Vector store admin API is disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    
+    chunks = []
+    for chunk in request.upsert:
+        fields = {**chunk.metadata, "chunk_id": chunk.chunk_id, "text": chunk.text}
+        if chunk.document_type:
+            fields["document_type"] = chunk.document_type
+        chunks.append(fields)
+    
+    def apply(store):
+        summary = store.upsert(chunks) if chunks else {}
+        summary["deleted"] = store.delete(request.delete) if request.delete else 0
+        return summary
+    
+    start = time.perf_counter()
+    try:
+        summary, version = await run_in_search_pool(retrieval_registry.update_vectorstore, apply)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Vector store updated to version {version}: {summary}")
+    return VectorStoreUpdateResponse(
+        version=version,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+        **summary
+    )
+
+
 @app.get("/chat/{session_id}", response_model=List[ChatMessage])
 async def get_chat_history(session_id: str):
     """
@@ -2,12 +2,13 @@
 
 This module defines all Pydantic data models used throughout the application:
 - API request/response models (ChatMessage, ChatRequest, ChatResponse)
+- Vector store admin models (ChunkUpsert, VectorStoreUpdateRequest, VectorStoreUpdateResponse)
 - Evaluation models (EvaluationMetrics, AggregateMetrics, EvaluationScores)
 - RAG extraction models (QAPair, FAQExtraction)
 - Guardrail models (GuardrailResult)
 """
 
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 from pydantic import BaseModel, Field
 
 
@@ -72,6 +73,30 @@ class ChatResponse(BaseModel):
     messages: List[ChatMessage] = []
 
 
+class ChunkUpsert(BaseModel):
+    """Chunk to insert or replace in the vector store."""
+    chunk_id: str
+    text: str
+    document_type: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class VectorStoreUpdateRequest(BaseModel):
+    """Chunks to upsert and chunk ids to delete in one vector store update."""
+    upsert: List[ChunkUpsert] = Field(default_factory=list)
+    delete: List[str] = Field(default_factory=list)
+
+
+class VectorStoreUpdateResponse(BaseModel):
+    """Result of a vector store update."""
+    version: int
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    elapsed_ms: float
+
+
 class QAPair(BaseModel):
     """Q&A pair structure."""
     question: str
@@ -3,26 +3,158 @@
 This script processes chunked documents from YAML files and builds a FAISS
 vector store for efficient similarity search. It supports multiple document
 types (FAQ, user guide, market analysis) and saves the index for use in RAG.
+
+Usage:
+    python scripts/build_vectorstore.py [--index-type flat|ivf_flat|ivf_pq|hnsw]
+                                        [--quantization none|fp16|sq8|pq] [--rerank-factor N]
+                                        [--incremental] [--checkpoint] [--batch-size N] [--max-concurrency N]
+                                        [--embedding-backend openai|hashing|sentence_transformers]
+                                        [--text-compression none|zstd] [--backfill-texts]
+                                        [--keep-versions N] [--list-versions] [--rollback [VERSION]]
+                                        [--shards N] [--shard-by hash|document_type]
 """
 
+import argparse
 from pathlib import Path
 import sys
 from dotenv import load_dotenv
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.rag.embedder import Embedder
+from src.rag.embedding_backends import EMBEDDING_BACKENDS
 from src.rag.vectorstore import VectorStore
+from src.rag.index_factory import INDEX_TYPES, QUANTIZATIONS
+from src.rag.text_store import COMPRESSIONS
+from src.rag.snapshots import read_current
+from src.rag.sharding import PARTITIONS, build_shards, read_shard_manifest, remove_shard_manifest
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the FAISS vector store from chunk YAML files.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Reuse embeddings of unchanged chunks from the existing store and embed only new or changed ones"
+    )
+    parser.add_argument(
+        "--embedding-backend", choices=EMBEDDING_BACKENDS,
+        help="Embedding backend (default: EMBEDDING_BACKEND or openai); hashing and sentence_transformers run offline"
+    )
+    parser.add_argument("--embedding-model", help="Embedding model name or local model path (default: backend default)")
+    parser.add_argument("--embedding-dimension", type=int, help="Output dimension of the hashing backend")
+    parser.add_argument(
+        "--text-compression", choices=COMPRESSIONS, default="none",
+        help="Chunk text storage (zstd requires the zstandard package)"
+    )
+    parser.add_argument(
+        "--backfill-texts", action="store_true",
+        help="Only write chunk texts and the keyword index of the existing store, without re-embedding"
+    )
+    parser.add_argument("--keep-versions", type=int, default=3, help="Saved snapshots retained for rollback")
+    parser.add_argument("--list-versions", action="store_true", help="List the saved snapshots and exit")
+    parser.add_argument(
+        "--rollback", nargs="?", type=int, const=0, metavar="VERSION",
+        help="Make a saved snapshot current (default: the one before the current) and exit"
+    )
+    parser.add_argument(
+        "--shards", type=int,
+        help="Split the store into N shards searched in parallel by worker processes "
+             "(default: keep the existing sharding; 0 removes it)"
+    )
+    parser.add_argument(
+        "--shard-by", choices=PARTITIONS,
+        help="Shard partitioning (default: the existing one, or hash)"
+    )
+    parser.add_argument("--batch-size", type=int, default=100, help="Texts per embedding request")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Embedding requests in flight")
+    parser.add_argument(
+        "--checkpoint", action="store_true",
+        help="Checkpoint completed embedding batches so an interrupted build resumes where it stopped"
+    )
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat", help="FAISS index type")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="none", help="Vector storage inside the index")
+    parser.add_argument(
+        "--rerank-factor", type=int, default=0,
+        help="Default exact re-ranking oversampling factor for quantized indexes (0 disables)"
+    )
+    parser.add_argument("--nlist", type=int, help="IVF lists (default: ~4 * sqrt(n))")
+    parser.add_argument("--nprobe", type=int, help="Default IVF lists probed per query")
+    parser.add_argument("--pq-m", type=int, help="PQ sub-quantizers (must divide the dimension)")
+    parser.add_argument("--pq-nbits", type=int, help="Bits per PQ code")
+    parser.add_argument("--hnsw-m", type=int, help="HNSW neighbours per node")
+    parser.add_argument("--ef-construction", type=int, help="HNSW build-time candidate list size")
+    parser.add_argument("--ef-search", type=int, help="Default HNSW query-time candidate list size")
+    return parser.parse_args()
+
+
+def update_shards(vectorstore: VectorStore, args: argparse.Namespace):
+    """Re-shard the saved store as requested, or with the settings of its existing shards."""
+    manifest = read_shard_manifest(vectorstore.vectorstore_path)
+    if args.shards == 0:
+        if remove_shard_manifest(vectorstore.vectorstore_path):
+            print("✓ Removed shard manifest, the store is served unsharded")
+        return
+    n_shards = args.shards or (manifest["n_shards"] if manifest else None)
+    if n_shards is None:
+        return
+    partition = args.shard_by or (manifest["partition"] if manifest else "hash")
+    build_shards(vectorstore, n_shards, partition)
 
 
 def main():
     """Build vector store from chunks."""
+    args = parse_args()
     load_dotenv()
     base_path = Path(__file__).parent.parent / "data" / "documents"
     chunks_path = base_path / "chunks"
     vectorstore_path = Path(__file__).parent.parent / "data" / "vectorstore"
     
     # Initialize vector store
-    vectorstore = VectorStore(vectorstore_path=str(vectorstore_path))
+    index_params = {
+        name: value
+        for name, value in {
+            "nlist": args.nlist,
+            "nprobe": args.nprobe,
+            "pq_m": args.pq_m,
+            "pq_nbits": args.pq_nbits,
+            "hnsw_m": args.hnsw_m,
+            "ef_construction": args.ef_construction,
+            "ef_search": args.ef_search,
+        }.items()
+        if value is not None
+    }
+    vectorstore = VectorStore(
+        vectorstore_path=str(vectorstore_path),
+        embedder=Embedder(
+            model_name=args.embedding_model,
+            backend=args.embedding_backend,
+            dimension=args.embedding_dimension,
+            batch_size=args.batch_size,
+            max_concurrency=args.max_concurrency
+        ),
+        index_type=args.index_type,
+        index_params=index_params,
+        quantization=args.quantization,
+        rerank_factor=args.rerank_factor,
+        text_compression=args.text_compression,
+        keep_versions=args.keep_versions
+    )
+    
+    if args.list_versions:
+        current = read_current(vectorstore_path)
+        for name in vectorstore.list_versions():
+            print(f"{'*' if name == current else ' '} {name}")
+        return
+    
+    if args.rollback is not None:
+        name = vectorstore.rollback(args.rollback or None)
+        print(f"✓ Current vector store version: {name}")
+        if read_shard_manifest(vectorstore_path) is not None:
+            # Shards are derived from a snapshot, so re-shard the rolled-back one
+            vectorstore.load()
+            update_shards(vectorstore, args)
+        return
     
     # Define document configurations
     document_configs = [
@@ -43,15 +175,27 @@ def main():
         }
     ]
     
+    if args.backfill_texts:
+        print("Backfilling chunk texts...")
+        vectorstore.load()
+        vectorstore.backfill_texts(str(chunks_path), document_configs)
+        vectorstore.save()
+        update_shards(vectorstore, args)
+        print(f"\n✓ Chunk texts saved to: {vectorstore.snapshot_path / 'texts'}")
+        return
+    
     print("Building vector store...")
     
     # Build from chunks
-    vectorstore.build_from_chunks(str(chunks_path), document_configs)
+    vectorstore.build_from_chunks(
+        str(chunks_path), document_configs, incremental=args.incremental, checkpoint=args.checkpoint
+    )
     
     # Save vector store
     vectorstore.save()
+    update_shards(vectorstore, args)
     
-    print(f"\n✓ Vector store saved to: {vectorstore_path}")
+    print(f"\n✓ Vector store saved to: {vectorstore.snapshot_path}")
     print(f"  Total documents: {len(vectorstore.metadata)}")
 
 
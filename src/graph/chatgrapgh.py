@@ -3,12 +3,25 @@
 This module defines the main LangGraph workflow that orchestrates multiple
 specialized agents (FAQ, Task, Market Insights) through a supervisor pattern.
 The graph routes requests to appropriate agents and manages conversation state.
+
+Agent nodes are registered with both their sync and async implementations:
+graph.invoke (scripts) runs the sync ones, while graph.ainvoke (the API)
+awaits the async ones, so in-flight LLM calls do not hold threads.
+
+By default an agent's answer ends the turn directly; the supervisor only
+runs again when the agent handed the request to another agent. With
+direct_finish=False, every agent returns to the supervisor, which then
+finishes the turn (one more node run and checkpoint per turn).
 """
 
 from typing import TypedDict, Literal
 from langgraph.graph import StateGraph, END, START
 from langgraph.checkpoint.memory import MemorySaver
-from ..nodes.agents import faq_node, task_node, market_insights_node, research_supervisor_node
+from langchain_core.runnables import RunnableLambda
+from ..nodes.agents import (
+    faq_node, afaq_node, task_node, atask_node, market_insights_node, amarket_insights_node,
+    research_supervisor_node,
+)
 from .state import State
 
 
@@ -37,33 +50,69 @@ def route_supervisor(state: State) -> str:
         return END
 
 
-research_builder = StateGraph(State)
-research_builder.add_node("supervisor", research_supervisor_node)
-research_builder.add_node("faq_agent", faq_node)
-research_builder.add_node("task_agent", task_node)
-research_builder.add_node("market_insights_agent", market_insights_node)
-
-# Set entry point
-research_builder.add_edge(START, "supervisor")
+def route_agent(state: State) -> str:
+    """Route after an agent answered: back to the supervisor for a handoff, else END.
+    
+    Args:
+        state: Current graph state
+        
+    Returns:
+        "supervisor" or END
+    """
+    return "supervisor" if state.get("handoff") else END
 
-# Add conditional edge from supervisor to agents or END
-research_builder.add_conditional_edges(
-    "supervisor",
-    route_supervisor,
-    {
-        "faq_agent": "faq_agent",
-        "task_agent": "task_agent",
-        "market_insights_agent": "market_insights_agent",
-        END: END,
-    }
-)
 
-# All agents return to supervisor
-research_builder.add_edge("faq_agent", "supervisor")
-research_builder.add_edge("task_agent", "supervisor")
-research_builder.add_edge("market_insights_agent", "supervisor")
+def build_research_graph(async_nodes: bool = True, checkpointer=None, direct_finish: bool = True):
+    """Build and compile the supervisor graph.
+    
+    Args:
+        async_nodes: Register the async node implementations next to the sync ones
+            (False gives sync-only nodes, which graph.ainvoke runs on worker threads)
+        checkpointer: Checkpointer for conversation state (a new MemorySaver if None)
+        direct_finish: End the turn when an agent answers without a handoff
+            (False routes every answer back through the supervisor)
+        
+    Returns:
+        Compiled graph
+    """
+    def node(func, afunc, name: str) -> RunnableLambda:
+        return RunnableLambda(func, afunc=afunc if async_nodes else None, name=name)
+    
+    research_builder = StateGraph(State)
+    research_builder.add_node(
+        "supervisor",
+        research_supervisor_node if async_nodes else RunnableLambda(research_supervisor_node.func, name="supervisor")
+    )
+    research_builder.add_node("faq_agent", node(faq_node, afaq_node, "faq_agent"))
+    research_builder.add_node("task_agent", node(task_node, atask_node, "task_agent"))
+    research_builder.add_node(
+        "market_insights_agent", node(market_insights_node, amarket_insights_node, "market_insights_agent")
+    )
+    
+    # Set entry point
+    research_builder.add_edge(START, "supervisor")
+    
+    # Add conditional edge from supervisor to agents or END
+    research_builder.add_conditional_edges(
+        "supervisor",
+        route_supervisor,
+        {
+            "faq_agent": "faq_agent",
+            "task_agent": "task_agent",
+            "market_insights_agent": "market_insights_agent",
+            END: END,
+        }
+    )
+    
+    # Agents finish the turn, or return to the supervisor for a handoff
+    for agent in ("faq_agent", "task_agent", "market_insights_agent"):
+        if direct_finish:
+            research_builder.add_conditional_edges(agent, route_agent, {"supervisor": "supervisor", END: END})
+        else:
+            research_builder.add_edge(agent, "supervisor")
+    
+    # Compile with checkpointer for state management
+    return research_builder.compile(checkpointer=checkpointer or MemorySaver())
 
 
-# Compile with checkpointer for state management
-checkpointer = MemorySaver()
-research_graph = research_builder.compile(checkpointer=checkpointer)
\ No newline at end of file
+research_graph = build_research_graph()
@@ -0,0 +1,261 @@
+"""Conversation memory module.
+
+This module provides the ConversationMemory class, which bounds the
+conversation history sent to the supervisor and agents. The last
+window_turns turns (a user message and the agent answers that followed it)
+are sent verbatim, trimmed to max_window_tokens. Older turns are folded into
+a rolling summary stored with the thread state ("summary", covering the
+first "summary_upto" messages) and sent as a system message in front of the
+window. While the older turns still fit the token budget, all turns not yet
+summarised are sent verbatim, so nothing drops out of the prompt before the
+summary covers it.
+
+The summary is refreshed off the request path: after a turn, the API starts
+refresh() in the background once the turns that left the window reach
+summary_trigger_tokens. The summary LLM call runs without holding the
+thread; only the state update is serialised with the thread's turns through
+thread_lock(). Token counts are cached per message id, so a turn only counts
+its new messages. Prompt tokens sent versus the full history are counted for
+the savings metric.
+"""
+
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from ..rag.context_packer import count_tokens
+from ..utils.utils import load_prompt_yaml, logger
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def is_user_message(message: BaseMessage) -> bool:
+    """Whether a message is from the user (agent answers are HumanMessages carrying the agent's name)."""
+    return isinstance(message, HumanMessage) and not message.name
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Token count of a message's text content."""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return count_tokens(content)
+
+
+class ConversationMemory:
+    """Sliding window of recent turns plus a rolling summary of older ones."""
+
+    def __init__(
+        self,
+        llm: Optional[BaseChatModel] = None,
+        window_turns: int = 6,
+        max_window_tokens: int = 3000,
+        summary_trigger_tokens: int = 300,
+        max_cached_counts: int = 50000
+    ):
+        """
+        Initialize conversation memory.
+
+        Args:
+            llm: Model writing the rolling summary (no summaries without one)
+            window_turns: Most recent turns sent verbatim
+            max_window_tokens: Token budget of the verbatim messages (the current turn is always kept)
+            summary_trigger_tokens: Tokens of not yet summarised turns outside the window that
+                trigger a summary refresh
+            max_cached_counts: Maximum per-message token counts kept
+        """
+        self.llm = llm
+        self.window_turns = window_turns
+        self.max_window_tokens = max_window_tokens
+        self.summary_trigger_tokens = summary_trigger_tokens
+        self.max_cached_counts = max_cached_counts
+        self._summary_prompt = load_prompt_yaml("memory_summary")
+
+        # Locks are only kept alive by the coroutines using them
+        self._thread_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._refreshing: set = set()
+        self._token_counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "prompts": 0, "history_tokens": 0, "prompt_tokens": 0, "summaries": 0, "summary_failures": 0
+        }
+
+    def token_counts(self, messages: List[BaseMessage]) -> List[int]:
+        """
+        Token counts of messages, cached by message id.
+
+        Args:
+            messages: Thread messages
+
+        Returns:
+            Token count of every message, in order
+        """
+        counts = []
+        with self._lock:
+            for message in messages:
+                count = self._token_counts.get(message.id) if message.id else None
+                if count is None:
+                    count = message_tokens(message)
+                    if message.id:
+                        self._token_counts[message.id] = count
+                        if len(self._token_counts) > self.max_cached_counts:
+                            self._token_counts.popitem(last=False)
+                else:
+                    self._token_counts.move_to_end(message.id)
+                counts.append(count)
+        return counts
+
+    def window_start(self, messages: List[BaseMessage], counts: Optional[List[int]] = None) -> int:
+        """
+        Index of the first message of the verbatim window.
+
+        Args:
+            messages: Thread messages, oldest first
+            counts: Token counts of the messages (counted if None)
+
+        Returns:
+            Start of the last window_turns turns, moved forward by whole turns
+            while the window exceeds max_window_tokens
+        """
+        counts = self.token_counts(messages) if counts is None else counts
+        turn_starts = [position for position, message in enumerate(messages) if is_user_message(message)]
+        if not turn_starts or turn_starts[0] != 0:
+            turn_starts.insert(0, 0)
+        candidates = turn_starts[-self.window_turns:] if self.window_turns > 0 else turn_starts[-1:]
+        tokens = sum(counts[candidates[0]:])
+        for start, next_start in zip(candidates, candidates[1:]):
+            if tokens <= self.max_window_tokens:
+                return start
+            tokens -= sum(counts[start:next_start])
+        return candidates[-1]
+
+    def prompt_messages(self, state: Dict[str, Any]) -> List[BaseMessage]:
+        """
+        Messages to send to an LLM for a thread state.
+
+        Args:
+            state: Graph state with messages and, once summarised, summary and summary_upto
+
+        Returns:
+            The summary as a system message (if any) followed by the verbatim messages
+        """
+        messages = state.get("messages", [])
+        summary = state.get("summary") or ""
+        summary_upto = min(state.get("summary_upto") or 0, len(messages))
+        counts = self.token_counts(messages)
+
+        if sum(counts[summary_upto:]) <= self.max_window_tokens:
+            start = summary_upto
+        else:
+            start = max(self.window_start(messages, counts), summary_upto)
+        summary_messages = [SystemMessage(content=SUMMARY_PREFIX + summary)] if summary and summary_upto else []
+        prompt = summary_messages + messages[start:]
+
+        with self._lock:
+            self._stats["prompts"] += 1
+            self._stats["history_tokens"] += sum(counts)
+            self._stats["prompt_tokens"] += sum(counts[start:]) + sum(
+                message_tokens(message) for message in summary_messages
+            )
+        return prompt
+
+    def needs_refresh(self, state: Dict[str, Any]) -> bool:
+        """Whether enough turns have left the window unsummarised to refresh the summary."""
+        if self.llm is None:
+            return False
+        messages = state.get("messages", [])
+        summary_upto = state.get("summary_upto") or 0
+        counts = self.token_counts(messages)
+        return sum(counts[summary_upto:self.window_start(messages, counts)]) >= self.summary_trigger_tokens
+
+    def thread_lock(self, thread_id: str) -> asyncio.Lock:
+        """Lock serialising a thread's turns and summary updates."""
+        lock = self._thread_locks.get(thread_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._thread_locks[thread_id] = lock
+        return lock
+
+    async def summarize(self, summary: str, messages: List[BaseMessage]) -> str:
+        """
+        Fold messages into a rolling summary.
+
+        Args:
+            summary: Current summary ("" for none)
+            messages: Messages to add to it, oldest first
+
+        Returns:
+            Updated summary
+        """
+        transcript = "\n".join(
+            f"{'user' if is_user_message(message) else (message.name or message.type)}: {message.content}"
+            for message in messages
+        )
+        response = await self.llm.ainvoke([
+            SystemMessage(content=self._summary_prompt),
+            HumanMessage(content=f"Current summary:\n{summary or '(none)'}\n\nNew conversation turns:\n{transcript}")
+        ])
+        return response.content.strip()
+
+    async def refresh(self, graph, config: Dict[str, Any]) -> bool:
+        """
+        Fold the turns that left the window into the thread's summary.
+
+        Meant to run as a background task after a turn; at most one refresh runs per thread.
+
+        Args:
+            graph: Compiled graph holding the thread's state
+            config: Config with the thread_id
+
+        Returns:
+            True if the summary was updated
+        """
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            if thread_id in self._refreshing:
+                return False
+            self._refreshing.add(thread_id)
+        try:
+            values = (await graph.aget_state(config)).values
+            messages = values.get("messages", [])
+            summary_upto = values.get("summary_upto") or 0
+            window_start = self.window_start(messages)
+            if window_start <= summary_upto:
+                return False
+            summary = await self.summarize(values.get("summary") or "", messages[summary_upto:window_start])
+
+            async with self.thread_lock(thread_id):
+                # Messages are only ever appended, so the summarised prefix is still valid
+                await graph.aupdate_state(
+                    {"configurable": {"thread_id": thread_id}},
+                    {"summary": summary, "summary_upto": window_start, "next": "FINISH"},
+                    as_node="supervisor"
+                )
+            with self._lock:
+                self._stats["summaries"] += 1
+            logger.info(f"Summarised {window_start - summary_upto} messages of thread {thread_id}")
+            return True
+        except Exception as e:
+            with self._lock:
+                self._stats["summary_failures"] += 1
+            logger.warning(f"Conversation summary refresh failed for thread {thread_id}: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._refreshing.discard(thread_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prompt and history token totals, the tokens saved and the summary counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["saved_tokens"] = stats["history_tokens"] - stats["prompt_tokens"]
+        stats["saved_ratio"] = round(stats["saved_tokens"] / stats["history_tokens"], 4) if stats["history_tokens"] else 0.0
+        stats.update({
+            "window_turns": self.window_turns,
+            "max_window_tokens": self.max_window_tokens,
+            "summary_trigger_tokens": self.summary_trigger_tokens,
+        })
+        return stats
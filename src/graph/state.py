@@ -2,18 +2,26 @@
 
 This module defines the State class that represents the shared state structure
 used throughout the LangGraph workflow. The state includes messages, routing
-information, and response data.
+information, response data and an agent's pending handoff request. Messages
+are merged with the add_messages reducer, so nodes and callers only pass the
+messages they add and each checkpoint step stores only its new messages.
+Older turns are folded into a rolling summary (see memory.py), stored as
+summary and summary_upto.
 """
 
-from langgraph.graph import MessagesState
+from langgraph.graph import MessagesState, add_messages
 from pydantic import Field
+from typing import Annotated, Optional
 from langchain_core.messages import BaseMessage
 
 
 class State(MessagesState):
     """State for the supervisor node. MessagesState already provides the messages field."""
     next: str
-    messages: list[BaseMessage] = Field(default_factory=list, description="Message to the user and assistant in a list of messages")
+    messages: Annotated[list[BaseMessage], add_messages] = Field(default_factory=list, description="Message to the user and assistant in a list of messages")
     response: str = Field(description="Response to the user")
+    handoff: Optional[str] = Field(default=None, description="Agent another agent handed the request to")
+    summary: str = Field(default="", description="Rolling summary of the turns before summary_upto")
+    summary_upto: int = Field(default=0, description="Number of leading messages covered by the summary")
 
    
\ No newline at end of file
@@ -5,17 +5,24 @@ This module creates and configures three specialized agents:
 - Task Agent: Executes trading operations (buy/sell stocks and options, clear positions, set price alerts)
 - Market Insights Agent: Provides market analysis using RAG and web search
 
-Each agent is implemented as a LangGraph node function that processes
-state and returns updated state with agent responses.
+Each agent is implemented as a pair of LangGraph node functions (sync for
+graph.invoke, async for graph.ainvoke) that process state and return
+updated state with agent responses. It also creates the conversation memory
+and the supervisor's local intent router.
 """
 
+import os
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import ToolNode
 from .supervisor import make_supervisor_node
+from .intent_router import IntentRouter
+from ..rag.registry import DEFAULT_VECTORSTORE_PATH
 from ..graph.state import State
+from ..graph.memory import ConversationMemory
+from ..tools.handoff_tool import HANDOFF_AGENTS, HANDOFF_TOOL_NAME
 from ..tools.trading_tools import buy_stock, sell_stock, buy_options, sell_options, clear_positions, stock_price_alert
 from ..utils.utils import load_prompt_yaml, logger
 
@@ -27,13 +34,79 @@ TASK_AGENT_PROMPT = load_prompt_yaml("agents.task_agent")
 MARKET_INSIGHTS_AGENT_PROMPT = load_prompt_yaml("agents.market_insights_agent")
 
 
-# Create agents
-from ..tools import faq_rag_tool, market_analysis_rag_tool, web_search_tool
+def create_conversation_memory() -> ConversationMemory | None:
+    """Create the conversation memory, or return None when it is disabled (full history in every prompt)."""
+    if os.getenv("CONVERSATION_MEMORY_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ConversationMemory(
+        llm,
+        window_turns=int(os.getenv("CONVERSATION_MEMORY_WINDOW_TURNS", "6")),
+        max_window_tokens=int(os.getenv("CONVERSATION_MEMORY_MAX_WINDOW_TOKENS", "3000")),
+        summary_trigger_tokens=int(os.getenv("CONVERSATION_MEMORY_SUMMARY_TRIGGER_TOKENS", "300"))
+    )
+
+
+conversation_memory = create_conversation_memory()
+
+
+def agent_input(state: State) -> dict:
+    """Input of an agent: the bounded conversation window, or the full history without memory."""
+    if conversation_memory is None:
+        return {"messages": state.get("messages", [])}
+    return {"messages": conversation_memory.prompt_messages(state)}
+
+
+def requested_handoff(agent_state: dict, result: dict, agent_name: str) -> str | None:
+    """Agent the agent handed the request to with the handoff tool during this run, if any."""
+    new_messages = result.get("messages", [])[len(agent_state["messages"]):]
+    for message in reversed(new_messages):
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            target = tool_call.get("args", {}).get("agent")
+            if tool_call.get("name") == HANDOFF_TOOL_NAME and target in HANDOFF_AGENTS and target != agent_name:
+                return target
+    return None
+
+
+def agent_update(state: State, agent_state: dict, result: dict, agent_name: str, default_response: str) -> dict:
+    """Build the state update of an agent node from the agent's result.
+    
+    Args:
+        state: Graph state of the node
+        agent_state: Input the agent was invoked with
+        result: Agent result with its messages
+        agent_name: Name recorded on the agent's message
+        default_response: Response used when the agent returned no messages
+        
+    Returns:
+        Update adding the agent's response message (the reducer appends it)
+        and recording a handoff to another agent, if the agent requested one
+    """
+    last_message_content = result["messages"][-1].content if result.get("messages") else default_response
+    
+    existing_messages = state.get("messages", [])
+    agent_message = HumanMessage(content=last_message_content, name=agent_name)
+    
+    # After a handoff, the turn's response holds every agent's answer
+    handed_off = existing_messages and (getattr(existing_messages[-1], "name", None) or "").endswith("_agent")
+    previous_response = state.get("response") if handed_off else None
+    response = f"{previous_response}\n\n{last_message_content}" if previous_response else last_message_content
+    
+    # Return update - the turn ends here unless the agent handed off to another agent
+    return {
+        "messages": [agent_message],
+        "response": response,
+        "handoff": requested_handoff(agent_state, result, agent_name)
+    }
+
+
+# Create agents; without a checkpointer their internal steps are not written into the thread's checkpoints
+from ..tools import faq_rag_tool, market_analysis_rag_tool, web_search_tool, handoff_to_agent
 
 faq_agent = create_agent(
     model=llm,
-    tools=[faq_rag_tool],
-    system_prompt=FAQ_AGENT_PROMPT
+    tools=[faq_rag_tool, handoff_to_agent],
+    system_prompt=FAQ_AGENT_PROMPT,
+    checkpointer=False
 )
 
 def faq_node(state: State, config: RunnableConfig = None) -> dict:
@@ -46,25 +119,23 @@ def faq_node(state: State, config: RunnableConfig = None) -> dict:
     Returns:
         Updated state with agent response
     """
-    invoke_config = config if config else {}
-    result = faq_agent.invoke(state, config=invoke_config)
-    last_message_content = result["messages"][-1].content if result.get("messages") else "FAQ response completed."
-    
-    # Get existing messages and append the agent's response
-    existing_messages = state.get("messages", [])
-    agent_message = HumanMessage(content=last_message_content, name="faq_agent")
-    
-    # Return update - explicit edge will route back to supervisor
-    return {
-        "messages": existing_messages + [agent_message],
-        "response": last_message_content
-    }
+    agent_state = agent_input(state)
+    result = faq_agent.invoke(agent_state, config=config or {})
+    return agent_update(state, agent_state, result, "faq_agent", "FAQ response completed.")
+
+
+async def afaq_node(state: State, config: RunnableConfig = None) -> dict:
+    """Async FAQ agent node, see faq_node."""
+    agent_state = agent_input(state)
+    result = await faq_agent.ainvoke(agent_state, config=config or {})
+    return agent_update(state, agent_state, result, "faq_agent", "FAQ response completed.")
 
 
 task_agent = create_agent(
     model=llm,
-    tools=[sell_stock, buy_stock, sell_options, buy_options, clear_positions, stock_price_alert],
-    system_prompt=TASK_AGENT_PROMPT
+    tools=[sell_stock, buy_stock, sell_options, buy_options, clear_positions, stock_price_alert, handoff_to_agent],
+    system_prompt=TASK_AGENT_PROMPT,
+    checkpointer=False
 )
 
 def task_node(state: State, config: RunnableConfig = None) -> dict:
@@ -77,25 +148,23 @@ def task_node(state: State, config: RunnableConfig = None) -> dict:
     Returns:
         Updated state with agent response
     """
-    invoke_config = config if config else {}
-    result = task_agent.invoke(state, config=invoke_config)
-    last_message_content = result["messages"][-1].content if result.get("messages") else "Task completed."
-    
-    # Get existing messages and append the agent's response
-    existing_messages = state.get("messages", [])
-    agent_message = HumanMessage(content=last_message_content, name="task_agent")
-    
-    # Return update - explicit edge will route back to supervisor
-    return {
-        "messages": existing_messages + [agent_message],
-        "response": last_message_content
-    }
+    agent_state = agent_input(state)
+    result = task_agent.invoke(agent_state, config=config or {})
+    return agent_update(state, agent_state, result, "task_agent", "Task completed.")
+
+
+async def atask_node(state: State, config: RunnableConfig = None) -> dict:
+    """Async task agent node, see task_node."""
+    agent_state = agent_input(state)
+    result = await task_agent.ainvoke(agent_state, config=config or {})
+    return agent_update(state, agent_state, result, "task_agent", "Task completed.")
 
 
 market_insights_agent = create_agent(
     model=llm,
-    tools=[market_analysis_rag_tool, web_search_tool],
-    system_prompt=MARKET_INSIGHTS_AGENT_PROMPT
+    tools=[market_analysis_rag_tool, web_search_tool, handoff_to_agent],
+    system_prompt=MARKET_INSIGHTS_AGENT_PROMPT,
+    checkpointer=False
 )
 
 def market_insights_node(state: State, config: RunnableConfig = None) -> dict:
@@ -108,20 +177,37 @@ def market_insights_node(state: State, config: RunnableConfig = None) -> dict:
     Returns:
         Updated state with agent response
     """
-    invoke_config = config if config else {}
-    result = market_insights_agent.invoke(state, config=invoke_config)
-    last_message_content = result["messages"][-1].content if result.get("messages") else "Market insights analysis completed."
-    
-    # Get existing messages and append the agent's response
-    existing_messages = state.get("messages", [])
-    agent_message = HumanMessage(content=last_message_content, name="market_insights_agent")
-    
-    # Return update - explicit edge will route back to supervisor
-    return {
-        "messages": existing_messages + [agent_message],
-        "response": last_message_content
-    }
-
-
-research_supervisor_node = make_supervisor_node(llm, ["faq_agent", "task_agent", "market_insights_agent"])
+    agent_state = agent_input(state)
+    result = market_insights_agent.invoke(agent_state, config=config or {})
+    return agent_update(state, agent_state, result, "market_insights_agent", "Market insights analysis completed.")
+
+
+async def amarket_insights_node(state: State, config: RunnableConfig = None) -> dict:
+    """Async market insights agent node, see market_insights_node."""
+    agent_state = agent_input(state)
+    result = await market_insights_agent.ainvoke(agent_state, config=config or {})
+    return agent_update(state, agent_state, result, "market_insights_agent", "Market insights analysis completed.")
+
+
+def create_intent_router() -> IntentRouter | None:
+    """Train the supervisor's local intent router, or return None when it is disabled or fails to train."""
+    if os.getenv("INTENT_ROUTER_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    try:
+        router = IntentRouter.from_files(
+            vectorstore_path=DEFAULT_VECTORSTORE_PATH,
+            min_confidence=float(os.getenv("INTENT_ROUTER_MIN_CONFIDENCE", "0.8"))
+        )
+    except Exception as e:
+        logger.warning(f"Intent router unavailable, routing every message with the LLM: {e}")
+        return None
+    logger.info(f"Trained intent router on {router.example_count} examples")
+    return router
+
+
+intent_router = create_intent_router()
+research_supervisor_node = make_supervisor_node(
+    llm, ["faq_agent", "task_agent", "market_insights_agent"],
+    intent_router=intent_router, memory=conversation_memory
+)
 
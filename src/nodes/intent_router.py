@@ -0,0 +1,184 @@
+"""Local intent router for the supervisor.
+
+This module provides the IntentRouter class, a nearest-centroid classifier
+that picks the agent for a user message without an LLM call. Messages are
+normalised (lowercased, numbers replaced, words stemmed) and embedded with
+local feature hashing of word unigrams and bigrams; each agent is the
+L2-normalised mean of its training examples' vectors. The confidence of a
+prediction is the softmax probability of the best agent over the cosine
+similarities to all centroids. The supervisor only routes locally when the
+confidence is high enough and the message is not a short follow-up (such as
+"yes, go ahead"), which needs the conversation to be understood; everything
+else goes to the LLM router.
+
+Training examples are read from data/routing/intent_examples.yaml, and the
+canonical FAQ questions of the vector store are added as faq_agent examples.
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from ..rag.embedding_backends import HashingEmbeddings
+from ..rag.faq_index import load_faq_pairs, stem
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_EXAMPLES_PATH = PROJECT_ROOT / "data" / "routing" / "intent_examples.yaml"
+
+_WORD = re.compile(r"[a-z]+|\d+(?:[.,]\d+)*")
+
+
+def normalize_message(text: str) -> str:
+    """
+    Normalise a message for intent features.
+
+    Args:
+        text: User message
+
+    Returns:
+        Space-separated word stems, with every number replaced by "0"
+    """
+    return " ".join("0" if word[0].isdigit() else stem(word) for word in _WORD.findall(text.lower()))
+
+
+def load_intent_examples(path: Path = DEFAULT_EXAMPLES_PATH) -> List[Tuple[str, str]]:
+    """
+    Read labelled routing examples.
+
+    Args:
+        path: YAML file mapping each agent name to its example messages under "examples"
+
+    Returns:
+        (message, agent) tuples
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    return [
+        (message, agent)
+        for agent, messages in (data.get("examples") or {}).items()
+        for message in messages or []
+    ]
+
+
+class IntentRouter:
+    """Nearest-centroid agent classifier over hashed word features."""
+
+    def __init__(
+        self,
+        examples: List[Tuple[str, str]],
+        min_confidence: float = 0.8,
+        min_words: int = 3,
+        temperature: float = 0.05,
+        dimension: int = 4096
+    ):
+        """
+        Train the router.
+
+        Args:
+            examples: (message, agent) training tuples
+            min_confidence: Lowest confidence routed without the LLM
+            min_words: Messages with fewer words are left to the LLM
+            temperature: Softmax temperature over the centroid similarities
+            dimension: Dimension of the hashed feature vectors
+        """
+        if not examples:
+            raise ValueError("IntentRouter needs at least one training example")
+        self.min_confidence = min_confidence
+        self.min_words = min_words
+        self.temperature = temperature
+        self.embeddings = HashingEmbeddings(model="intent-router-v1", dimension=dimension)
+
+        self.agents = sorted({agent for _, agent in examples})
+        vectors = np.asarray(
+            self.embeddings.embed_documents([normalize_message(message) for message, _ in examples]),
+            dtype=np.float32
+        )
+        labels = np.array([self.agents.index(agent) for _, agent in examples])
+        centroids = np.stack([vectors[labels == label].mean(axis=0) for label in range(len(self.agents))])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        # Column-major, so the columns a message selects are contiguous
+        self.centroids = np.asfortranarray(centroids / np.maximum(norms, 1e-12))
+        self.example_count = len(examples)
+
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "low_confidence": 0, "short_messages": 0}
+
+    @classmethod
+    def from_files(
+        cls,
+        examples_path: Path = DEFAULT_EXAMPLES_PATH,
+        vectorstore_path: Optional[str] = None,
+        **kwargs
+    ) -> "IntentRouter":
+        """
+        Train the router from the examples file and, optionally, the FAQ questions of a vector store.
+
+        Args:
+            examples_path: Labelled routing examples
+            vectorstore_path: Vector store whose canonical FAQ questions are added as faq_agent examples
+            **kwargs: Passed to IntentRouter
+
+        Returns:
+            Trained router
+        """
+        examples = load_intent_examples(examples_path)
+        if vectorstore_path is not None:
+            examples += [(question, "faq_agent") for question, _ in load_faq_pairs(vectorstore_path)]
+        return cls(examples, **kwargs)
+
+    def classify(self, message: str) -> Dict[str, Any]:
+        """
+        Score a message against every agent.
+
+        Args:
+            message: User message
+
+        Returns:
+            Dict with the best agent, its confidence and the probability of every agent
+        """
+        # Only the dimensions the message hashes to contribute to its dot products
+        indices, values = self.embeddings.hashed_features(normalize_message(message))
+        similarities = self.centroids[:, indices] @ values
+        logits = (similarities - similarities.max()) / self.temperature
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum()
+        best = int(np.argmax(probabilities))
+        return {
+            "agent": self.agents[best],
+            "confidence": float(probabilities[best]),
+            "probabilities": {agent: float(p) for agent, p in zip(self.agents, probabilities)},
+        }
+
+    def route(self, message: str) -> Optional[str]:
+        """
+        Pick the agent for a message when the router is confident.
+
+        Args:
+            message: User message
+
+        Returns:
+            Agent name, or None when the message should go to the LLM router
+        """
+        if len(message.split()) < self.min_words:
+            outcome, agent = "short_messages", None
+        else:
+            prediction = self.classify(message)
+            confident = prediction["confidence"] >= self.min_confidence
+            outcome, agent = ("routed", prediction["agent"]) if confident else ("low_confidence", None)
+        with self._lock:
+            self._stats[outcome] += 1
+        return agent
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing counters, the share of messages routed locally and the training set size."""
+        with self._lock:
+            stats = dict(self._stats)
+        total = sum(stats.values())
+        stats["local_rate"] = round(stats["routed"] / total, 4) if total else 0.0
+        stats["examples"] = self.example_count
+        stats["min_confidence"] = self.min_confidence
+        return stats
@@ -3,25 +3,44 @@
 This module provides the supervisor node factory function that creates a
 routing node. The supervisor analyzes incoming messages and decides which
 specialized agent should handle the request, or if the conversation should
-finish. It uses structured LLM output to make routing decisions.
+finish. It uses structured LLM output to make routing decisions, with
+sync and async implementations of the node. An optional local intent
+router decides confident cases without the LLM call. The routing LLM sees
+the conversation through the conversation memory's bounded window.
 """
 
-from typing import Callable
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
 from ..graph.state import State
 from pydantic import BaseModel, Field
+from typing import Optional
+from .intent_router import IntentRouter
+from ..graph.memory import ConversationMemory
 from ..utils.utils import load_prompt_yaml, logger
 
-def make_supervisor_node(llm: BaseChatModel, members: list[str]) -> Callable:
+def make_supervisor_node(
+    llm: BaseChatModel,
+    members: list[str],
+    intent_router: Optional[IntentRouter] = None,
+    memory: Optional[ConversationMemory] = None
+) -> RunnableLambda:
     """Create a supervisor node that routes to the appropriate worker.
     
+    The node has a sync implementation for graph.invoke and an async one for
+    graph.ainvoke, which awaits the routing LLM call instead of blocking.
+    When an intent router is given, user messages it classifies confidently
+    are routed without calling the LLM.
+    
     Args:
         llm: Language model for supervisor decisions
         members: List of agent names to route to
+        intent_router: Local classifier tried before the routing LLM
+        memory: Conversation memory bounding the history sent to the routing LLM
+            (the full history if None)
         
     Returns:
-        Supervisor node function
+        Supervisor node runnable
     """
     options = ["FINISH"] + members
     
@@ -32,20 +51,25 @@ def make_supervisor_node(llm: BaseChatModel, members: list[str]) -> Callable:
         """Worker to route to next. If no workers needed, route to FINISH."""
         next: str = Field(description=f"Must be one of: {', '.join(options)}")
 
-    def supervisor_node(state: State) -> dict:
-        """Supervisor node that routes requests to appropriate agents.
+    router_llm = llm.with_structured_output(Router)
+
+    def agents_this_turn(state_messages: list) -> set:
+        """Names of the agents that responded since the last user message."""
+        names = set()
+        for message in reversed(state_messages):
+            name = getattr(message, "name", None)
+            if not (name and name.endswith("_agent")):
+                break
+            names.add(name)
+        return names
+
+    def finish_update(state: State) -> dict | None:
+        """Finish once an agent has responded, returning None if routing is still needed.
         
-        Args:
-            state: Current graph state
-            
-        Returns:
-            Updated state with next node and response
+        An agent's handoff is followed instead, unless the requested agent
+        already responded this turn (which would start a loop).
         """
         state_messages = state.get("messages", [])
-        messages = [
-            {"role": "system", "content": system_prompt},
-        ] + state["messages"]
-        
         last_message = state_messages[-1] if state_messages else None
         agent_responded = (
             last_message 
@@ -53,35 +77,82 @@ def make_supervisor_node(llm: BaseChatModel, members: list[str]) -> Callable:
             and last_message.name 
             and last_message.name.endswith("_agent")
         )
+        if not agent_responded:
+            return None
         
-        if agent_responded:
-            goto = "FINISH"
-            final_response = state.get("response")
-            
-            if not final_response:
-                for msg in reversed(state_messages):
-                    if (hasattr(msg, "content") and msg.content and
-                        hasattr(msg, "name") and msg.name and
-                        msg.name.endswith("_agent")):
-                        final_response = msg.content
-                        break
-            
-            update_dict = {"next": goto}
-            if final_response:
-                update_dict["response"] = final_response
-        else:
-            response = llm.with_structured_output(Router).invoke(messages)
-            goto = response.next
-            
-            if goto not in options:
-                goto = members[0] if members else "FINISH"
-            
-            if goto == "FINISH":
-                goto = members[0] if members else "FINISH"
-            
-            update_dict = {"next": goto}
+        handoff = state.get("handoff")
+        if handoff in members and handoff not in agents_this_turn(state_messages):
+            return {"next": handoff, "handoff": None}
+        
+        goto = "FINISH"
+        final_response = state.get("response")
+        
+        if not final_response:
+            for msg in reversed(state_messages):
+                if (hasattr(msg, "content") and msg.content and
+                    hasattr(msg, "name") and msg.name and
+                    msg.name.endswith("_agent")):
+                    final_response = msg.content
+                    break
+        
+        update_dict = {"next": goto, "handoff": None}
+        if final_response:
+            update_dict["response"] = final_response
+        return update_dict
+
+    def route_update(response: Router) -> dict:
+        """Turn the router's decision into a state update, defaulting to the first member."""
+        goto = response.next
+        
+        if goto not in options:
+            goto = members[0] if members else "FINISH"
+        
+        if goto == "FINISH":
+            goto = members[0] if members else "FINISH"
+        
+        return {"next": goto}
+
+    def local_route_update(state: State) -> dict | None:
+        """Route a user message with the intent router, returning None if the LLM must decide."""
+        if intent_router is None:
+            return None
+        state_messages = state.get("messages", [])
+        last_message = state_messages[-1] if state_messages else None
+        # Agent responses are also HumanMessages, but carry the agent's name
+        if not isinstance(last_message, HumanMessage) or last_message.name or not isinstance(last_message.content, str):
+            return None
+        goto = intent_router.route(last_message.content)
+        if goto not in members:
+            return None
+        logger.debug(f"Intent router sent the message to {goto}")
+        return {"next": goto}
+
+    def routing_messages(state: State) -> list:
+        """Messages sent to the routing LLM."""
+        history = memory.prompt_messages(state) if memory is not None else state["messages"]
+        return [
+            {"role": "system", "content": system_prompt},
+        ] + history
+
+    def supervisor_node(state: State) -> dict:
+        """Supervisor node that routes requests to appropriate agents.
         
+        Args:
+            state: Current graph state
+            
+        Returns:
+            Updated state with next node and response
+        """
+        update_dict = finish_update(state) or local_route_update(state)
+        if update_dict is None:
+            update_dict = route_update(router_llm.invoke(routing_messages(state)))
         return update_dict
 
-    return supervisor_node
+    async def asupervisor_node(state: State) -> dict:
+        """Async supervisor node, see supervisor_node."""
+        update_dict = finish_update(state) or local_route_update(state)
+        if update_dict is None:
+            update_dict = route_update(await router_llm.ainvoke(routing_messages(state)))
+        return update_dict
 
+    return RunnableLambda(supervisor_node, afunc=asupervisor_node, name="supervisor")
@@ -4,11 +4,14 @@ from .extractor import DocumentExtractor
 from .embedder import Embedder
 from .vectorstore import VectorStore
 from .retriever import Retriever
+from .registry import RetrievalRegistry, retrieval_registry
 
 __all__ = [
     "DocumentExtractor",
     "Embedder",
     "VectorStore",
     "Retriever",
+    "RetrievalRegistry",
+    "retrieval_registry",
 ]
 
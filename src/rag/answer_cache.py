@@ -0,0 +1,173 @@
+"""Semantic answer cache module.
+
+This module provides the SemanticAnswerCache class, which serves answers to
+paraphrased questions without running the agent graph. Answered questions
+are kept in a small in-memory FAISS inner-product index over normalised
+embeddings; a lookup hits when the most similar unexpired question is above
+the similarity threshold. Entries expire by TTL, the whole cache is dropped
+when the vector store version changes, and only answers of cacheable agents
+are stored. Hit and miss counters are kept for monitoring.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import faiss
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """In-memory cache of answers keyed by question embedding similarity."""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 10000,
+        cacheable_agents: Tuple[str, ...] = ("faq_agent",)
+    ):
+        """
+        Initialize semantic answer cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Time to live of an entry in seconds
+            max_entries: Maximum entries; the oldest are evicted first
+            cacheable_agents: Agents whose answers may be cached
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cacheable_agents = tuple(cacheable_agents)
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self._store_version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "expirations": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Return the embedding as a unit-length float32 row vector."""
+        vector = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, store_version: Hashable):
+        """Drop all entries when the vector store version changed (caller holds the lock)."""
+        if store_version != self._store_version:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._index = None
+            self._entries.clear()
+            self._store_version = store_version
+
+    def _remove(self, entry_ids: List[int]):
+        """Remove entries from the index and entry table (caller holds the lock)."""
+        if not entry_ids:
+            return
+        self._index.remove_ids(np.asarray(entry_ids, dtype=np.int64))
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+
+    def lookup(self, embedding: List[float], store_version: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a question.
+
+        Args:
+            embedding: Embedding of the question
+            store_version: Current vector store version; a change invalidates the cache
+
+        Returns:
+            Dict with question, answer, agent and similarity, or None on a miss
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._check_version(store_version)
+            if self._index is None or self._index.ntotal == 0:
+                self._stats["misses"] += 1
+                return None
+
+            similarities, entry_ids = self._index.search(vector, min(4, self._index.ntotal))
+            now = time.time()
+            expired = []
+            hit = None
+            for similarity, entry_id in zip(similarities[0], entry_ids[0]):
+                if entry_id < 0 or similarity < self.similarity_threshold:
+                    break
+                entry = self._entries[int(entry_id)]
+                if now - entry["created_at"] > self.ttl_seconds:
+                    expired.append(int(entry_id))
+                    continue
+                hit = {**entry, "similarity": float(similarity)}
+                break
+
+            self._stats["expirations"] += len(expired)
+            self._remove(expired)
+            self._stats["hits" if hit else "misses"] += 1
+            return hit
+
+    def add(
+        self,
+        question: str,
+        embedding: List[float],
+        answer: str,
+        agent: Optional[str],
+        store_version: Hashable
+    ) -> bool:
+        """
+        Cache the answer to a question if its agent is cacheable.
+
+        Args:
+            question: Question text
+            embedding: Embedding of the question
+            answer: Answer returned to the user
+            agent: Agent that produced the answer
+            store_version: Vector store version the answer was produced with
+
+        Returns:
+            True if the answer was cached
+        """
+        if agent not in self.cacheable_agents or not answer:
+            return False
+
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._check_version(store_version)
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            elif vector.shape[1] != self._index.d:
+                return False
+
+            now = time.time()
+            stale = [entry_id for entry_id, entry in self._entries.items() if now - entry["created_at"] > self.ttl_seconds]
+            self._stats["expirations"] += len(stale)
+            self._remove(stale)
+            overflow = len(self._entries) + 1 - self.max_entries
+            if overflow > 0:
+                # Entry ids increase with insertion time, so the smallest are the oldest
+                oldest = sorted(self._entries)[:overflow]
+                self._stats["evictions"] += len(oldest)
+                self._remove(oldest)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.asarray([entry_id], dtype=np.int64))
+            self._entries[entry_id] = {"question": question, "answer": answer, "agent": agent, "created_at": now}
+            self._stats["stores"] += 1
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters, the hit rate and the number of cached entries."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop all cached answers."""
+        with self._lock:
+            self._index = None
+            self._entries.clear()
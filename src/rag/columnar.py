@@ -0,0 +1,234 @@
+"""Columnar metadata storage module.
+
+This module stores vector store metadata as one binary column per field so
+it can be memory-mapped instead of parsed from JSON. Processes that load the
+same store share the column pages through the OS page cache, and load time no
+longer grows with the number of chunks.
+
+Layout of a columnar metadata directory:
+- schema.json: row count and per-column encoding
+- deleted.npy: mask of deleted (None) rows, only written when there are any
+- <field>.npy: int64 values (int columns) or int32 codes (category columns)
+- <field>.bytes + <field>.offsets.npy + <field>.missing.npy: UTF-8 string heap
+  (string and json columns)
+
+Column kinds:
+- int: integers, missing values stored as INT_MISSING
+- category: low-cardinality strings, codes into the categories list in schema.json (-1 = missing)
+- string: high-cardinality strings in a string heap
+- json: any other value, JSON-encoded in a string heap
+"""
+
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Iterator, Tuple
+import numpy as np
+
+INT_MISSING = np.iinfo(np.int64).min
+MAX_CATEGORIES = 65536
+
+
+def write_columnar_metadata(metadata: Sequence[Optional[Dict[str, Any]]], path: Path):
+    """
+    Write metadata as memory-mappable columns.
+
+    Args:
+        metadata: Metadata dictionaries, one per vector (None rows are deleted documents)
+        path: Directory to write the columns to
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    count = len(metadata)
+
+    fields: List[str] = []
+    for row in metadata:
+        for field in row or {}:
+            if field not in fields:
+                fields.append(field)
+
+    columns = {}
+    for position, field in enumerate(fields):
+        values = [row.get(field) if row else None for row in metadata]
+        present = [value for value in values if value is not None]
+        file_stem = f"c{position}"
+
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+            array = np.array([INT_MISSING if value is None else value for value in values], dtype=np.int64)
+            np.save(path / f"{file_stem}.npy", array)
+            columns[field] = {"kind": "int", "file": file_stem}
+        elif all(isinstance(value, str) for value in present):
+            categories = sorted(set(present))
+            if len(categories) <= MAX_CATEGORIES and len(categories) <= max(1, count // 2):
+                lookup = {value: code for code, value in enumerate(categories)}
+                codes = np.array([-1 if value is None else lookup[value] for value in values], dtype=np.int32)
+                np.save(path / f"{file_stem}.npy", codes)
+                columns[field] = {"kind": "category", "file": file_stem, "categories": categories}
+            else:
+                _write_string_heap(values, path, file_stem)
+                columns[field] = {"kind": "string", "file": file_stem}
+        else:
+            encoded = [None if value is None else json.dumps(value) for value in values]
+            _write_string_heap(encoded, path, file_stem)
+            columns[field] = {"kind": "json", "file": file_stem}
+
+    deleted = np.array([row is None for row in metadata], dtype=bool)
+    if deleted.any():
+        np.save(path / "deleted.npy", deleted)
+    elif (path / "deleted.npy").exists():
+        (path / "deleted.npy").unlink()
+
+    with open(path / "schema.json", 'w') as f:
+        json.dump({"count": count, "fields": fields, "columns": columns}, f, indent=2)
+
+
+def _write_string_heap(values: List[Optional[str]], path: Path, file_stem: str):
+    """Write strings as concatenated UTF-8 bytes plus offsets and a missing-value mask."""
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    missing = np.zeros(len(values), dtype=bool)
+    with open(path / f"{file_stem}.bytes", 'wb') as f:
+        for i, value in enumerate(values):
+            data = b""
+            if value is None:
+                missing[i] = True
+            else:
+                data = value.encode('utf-8')
+                f.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    np.save(path / f"{file_stem}.offsets.npy", offsets)
+    np.save(path / f"{file_stem}.missing.npy", missing)
+
+
+class ColumnarMetadata(Sequence):
+    """Read-only, memory-mapped metadata that materializes row dicts on access."""
+
+    def __init__(self, path: Path):
+        """
+        Open a columnar metadata directory.
+
+        Args:
+            path: Directory written by write_columnar_metadata
+        """
+        self.path = Path(path)
+        with open(self.path / "schema.json", 'r') as f:
+            schema = json.load(f)
+        self.count: int = schema["count"]
+        self.fields: List[str] = schema["fields"]
+        self.columns: Dict[str, Dict[str, Any]] = schema["columns"]
+        self._arrays: Dict[str, Any] = {}
+        deleted_path = self.path / "deleted.npy"
+        self._deleted = np.load(deleted_path, mmap_mode='r') if deleted_path.exists() else None
+
+        for field, column in self.columns.items():
+            stem = self.path / column["file"]
+            if column["kind"] in ("int", "category"):
+                self._arrays[field] = np.load(f"{stem}.npy", mmap_mode='r')
+            else:
+                offsets = np.load(f"{stem}.offsets.npy", mmap_mode='r')
+                missing = np.load(f"{stem}.missing.npy", mmap_mode='r')
+                heap_path = Path(f"{stem}.bytes")
+                # np.memmap cannot map empty files
+                heap = np.memmap(heap_path, dtype=np.uint8, mode='r') if heap_path.stat().st_size else np.empty(0, np.uint8)
+                self._arrays[field] = (offsets, missing, heap)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("metadata index out of range")
+        if self._deleted is not None and self._deleted[index]:
+            return None
+
+        row = {}
+        for field in self.fields:
+            value = self._value(field, index)
+            if value is not None:
+                row[field] = value
+        return row
+
+    def __iter__(self) -> Iterator[Optional[Dict[str, Any]]]:
+        for index in range(self.count):
+            yield self[index]
+
+    def deleted_ids(self) -> np.ndarray:
+        """Get the sorted int64 ids of deleted rows without materializing rows."""
+        if self._deleted is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self._deleted).astype(np.int64)
+
+    def value_ids(self, field: str) -> Optional[Dict[Any, np.ndarray]]:
+        """
+        Group row ids by value for a field without materializing rows.
+
+        Args:
+            field: Metadata field
+
+        Returns:
+            Mapping of value to sorted int64 ids, or None if the field is not stored
+        """
+        column = self.columns.get(field)
+        if column is None:
+            return None
+        if column["kind"] in ("int", "category"):
+            values = np.asarray(self._arrays[field])
+            missing = INT_MISSING if column["kind"] == "int" else -1
+            order = np.argsort(values, kind='stable')
+            sorted_values = values[order]
+            unique, starts = np.unique(sorted_values, return_index=True)
+            bounds = list(starts[1:]) + [len(sorted_values)]
+            groups = {}
+            for value, start, end in zip(unique, starts, bounds):
+                if value == missing:
+                    continue
+                key = column["categories"][value] if column["kind"] == "category" else int(value)
+                groups[key] = np.sort(order[start:end]).astype(np.int64)
+            return groups
+
+        groups: Dict[Any, List[int]] = {}
+        for index in range(self.count):
+            value = self._value(field, index)
+            if value is None:
+                continue
+            try:
+                groups.setdefault(value, []).append(index)
+            except TypeError:
+                continue
+        return {value: np.array(ids, dtype=np.int64) for value, ids in groups.items()}
+
+    def numeric_values(self, field: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get ids and values of an int column without materializing rows.
+
+        Args:
+            field: Metadata field
+
+        Returns:
+            Tuple of (ids, float64 values) for rows with a value, or None if not an int column
+        """
+        column = self.columns.get(field)
+        if column is None or column["kind"] != "int":
+            return None
+        values = np.asarray(self._arrays[field])
+        ids = np.flatnonzero(values != INT_MISSING).astype(np.int64)
+        return ids, values[ids].astype(np.float64)
+
+    def _value(self, field: str, index: int) -> Any:
+        """Decode a single field value."""
+        column = self.columns[field]
+        kind = column["kind"]
+        if kind == "int":
+            value = int(self._arrays[field][index])
+            return None if value == INT_MISSING else value
+        if kind == "category":
+            code = int(self._arrays[field][index])
+            return None if code < 0 else column["categories"][code]
+
+        offsets, missing, heap = self._arrays[field]
+        if missing[index]:
+            return None
+        text = bytes(heap[int(offsets[index]):int(offsets[index + 1])]).decode('utf-8')
+        return json.loads(text) if kind == "json" else text
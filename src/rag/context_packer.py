@@ -0,0 +1,258 @@
+"""Context packing module.
+
+This module provides the ContextPacker class, which turns ranked retrieval
+results into the context handed to the LLM. Chunks are produced with an
+overlap, so adjacent chunks of the same document repeat text; the packer
+strips the repeated span and merges adjacent chunks into one passage. Chunks
+whose content is (nearly) contained in an already packed passage, such as a
+FAQ answer repeated in the user guide, are dropped, and so are repeated
+sentences within otherwise new chunks. Passages are added in
+rank order until the token budget is used up. Token counts are computed once
+per chunk at build time (metadata "token_count") and only recounted for
+trimmed text.
+"""
+
+import functools
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+from ..utils.utils import logger
+
+DEFAULT_ENCODING = "cl100k_base"
+
+_WORD = re.compile(r"\w+")
+# Sentence boundaries, kept as separate items by re.split so texts can be rejoined verbatim
+_SENTENCE_BOUNDARY = re.compile(r"((?<=[.!?])[ \t]+|\n+)")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str):
+    """Load a tiktoken encoding, or None if tiktoken or the encoding file is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        # The encoding file is downloaded on first use, which fails offline
+        logger.warning(f"tiktoken encoding '{encoding_name}' unavailable, estimating token counts: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    """
+    Count the tokens of a text.
+
+    Args:
+        text: Text to count
+        encoding_name: tiktoken encoding (falls back to ~4 characters per token without tiktoken)
+
+    Returns:
+        Number of tokens
+    """
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    """Word n-grams of a text, used to measure content containment."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def overlap_length(head: str, tail: str, min_overlap: int = 20) -> int:
+    """
+    Length of the longest suffix of head that is also a prefix of tail.
+
+    Args:
+        head: Text that comes first
+        tail: Text that follows it
+        min_overlap: Shortest overlap (in characters) that counts
+
+    Returns:
+        Overlap length in characters, 0 if shorter than min_overlap
+    """
+    probe = tail[:min_overlap]
+    if len(probe) < min_overlap:
+        return 0
+    start = head.find(probe, max(0, len(head) - len(tail)))
+    while start != -1:
+        if tail.startswith(head[start:]):
+            return len(head) - start
+        start = head.find(probe, start + 1)
+    return 0
+
+
+class _Passage:
+    """Packed text of one or more adjacent chunks of a document."""
+
+    def __init__(self, result: Dict[str, Any], text: str, chunk_index: Optional[int]):
+        self.result = result
+        self.text = text
+        self.first = self.last = chunk_index
+        self.shingles = _shingles(text)
+
+
+class ContextPacker:
+    """Deduplicates retrieved chunks and packs them into a token budget."""
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        duplicate_threshold: float = 0.8,
+        min_overlap: int = 20,
+        min_sentence_words: int = 6,
+        encoding_name: str = DEFAULT_ENCODING
+    ):
+        """
+        Initialize context packer.
+
+        Args:
+            token_budget: Maximum tokens of packed context (chunk texts plus headers)
+            duplicate_threshold: Share of a chunk's word 3-grams already present in a packed
+                passage above which the chunk is dropped as a near-duplicate
+            min_overlap: Shortest repeated span (in characters) stripped between adjacent chunks
+            min_sentence_words: Shortest sentence (in words) dropped when already packed
+            encoding_name: tiktoken encoding used to count tokens
+        """
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.min_overlap = min_overlap
+        self.min_sentence_words = min_sentence_words
+        self.encoding_name = encoding_name
+
+    def pack(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Deduplicate ranked results and fit them into the token budget.
+
+        Args:
+            results: Retrieved documents, best first
+
+        Returns:
+            Packed results, best first; adjacent chunks of a document are merged into
+            one result whose metadata records the packed chunk range
+        """
+        passages: List[_Passage] = []
+        used_tokens = 0
+        for result in results:
+            text = result["text"]
+            metadata = result["metadata"]
+            document_name = metadata.get("document_name")
+            chunk_index = metadata.get("chunk_index")
+            if not text.strip():
+                continue
+
+            # Continue a passage with its neighbouring chunk, dropping the repeated span
+            neighbour, position = self._find_neighbour(passages, document_name, chunk_index)
+            overlap = 0
+            if neighbour is not None:
+                if position == "after":
+                    overlap = overlap_length(neighbour.text, text, self.min_overlap)
+                    text = text[overlap:]
+                else:
+                    overlap = overlap_length(text, neighbour.text, self.min_overlap)
+                    text = text[:len(text) - overlap]
+
+            if self._is_duplicate(text, passages):
+                continue
+            text = self._drop_repeated_sentences(text, passages)
+            if neighbour is not None and not overlap:
+                # Adjacent chunks without a shared span are joined on a new line
+                text = "\n" + text if position == "after" else text + "\n"
+
+            trimmed = text != result["text"]
+            tokens = count_tokens(text, self.encoding_name) if trimmed else self._chunk_tokens(result)
+            header_tokens = 0 if neighbour is not None else count_tokens(self._header(result), self.encoding_name)
+            if used_tokens + header_tokens + tokens > self.token_budget:
+                if passages:
+                    continue  # A lower-ranked, shorter chunk may still fit
+                # The best chunk alone exceeds the budget: keep its beginning
+                budget = self.token_budget - header_tokens
+                while tokens > budget and text:
+                    text = self._truncate(text, tokens, budget)
+                    tokens = count_tokens(text, self.encoding_name)
+            used_tokens += header_tokens + tokens
+
+            if neighbour is None:
+                passages.append(_Passage(result, text, chunk_index))
+            elif position == "after":
+                neighbour.text += text
+                neighbour.last = chunk_index
+                neighbour.shingles |= _shingles(text)
+            else:
+                neighbour.text = text + neighbour.text
+                neighbour.first = chunk_index
+                neighbour.shingles |= _shingles(text)
+
+        packed = []
+        for passage in passages:
+            metadata = dict(passage.result["metadata"])
+            if passage.first != passage.last:
+                metadata["chunk_range"] = [passage.first, passage.last]
+            packed.append({**passage.result, "text": passage.text, "metadata": metadata})
+        return packed
+
+    @staticmethod
+    def _header(result: Dict[str, Any]) -> str:
+        """Header line that format_context puts above a passage."""
+        return f"[{result['metadata'].get('document_name', 'Unknown')}]\n"
+
+    def _chunk_tokens(self, result: Dict[str, Any]) -> int:
+        """Token count of an untrimmed chunk, from the count cached at build time when present."""
+        cached = result["metadata"].get("token_count")
+        return cached if isinstance(cached, int) else count_tokens(result["text"], self.encoding_name)
+
+    @staticmethod
+    def _find_neighbour(
+        passages: List[_Passage],
+        document_name: Optional[str],
+        chunk_index: Optional[int]
+    ) -> Tuple[Optional[_Passage], Optional[str]]:
+        """Find a packed passage of the same document that this chunk directly follows or precedes."""
+        if not isinstance(chunk_index, int):
+            return None, None
+        for passage in passages:
+            if passage.result["metadata"].get("document_name") != document_name:
+                continue
+            if passage.last == chunk_index - 1:
+                return passage, "after"
+            if passage.first == chunk_index + 1:
+                return passage, "before"
+        return None, None
+
+    def _is_duplicate(self, text: str, passages: List[_Passage]) -> bool:
+        """Whether most of a text's content is already in a packed passage."""
+        shingles = _shingles(text)
+        if not shingles:
+            return True
+        return any(
+            len(shingles & passage.shingles) / len(shingles) >= self.duplicate_threshold
+            for passage in passages
+        )
+
+    def _drop_repeated_sentences(self, text: str, passages: List[_Passage]) -> str:
+        """Remove sentences (of at least min_sentence_words words) already contained in a packed passage."""
+        if not passages:
+            return text
+        parts = _SENTENCE_BOUNDARY.split(text)
+        kept = []
+        dropped = False
+        for position in range(0, len(parts), 2):
+            sentence = parts[position]
+            separator = parts[position + 1] if position + 1 < len(parts) else ""
+            if len(_WORD.findall(sentence)) >= self.min_sentence_words and self._is_duplicate(sentence, passages):
+                dropped = True
+                continue
+            kept.append(sentence + separator)
+        return "".join(kept).strip() if dropped else text
+
+    @staticmethod
+    def _truncate(text: str, tokens: int, budget: int) -> str:
+        """Cut a text to roughly a token budget, at a whitespace boundary."""
+        if budget <= 0:
+            return ""
+        cut = text[:max(1, len(text) * budget // max(tokens, 1))]
+        space = cut.rfind(" ")
+        return cut[:space] if space > len(cut) // 2 else cut
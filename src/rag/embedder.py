@@ -1,14 +1,45 @@
 """Embedding generation module.
 
 This module provides the Embedder class for generating text embeddings using
-OpenAI's embedding models. It supports both single text and batch document
-embedding generation for use in vector search operations.
+OpenAI's embedding models or a local backend (feature hashing or an on-disk
+sentence-transformers model) for network-free builds. It supports both single text and batch document
+embedding generation for use in vector search operations. Query embeddings
+can be served from an EmbeddingCache to avoid repeated API calls. Document
+embedding runs in batches with bounded concurrency, retries rate-limit and
+server errors with exponential backoff, and can checkpoint completed batches
+so an interrupted build resumes where it stopped.
 """
 
 import os
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
-from langchain_openai import OpenAIEmbeddings
 from langchain.embeddings.base import Embeddings
+from .embedding_backends import (
+    DEFAULT_BACKEND_MODELS,
+    DEFAULT_EMBEDDING_BACKEND,
+    OPENAI_MODEL_DIMENSIONS,
+    create_embeddings,
+)
+from .embedding_cache import EmbeddingCache
+from .embedding_checkpoint import EmbeddingCheckpoint
+
+DEFAULT_EMBEDDING_MODEL = DEFAULT_BACKEND_MODELS[DEFAULT_EMBEDDING_BACKEND]
+
+# Exception class names of transient network failures raised by the OpenAI client
+RETRYABLE_ERROR_NAMES = ("APIConnectionError", "APITimeoutError")
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Return True for rate-limit (429), server (5xx) and connection errors."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in RETRYABLE_ERROR_NAMES
 
 
 class Embedder:
@@ -16,22 +47,55 @@ class Embedder:
     
     def __init__(
         self,
-        model_name: str = "text-embedding-ada-002",
-        openai_api_key: Optional[str] = None
+        model_name: Optional[str] = None,
+        openai_api_key: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_retries: int = 6,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        backend: Optional[str] = None,
+        dimension: Optional[int] = None
     ):
         """
         Initialize embedder.
         
         Args:
-            model_name: Name of the embedding model
+            model_name: Name of the embedding model (if None, uses EMBEDDING_MODEL or the backend default)
             openai_api_key: OpenAI API key (if None, uses environment variable)
+            cache: Optional query embedding cache used by embed_text
+            batch_size: Number of texts sent per embedding request
+            max_concurrency: Maximum number of embedding requests in flight
+            max_retries: Retries per batch on rate-limit, server and connection errors
+            initial_backoff: Delay in seconds before the first retry, doubled per retry
+            max_backoff: Upper bound of the retry delay in seconds
+            backend: Embedding backend, 'openai', 'hashing' or 'sentence_transformers'
+                (if None, uses EMBEDDING_BACKEND or 'openai')
+            dimension: Output dimension of the hashing backend (if None, uses EMBEDDING_DIMENSION)
         """
-        init_params = {"model": model_name}
-        api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-        if api_key:
-            init_params["openai_api_key"] = api_key
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND") or DEFAULT_EMBEDDING_BACKEND
+        self.model_name = model_name or os.getenv("EMBEDDING_MODEL") or DEFAULT_BACKEND_MODELS.get(self.backend)
+        if dimension is None and os.getenv("EMBEDDING_DIMENSION"):
+            dimension = int(os.getenv("EMBEDDING_DIMENSION"))
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.retry_count = 0
         
-        self.embeddings: Embeddings = OpenAIEmbeddings(**init_params)
+        self.embeddings: Embeddings = create_embeddings(
+            self.backend,
+            self.model_name,
+            dimension=dimension,
+            openai_api_key=openai_api_key or os.getenv("OPENAI_API_KEY")
+        )
+        # None when the output dimension of an API model is not known up front
+        self.dimension: Optional[int] = getattr(
+            self.embeddings, "dimension", OPENAI_MODEL_DIMENSIONS.get(self.model_name)
+        )
     
     def embed_text(self, text: str) -> List[float]:
         """
@@ -43,17 +107,172 @@ class Embedder:
         Returns:
             Embedding vector
         """
-        return self.embeddings.embed_query(text)
+        if self.cache is None:
+            return self.embeddings.embed_query(text)
+        
+        embedding = self.cache.get(self.model_name, text, self.backend, self.dimension)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            self.cache.put(self.model_name, text, embedding, self.backend, self.dimension)
+        return embedding
+    
+    async def aembed_text(self, text: str) -> List[float]:
+        """
+        Asynchronously generate embedding for a single text.
+        
+        A persistent cache is read and written on a worker thread, so SQLite
+        does not block the event loop.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Embedding vector
+        """
+        if self.cache is None:
+            return await self.embeddings.aembed_query(text)
+        
+        if self.cache.db_path is None:
+            embedding = self.cache.get(self.model_name, text, self.backend, self.dimension)
+        else:
+            embedding = await asyncio.to_thread(self.cache.get, self.model_name, text, self.backend, self.dimension)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(text)
+            if self.cache.db_path is None:
+                self.cache.put(self.model_name, text, embedding, self.backend, self.dimension)
+            else:
+                await asyncio.to_thread(self.cache.put, self.model_name, text, embedding, self.backend, self.dimension)
+        return embedding
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several queries with one embedding call.
+        
+        Cached queries are served from the query embedding cache; the rest are
+        embedded together and cached.
+        
+        Args:
+            texts: Query texts
+        
+        Returns:
+            List of embedding vectors, in input order
+        """
+        if self.cache is None:
+            return self.embed_documents(texts)
+        
+        embeddings = [self.cache.get(self.model_name, text, self.backend, self.dimension) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            new_embeddings = self.embed_documents([texts[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                self.cache.put(self.model_name, texts[i], embedding, self.backend, self.dimension)
+                embeddings[i] = embedding
+        return embeddings
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(self, texts: List[str], checkpoint_dir: Optional[str] = None) -> List[List[float]]:
         """
         Generate embeddings for multiple texts.
         
+        Texts are embedded in batches of batch_size on up to max_concurrency
+        threads; each batch is retried with exponential backoff on transient errors.
+        
         Args:
             texts: List of texts to embed
+            checkpoint_dir: Optional directory persisting completed batches; it is
+                removed once all texts are embedded
         
         Returns:
             List of embedding vectors
         """
-        return self.embeddings.embed_documents(texts)
+        checkpoint = EmbeddingCheckpoint(checkpoint_dir) if checkpoint_dir else None
+        batches = self._make_batches(texts)
+        if self.max_concurrency <= 1 or len(batches) <= 1:
+            results = [self._embed_batch(batch, checkpoint) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                results = list(executor.map(lambda batch: self._embed_batch(batch, checkpoint), batches))
+        if checkpoint is not None:
+            checkpoint.clear()
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+    
+    async def aembed_documents(self, texts: List[str], checkpoint_dir: Optional[str] = None) -> List[List[float]]:
+        """
+        Asynchronously generate embeddings for multiple texts.
+        
+        Batches run concurrently, with at most max_concurrency requests in flight.
+        
+        Args:
+            texts: List of texts to embed
+            checkpoint_dir: Optional directory persisting completed batches; it is
+                removed once all texts are embedded
+        
+        Returns:
+            List of embedding vectors
+        """
+        checkpoint = EmbeddingCheckpoint(checkpoint_dir) if checkpoint_dir else None
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch, checkpoint)
+        
+        results = await asyncio.gather(*(embed_batch(batch) for batch in self._make_batches(texts)))
+        if checkpoint is not None:
+            checkpoint.clear()
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+    
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into batches of batch_size."""
+        batch_size = max(1, self.batch_size)
+        return [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt."""
+        return random.uniform(0, min(self.max_backoff, self.initial_backoff * (2 ** attempt)))
+    
+    def _embed_batch(self, batch: List[str], checkpoint: Optional[EmbeddingCheckpoint]) -> List[List[float]]:
+        """Embed one batch, resuming from and writing to the checkpoint."""
+        key = None
+        if checkpoint is not None:
+            key = EmbeddingCheckpoint.make_key(self.model_name, batch, self.backend, self.dimension)
+            embeddings = checkpoint.load(key, self.dimension)
+            if embeddings is not None:
+                return embeddings
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                embeddings = self.embeddings.embed_documents(batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                self.retry_count += 1
+                time.sleep(self._backoff_delay(attempt))
+        
+        if checkpoint is not None:
+            checkpoint.save(key, embeddings)
+        return embeddings
+    
+    async def _aembed_batch(self, batch: List[str], checkpoint: Optional[EmbeddingCheckpoint]) -> List[List[float]]:
+        """Asynchronously embed one batch, resuming from and writing to the checkpoint."""
+        key = None
+        if checkpoint is not None:
+            key = EmbeddingCheckpoint.make_key(self.model_name, batch, self.backend, self.dimension)
+            embeddings = checkpoint.load(key, self.dimension)
+            if embeddings is not None:
+                return embeddings
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                embeddings = await self.embeddings.aembed_documents(batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                self.retry_count += 1
+                await asyncio.sleep(self._backoff_delay(attempt))
+        
+        if checkpoint is not None:
+            checkpoint.save(key, embeddings)
+        return embeddings
 
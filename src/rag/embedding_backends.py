@@ -0,0 +1,157 @@
+"""Embedding backend module.
+
+This module provides the embedding backends the Embedder can run on: the
+OpenAI embeddings API and two fully local backends for network-free builds,
+tests and benchmarks. HashingEmbeddings projects word unigrams and bigrams
+onto a fixed dimension with signed feature hashing; SentenceTransformerEmbeddings
+runs an on-disk sentence-transformers model. All backends implement the
+LangChain Embeddings interface; the local ones also expose their dimension.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
+
+EMBEDDING_BACKENDS = ("openai", "hashing", "sentence_transformers")
+DEFAULT_EMBEDDING_BACKEND = "openai"
+
+DEFAULT_BACKEND_MODELS = {
+    "openai": "text-embedding-ada-002",
+    "hashing": "hashing-v1",
+    "sentence_transformers": "all-MiniLM-L6-v2",
+}
+
+# Output dimensions of known OpenAI embedding models
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+DEFAULT_HASHING_DIMENSION = 1536
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic, local embeddings from signed feature hashing of word n-grams."""
+
+    def __init__(self, model: str = DEFAULT_BACKEND_MODELS["hashing"], dimension: int = DEFAULT_HASHING_DIMENSION):
+        """
+        Initialize hashing embeddings.
+
+        Args:
+            model: Model name recorded with the vectors (part of the hash seed)
+            dimension: Dimension of the output vectors
+        """
+        self.model = model
+        self.dimension = dimension
+
+    def _vector(self, text: str) -> np.ndarray:
+        """Hash unigrams and bigrams with sublinear term frequency and L2-normalise."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = Counter(tokens)
+        features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature, count in features.items():
+            digest = hashlib.blake2b(f"{self.model}\x00{feature}".encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value >> 63 else -1.0
+            vector[value % self.dimension] += sign * (1.0 + np.log(count))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def _embed(self, text: str) -> List[float]:
+        """Embed a text as a list of floats."""
+        return self._vector(text).tolist()
+
+    def hashed_features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sparse form of a text's embedding, for callers that only need its dot products.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Tuple of (dimension indices, values) of the non-zero entries
+        """
+        vector = self._vector(text)
+        indices = np.flatnonzero(vector)
+        return indices, vector[indices]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple texts."""
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._embed(text)
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Local embeddings from a sentence-transformers model on disk or in the local cache."""
+
+    def __init__(self, model: str = DEFAULT_BACKEND_MODELS["sentence_transformers"], device: Optional[str] = None):
+        """
+        Initialize sentence-transformers embeddings.
+
+        Args:
+            model: Model name or path to a saved model directory
+            device: Torch device (defaults to the library's choice)
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "The sentence_transformers embedding backend requires the sentence-transformers package"
+            ) from e
+        self.model = model
+        self._model = SentenceTransformer(model, device=device)
+        self.dimension = self._model.get_sentence_embedding_dimension()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple texts."""
+        return self._model.encode(texts, normalize_embeddings=True).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self.embed_documents([text])[0]
+
+
+def create_embeddings(
+    backend: str,
+    model_name: str,
+    dimension: Optional[int] = None,
+    openai_api_key: Optional[str] = None
+) -> Embeddings:
+    """
+    Create the embeddings client of a backend.
+
+    Args:
+        backend: One of EMBEDDING_BACKENDS
+        model_name: Name of the embedding model (or path, for sentence_transformers)
+        dimension: Output dimension (hashing backend only)
+        openai_api_key: OpenAI API key (openai backend only)
+
+    Returns:
+        LangChain Embeddings instance
+    """
+    if backend == "openai":
+        # Retries are handled per batch by the Embedder, not inside the client
+        init_params = {"model": model_name, "max_retries": 0}
+        if openai_api_key:
+            init_params["openai_api_key"] = openai_api_key
+        return OpenAIEmbeddings(**init_params)
+    if backend == "hashing":
+        return HashingEmbeddings(model=model_name, dimension=dimension or DEFAULT_HASHING_DIMENSION)
+    if backend == "sentence_transformers":
+        return SentenceTransformerEmbeddings(model=model_name)
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
@@ -0,0 +1,233 @@
+"""Query embedding cache module.
+
+This module provides the EmbeddingCache class, a two-tier cache for query
+embeddings: an in-process LRU in front of a persistent SQLite store. Entries
+are keyed by (embedding backend, model, dimension, normalised text), stored as float16 blobs and
+expire by TTL and by size-based eviction. Hit and miss counters are kept for
+monitoring.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + SQLite) cache of query embeddings."""
+
+    # Disk eviction runs once per this many inserts
+    EVICTION_INTERVAL = 100
+
+    def __init__(
+        self,
+        db_path: str = "data/cache/embeddings.db",
+        max_memory_entries: int = 2048,
+        max_disk_entries: int = 100000,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            db_path: Path to the SQLite cache file (None keeps the cache in memory only)
+            max_memory_entries: Maximum entries in the in-process LRU
+            max_disk_entries: Maximum entries in the SQLite store
+            ttl_seconds: Time to live of an entry in seconds
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0}
+        self._puts_since_eviction = 0
+
+        if self.db_path:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.init_database()
+
+    def init_database(self):
+        """Initialize the cache table."""
+        conn = self.get_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        conn.commit()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalise text so trivially different queries share an entry."""
+        return " ".join(text.lower().split())
+
+    @classmethod
+    def make_key(
+        cls,
+        model_name: str,
+        text: str,
+        backend: Optional[str] = None,
+        dimension: Optional[int] = None
+    ) -> str:
+        """Build the cache key for an embedding backend, model, output dimension and text."""
+        normalized = cls.normalize_text(text)
+        namespace = f"{backend or ''}\x00{model_name}\x00{dimension or ''}"
+        return hashlib.sha256(f"{namespace}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        model_name: str,
+        text: str,
+        backend: Optional[str] = None,
+        dimension: Optional[int] = None
+    ) -> Optional[List[float]]:
+        """
+        Look up an embedding.
+
+        Args:
+            model_name: Embedding model name
+            text: Query text
+            backend: Embedding backend of the model
+            dimension: Output dimension of the embeddings (None if not known up front)
+
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        key = self.make_key(model_name, text, backend, dimension)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                vector, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return vector.astype(np.float32).tolist()
+                del self._memory[key]
+
+        if self.db_path:
+            conn = self.get_connection()
+            row = conn.execute(
+                "SELECT embedding, created_at FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                blob, created_at = row
+                if now - created_at <= self.ttl_seconds:
+                    conn.execute("UPDATE embeddings SET last_access = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    vector = np.frombuffer(blob, dtype=np.float16)
+                    with self._lock:
+                        self._remember(key, vector, created_at)
+                        self._stats["disk_hits"] += 1
+                    return vector.astype(np.float32).tolist()
+                conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+                conn.commit()
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(
+        self,
+        model_name: str,
+        text: str,
+        embedding: List[float],
+        backend: Optional[str] = None,
+        dimension: Optional[int] = None
+    ):
+        """
+        Store an embedding.
+
+        Args:
+            model_name: Embedding model name
+            text: Query text
+            embedding: Embedding vector
+            backend: Embedding backend of the model
+            dimension: Output dimension of the embeddings (None if not known up front)
+        """
+        key = self.make_key(model_name, text, backend, dimension)
+        now = time.time()
+        vector = np.asarray(embedding, dtype=np.float16)
+
+        with self._lock:
+            self._remember(key, vector, now)
+
+        if self.db_path:
+            conn = self.get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, model, embedding, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model_name, vector.tobytes(), now, now)
+            )
+            conn.commit()
+            with self._lock:
+                self._puts_since_eviction += 1
+                run_eviction = self._puts_since_eviction >= self.EVICTION_INTERVAL
+                if run_eviction:
+                    self._puts_since_eviction = 0
+            if run_eviction:
+                self._evict_disk(conn, now)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and the hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            conn = self.get_connection()
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+
+    def _remember(self, key: str, vector: np.ndarray, created_at: float):
+        """Insert into the LRU, evicting the least recently used entries (lock held)."""
+        self._memory[key] = (vector, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _evict_disk(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries and trim the store to max_disk_entries."""
+        conn.execute("DELETE FROM embeddings WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            # Evict a little extra so eviction does not run on every insert
+            excess += self.max_disk_entries // 10
+            cursor = conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            with self._lock:
+                self._stats["disk_evictions"] += cursor.rowcount
+        conn.commit()
@@ -0,0 +1,84 @@
+"""Embedding checkpoint module.
+
+This module provides the EmbeddingCheckpoint class, which persists the
+embeddings of each completed document batch so that an interrupted embedding
+run resumes from the batches it already paid for instead of restarting.
+Batches are keyed by a hash of the embedding backend, model, output
+dimension and the batch texts.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+
+class EmbeddingCheckpoint:
+    """Directory of completed embedding batches stored as .npy files."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize checkpoint.
+
+        Args:
+            directory: Directory holding one file per completed batch
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        texts: List[str],
+        backend: Optional[str] = None,
+        dimension: Optional[int] = None
+    ) -> str:
+        """Build the key of a batch from the embedding backend, model, output dimension and its texts."""
+        digest = hashlib.sha256(f"{backend or ''}\x00{model_name}\x00{dimension or ''}".encode("utf-8"))
+        for text in texts:
+            digest.update(b"\x00")
+            digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, key: str, dimension: Optional[int] = None) -> Optional[List[List[float]]]:
+        """
+        Load the embeddings of a completed batch.
+
+        Args:
+            key: Batch key
+            dimension: Expected embedding dimension (None skips the check)
+
+        Returns:
+            Embedding vectors, or None if the batch is not checkpointed or has
+            embeddings of another dimension
+        """
+        path = self.directory / f"{key}.npy"
+        if not path.exists():
+            return None
+        try:
+            embeddings = np.load(path)
+        except (OSError, ValueError):
+            # Partially written file from a crashed run
+            return None
+        if embeddings.ndim != 2 or (dimension is not None and embeddings.shape[1] != dimension):
+            return None
+        return embeddings.tolist()
+
+    def save(self, key: str, embeddings: List[List[float]]):
+        """
+        Persist the embeddings of a completed batch.
+
+        Args:
+            key: Batch key
+            embeddings: Embedding vectors of the batch
+        """
+        path = self.directory / f"{key}.npy"
+        tmp_path = self.directory / f"{key}.tmp.npy"
+        np.save(tmp_path, np.asarray(embeddings, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        """Remove the checkpoint directory once the run has completed."""
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,258 @@
+"""FAQ question index module.
+
+This module provides the FAQIndex class, which answers questions that are
+(nearly) verbatim copies of the canonical FAQ questions without any
+embedding or LLM call. Questions of the "Q: ...\nA: ..." FAQ chunks are
+normalised into keys (lowercased, stopwords removed, words stemmed and
+sorted), so word order, filler words and inflections do not matter. A
+question whose key is a known key is an exact match; otherwise it is
+compared with every known question by the overlap of their word character
+trigrams (Dice coefficient), which tolerates typos. A fuzzy match only
+counts when it has as many content words as the FAQ question, is above the
+threshold and is clearly ahead of the best match with a different answer,
+so added words such as a negation or a second request never match. The index is built from the FAQ chunks of the
+current vector store snapshot, so rebuilds and live updates are picked up.
+"""
+
+import json
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .columnar import ColumnarMetadata
+from .snapshots import resolve_snapshot_path
+from .text_store import ChunkTextStore
+
+FAQ_DOCUMENT_NAME = "faq.yaml"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_NEGATION = re.compile(r"n['’]t\b")
+_CONTRACTION = re.compile(r"['’](s|re|ve|ll|d|m)\b")
+_QA = re.compile(r"^\s*Q:\s*(?P<question>.+?)\s*\n\s*A:\s*(?P<answer>.+?)\s*$", re.DOTALL)
+
+# Function words that do not change what an FAQ question asks ("not"/"no" do, so they are kept)
+STOPWORDS = frozenset("""
+    a an the is are was were be been being am do does did doing have has had having
+    i me my we our you your it its they them their this that these those there here
+    what which who whom whose how when where why can could should would will shall may might must
+    to of in on at by for with from about into onto as and or if so than then too very just
+    please tell explain know want like need get some any
+""".split())
+
+# Suffixes stripped by stem(), longest first
+_SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "ies", "ied", "ers", "er", "ed", "ly", "s")
+
+
+def stem(word: str) -> str:
+    """
+    Reduce a word to a crude stem by stripping common English suffixes.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Stem, e.g. "deposits", "depositing" and "deposited" all become "deposit"
+    """
+    if len(word) <= 3:
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if suffix in ("ies", "ied"):
+                word += "y"
+            elif word[-1] == word[-2] and word[-1] not in "aeiouls":
+                word = word[:-1]  # "planning" -> "plan"
+            break
+    # "charge" and "charging" share the stem "charg"
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normalise a question into its lookup key.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Sorted, space-separated stems of the question's content words
+    """
+    text = _CONTRACTION.sub("", _NEGATION.sub(" not", text.lower()))
+    words = _WORD.findall(text)
+    stems = {stem(word) for word in words if word not in STOPWORDS}
+    if not stems:
+        # A question made only of stopwords still needs a key
+        stems = set(words)
+    return " ".join(sorted(stems))
+
+
+def _trigrams(key: str) -> Set[str]:
+    """Character trigrams of each word of a key, padded so word boundaries count."""
+    grams = set()
+    for word in key.split():
+        padded = f"#{word}#"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def parse_qa(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Split an FAQ chunk into its question and answer.
+
+    Args:
+        text: Chunk text in the form "Q: <question>\\nA: <answer>"
+
+    Returns:
+        Tuple of (question, answer), or None if the text is not a Q&A pair
+    """
+    match = _QA.match(text)
+    if match is None:
+        return None
+    return match.group("question").strip(), match.group("answer").strip()
+
+
+def load_faq_pairs(vectorstore_path: str, document_name: str = FAQ_DOCUMENT_NAME) -> List[Tuple[str, str]]:
+    """
+    Read the Q&A pairs of a document from the current vector store snapshot.
+
+    Only metadata and chunk texts are read; the FAISS index is not loaded.
+
+    Args:
+        vectorstore_path: Path to the vector store directory
+        document_name: Document whose chunks are Q&A pairs
+
+    Returns:
+        (question, answer) tuples of the document's live chunks
+    """
+    snapshot_path = resolve_snapshot_path(Path(vectorstore_path))
+    if (snapshot_path / "metadata_columns" / "schema.json").exists():
+        metadata = ColumnarMetadata(snapshot_path / "metadata_columns")
+    elif (snapshot_path / "metadata.json").exists():
+        with open(snapshot_path / "metadata.json", 'r') as f:
+            metadata = json.load(f)
+    else:
+        return []
+    text_store = None
+    if (snapshot_path / "texts" / "header.json").exists():
+        text_store = ChunkTextStore.load(snapshot_path / "texts")
+
+    pairs = []
+    for row, row_metadata in enumerate(metadata):
+        if row_metadata is None or row_metadata.get("document_name") != document_name:
+            continue
+        text = text_store.get(row) if text_store is not None and row < len(text_store) else row_metadata.get("text", "")
+        pair = parse_qa(text or "")
+        if pair is not None:
+            pairs.append(pair)
+    return pairs
+
+
+class FAQIndex:
+    """Normalised-question lookup of canonical FAQ answers."""
+
+    def __init__(self, pairs: List[Tuple[str, str]], threshold: float = 0.85, margin: float = 0.1):
+        """
+        Build the index.
+
+        Args:
+            pairs: (question, answer) tuples
+            threshold: Minimum trigram Dice similarity of a fuzzy match
+            margin: Minimum similarity lead of a fuzzy match over the best match with another answer
+        """
+        self.threshold = threshold
+        self.margin = margin
+        self._entries: List[Dict[str, Any]] = []
+        # Keys shared by questions with different answers are ambiguous and never match exactly
+        self._exact: Dict[str, Optional[int]] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for question, answer in pairs:
+            key = normalize_question(question)
+            entry_id = len(self._entries)
+            grams = _trigrams(key)
+            self._entries.append({
+                "question": question, "answer": answer, "key": key, "size": len(grams), "words": len(key.split())
+            })
+            if key in self._exact and self._exact[key] is not None and self._entries[self._exact[key]]["answer"] != answer:
+                self._exact[key] = None
+            else:
+                self._exact.setdefault(key, entry_id)
+            for gram in grams:
+                self._postings[gram].append(entry_id)
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "fuzzy_hits": 0, "misses": 0}
+
+    @classmethod
+    def from_vectorstore(
+        cls,
+        vectorstore_path: str,
+        document_name: str = FAQ_DOCUMENT_NAME,
+        **kwargs
+    ) -> "FAQIndex":
+        """Build the index from the FAQ chunks of the current vector store snapshot."""
+        return cls(load_faq_pairs(vectorstore_path, document_name), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the canonical answer to a question.
+
+        Args:
+            question: User question
+
+        Returns:
+            Dict with the matched FAQ question, answer, match type ('exact' or 'fuzzy')
+            and similarity, or None when no FAQ question matches confidently
+        """
+        key = normalize_question(question)
+        hit = None
+        entry_id = self._exact.get(key)
+        if entry_id is not None:
+            hit = {**self._entries[entry_id], "match": "exact", "similarity": 1.0}
+        elif key not in self._exact:
+            hit = self._fuzzy_match(key)
+
+        with self._lock:
+            self._stats["misses" if hit is None else f"{hit['match']}_hits"] += 1
+        if hit is None:
+            return None
+        return {name: hit[name] for name in ("question", "answer", "match", "similarity")}
+
+    def _fuzzy_match(self, key: str) -> Optional[Dict[str, Any]]:
+        """Best trigram match of a key, if above the threshold and clearly ahead of other answers."""
+        grams = _trigrams(key)
+        if not grams:
+            return None
+        words = len(key.split())
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for entry_id in self._postings.get(gram, ()):
+                if self._entries[entry_id]["words"] == words:
+                    shared[entry_id] += 1
+        scored = sorted(
+            ((2 * count / (len(grams) + self._entries[entry_id]["size"]), entry_id) for entry_id, count in shared.items()),
+            reverse=True
+        )
+        if not scored or scored[0][0] < self.threshold:
+            return None
+        best_similarity, best_id = scored[0]
+        best_answer = self._entries[best_id]["answer"]
+        runner_up = next((similarity for similarity, entry_id in scored[1:]
+                          if self._entries[entry_id]["answer"] != best_answer), 0.0)
+        if best_similarity - runner_up < self.margin:
+            return None
+        return {**self._entries[best_id], "match": "fuzzy", "similarity": round(best_similarity, 4)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters, the hit rate and the number of indexed questions."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["exact_hits"] + stats["fuzzy_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["fuzzy_hits"]) / lookups, 4) if lookups else 0.0
+        stats["questions"] = len(self._entries)
+        return stats
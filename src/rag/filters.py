@@ -0,0 +1,191 @@
+"""Metadata filter engine module.
+
+This module provides the MetadataFilterIndex class that precomputes ID sets
+from vector store metadata so filtered searches can be pushed down into FAISS
+as ID selectors. Pushing the predicate into the search makes filtered queries
+return exactly k hits (when k documents match) instead of over-fetching and
+filtering afterwards.
+
+Filters are dictionaries mapping a metadata field to:
+- a single value (equality), e.g. {"document_type": "faq_rag"}
+- a list, tuple or set of values (membership), e.g. {"source": ["faq.pdf", "user_guide.pdf"]}
+- a range dict with any of gte/gt/lte/lt, e.g. {"chunk_index": {"gte": 0, "lt": 10}}
+
+Deleted documents (None metadata rows) never match, and an empty filter
+selects all documents that have not been deleted.
+"""
+
+from typing import List, Dict, Any, Optional, Sequence
+import faiss
+import numpy as np
+
+RANGE_OPERATORS = ("gte", "gt", "lte", "lt")
+
+
+class MetadataFilterIndex:
+    """Per-field ID sets and sorted value arrays built from vector store metadata."""
+
+    # Fields indexed eagerly; any other field is indexed on first use
+    CATEGORICAL_FIELDS = ("document_type", "source", "document_name")
+    RANGE_FIELDS = ("chunk_index",)
+
+    def __init__(self, metadata: Sequence[Optional[Dict[str, Any]]]):
+        """
+        Initialize filter index.
+
+        Args:
+            metadata: Vector store metadata, positionally aligned with FAISS ids
+        """
+        self.metadata = metadata
+        self.size = len(metadata)
+        self._value_ids: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._sorted_values: Dict[str, tuple] = {}
+        self._live_ids: Optional[np.ndarray] = None
+
+        for field in self.CATEGORICAL_FIELDS:
+            self._build_value_ids(field)
+        for field in self.RANGE_FIELDS:
+            self._build_sorted_values(field)
+
+    def select(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Resolve filters to the sorted array of matching ids.
+
+        Args:
+            filters: Mapping of metadata field to value, collection of values or range dict
+
+        Returns:
+            Sorted int64 array of matching ids
+        """
+        selected: Optional[np.ndarray] = None
+        for field, condition in filters.items():
+            ids = self._select_field(field, condition)
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+            if len(selected) == 0:
+                break
+
+        if selected is None:
+            return self.live_ids
+        return selected
+
+    @property
+    def live_ids(self) -> np.ndarray:
+        """Sorted int64 ids of the documents that have not been deleted."""
+        if self._live_ids is None:
+            # Columnar metadata knows its deleted rows without materializing rows
+            column_deleted_ids = getattr(self.metadata, "deleted_ids", None)
+            if column_deleted_ids is not None:
+                deleted_ids = column_deleted_ids()
+            else:
+                deleted_ids = np.array(
+                    [idx for idx, metadata in enumerate(self.metadata) if metadata is None], dtype=np.int64
+                )
+            self._live_ids = np.setdiff1d(np.arange(self.size, dtype=np.int64), deleted_ids, assume_unique=True)
+        return self._live_ids
+
+    def make_selector(self, ids: np.ndarray) -> faiss.IDSelector:
+        """
+        Build a FAISS ID selector for a set of ids.
+
+        Args:
+            ids: Ids returned by select()
+
+        Returns:
+            IDSelectorBitmap accepting exactly the given ids
+        """
+        mask = np.zeros(self.size, dtype=bool)
+        mask[ids] = True
+        bitmap = np.packbits(mask, bitorder='little')
+        selector = faiss.IDSelectorBitmap(self.size, faiss.swig_ptr(bitmap))
+        # Keep the bitmap alive for as long as the selector is used
+        selector.referenced_objects = [bitmap]
+        return selector
+
+    def _select_field(self, field: str, condition: Any) -> np.ndarray:
+        """Resolve a single field condition to matching ids."""
+        if isinstance(condition, dict):
+            unknown = set(condition) - set(RANGE_OPERATORS)
+            if unknown:
+                raise ValueError(f"Unsupported range operators for '{field}': {sorted(unknown)}")
+            return self._select_range(field, condition)
+
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            value_ids = self._build_value_ids(field)
+            parts = [value_ids[value] for value in condition if value in value_ids]
+            if not parts:
+                return np.empty(0, dtype=np.int64)
+            return np.unique(np.concatenate(parts))
+
+        return self._build_value_ids(field).get(condition, np.empty(0, dtype=np.int64))
+
+    def _select_range(self, field: str, condition: Dict[str, Any]) -> np.ndarray:
+        """Resolve a range condition using binary search over sorted values."""
+        values, order = self._build_sorted_values(field)
+        start, end = 0, len(values)
+        if "gte" in condition:
+            start = max(start, np.searchsorted(values, condition["gte"], side='left'))
+        if "gt" in condition:
+            start = max(start, np.searchsorted(values, condition["gt"], side='right'))
+        if "lte" in condition:
+            end = min(end, np.searchsorted(values, condition["lte"], side='right'))
+        if "lt" in condition:
+            end = min(end, np.searchsorted(values, condition["lt"], side='left'))
+        if start >= end:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(order[start:end])
+
+    def _build_value_ids(self, field: str) -> Dict[Any, np.ndarray]:
+        """Build (or return cached) value -> ids mapping for a field."""
+        if field in self._value_ids:
+            return self._value_ids[field]
+
+        # Columnar metadata can group ids without materializing rows
+        column_value_ids = getattr(self.metadata, "value_ids", None)
+        if column_value_ids is not None:
+            value_ids = column_value_ids(field) or {}
+            self._value_ids[field] = value_ids
+            return value_ids
+
+        groups: Dict[Any, List[int]] = {}
+        for idx, metadata in enumerate(self.metadata):
+            if metadata is None or field not in metadata:
+                continue
+            value = metadata[field]
+            try:
+                groups.setdefault(value, []).append(idx)
+            except TypeError:
+                continue  # Unhashable values cannot be filtered on
+
+        value_ids = {value: np.array(ids, dtype=np.int64) for value, ids in groups.items()}
+        self._value_ids[field] = value_ids
+        return value_ids
+
+    def _build_sorted_values(self, field: str) -> tuple:
+        """Build (or return cached) sorted numeric values and their ids for a field."""
+        if field in self._sorted_values:
+            return self._sorted_values[field]
+
+        column_numeric_values = getattr(self.metadata, "numeric_values", None)
+        numeric = column_numeric_values(field) if column_numeric_values is not None else None
+        if numeric is not None:
+            ids_array, values_array = numeric
+            order = np.argsort(values_array, kind='stable')
+            sorted_values = (values_array[order], ids_array[order])
+            self._sorted_values[field] = sorted_values
+            return sorted_values
+
+        ids = []
+        values = []
+        for idx, metadata in enumerate(self.metadata):
+            if metadata is None:
+                continue
+            value = metadata.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                ids.append(idx)
+                values.append(value)
+
+        values_array = np.array(values, dtype=np.float64)
+        order = np.argsort(values_array, kind='stable')
+        sorted_values = (values_array[order], np.array(ids, dtype=np.int64)[order])
+        self._sorted_values[field] = sorted_values
+        return sorted_values
@@ -0,0 +1,213 @@
+"""FAISS index factory module.
+
+This module builds the FAISS index used by VectorStore from an index type
+name, an optional vector quantization and parameters, and builds per-query
+search parameters (ID selectors, nprobe, efSearch) for whichever index type
+is in use.
+
+Supported index types:
+- flat: exact brute-force search (IndexFlatL2)
+- ivf_flat: inverted file with exact distances inside probed lists
+- ivf_pq: inverted file with product-quantized vectors
+- hnsw: hierarchical navigable small world graph
+
+Supported quantizations (how vectors are stored inside the index):
+- none: full-precision float32 (4 bytes per dimension)
+- fp16: half-precision scalar quantizer (2 bytes per dimension)
+- sq8: 8-bit scalar quantizer (1 byte per dimension)
+- pq: product quantizer with pq_m codes of pq_nbits bits each
+"""
+
+import math
+from typing import Dict, Any, Optional, Tuple
+import faiss
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+QUANTIZATIONS = ("none", "fp16", "sq8", "pq")
+
+# FAISS factory storage component for each scalar quantization
+QUANTIZATION_STORAGE = {"none": "Flat", "fp16": "SQfp16", "sq8": "SQ8"}
+
+DEFAULT_INDEX_PARAMS: Dict[str, Any] = {
+    "quantization": "none",  # Vector storage, one of QUANTIZATIONS
+    "nlist": None,           # IVF lists; None picks ~4 * sqrt(n) bounded by the training set size
+    "nprobe": 16,            # IVF lists probed per query
+    "pq_m": 64,              # PQ sub-quantizers (must divide the dimension)
+    "pq_nbits": 8,           # Bits per PQ code
+    "hnsw_m": 32,            # HNSW neighbours per node
+    "ef_construction": 40,   # HNSW build-time candidate list size
+    "ef_search": 64,         # HNSW query-time candidate list size
+}
+
+# Parameters that apply to each index type
+INDEX_TYPE_PARAMS: Dict[str, Tuple[str, ...]] = {
+    "flat": (),
+    "ivf_flat": ("nlist", "nprobe"),
+    "ivf_pq": ("nlist", "nprobe"),
+    "hnsw": ("hnsw_m", "ef_construction", "ef_search"),
+}
+
+# FAISS k-means wants at least this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def resolve_index_params(
+    index_type: str,
+    dimension: int,
+    n_vectors: Optional[int] = None,
+    index_params: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Validate an index configuration and fill in defaults.
+
+    Falls back to a flat index when there are too few vectors to train the
+    requested index type, and to unquantized storage when there are too few
+    vectors to train the product quantizer.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        dimension: Vector dimension
+        n_vectors: Number of vectors the index will be trained on, if known
+        index_params: Overrides for DEFAULT_INDEX_PARAMS
+
+    Returns:
+        Tuple of (effective index type, resolved parameters including the factory string)
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Expected one of: {', '.join(INDEX_TYPES)}")
+
+    params = {**DEFAULT_INDEX_PARAMS, **(index_params or {})}
+    quantization = params["quantization"] or "none"
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization '{quantization}'. Expected one of: {', '.join(QUANTIZATIONS)}")
+    if index_type == "ivf_pq":
+        if quantization not in ("none", "pq"):
+            raise ValueError(f"ivf_pq indexes always use PQ storage, got quantization '{quantization}'")
+        quantization = "pq"
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        if params["nlist"] is None:
+            n = n_vectors or 10000
+            params["nlist"] = max(1, min(int(4 * math.sqrt(n)), n // MIN_POINTS_PER_CENTROID))
+        if n_vectors is not None and n_vectors < params["nlist"]:
+            print(f"⚠ Warning: {n_vectors} vectors cannot train {params['nlist']} IVF lists, using flat index")
+            return resolve_index_params("flat", dimension, n_vectors, index_params)
+
+    if quantization == "pq":
+        if dimension % params["pq_m"] != 0:
+            raise ValueError(f"pq_m ({params['pq_m']}) must divide the dimension ({dimension})")
+        if n_vectors is not None and n_vectors < 2 ** params["pq_nbits"]:
+            print(f"⚠ Warning: {n_vectors} vectors cannot train {2 ** params['pq_nbits']} PQ centroids, using unquantized storage")
+            fallback_type = "flat" if index_type == "ivf_pq" else index_type
+            return resolve_index_params(fallback_type, dimension, n_vectors, {**params, "quantization": "none"})
+
+    if quantization == "pq":
+        storage = f"PQ{params['pq_m']}x{params['pq_nbits']}"
+    else:
+        storage = QUANTIZATION_STORAGE[quantization]
+
+    if index_type == "flat" and quantization == "pq":
+        # IndexPQ rejects search parameters (and so ID selectors); a single-list
+        # IVF-PQ scans the same codes exhaustively and accepts them
+        factory = f"IVF1,{storage}"
+    elif index_type == "flat":
+        factory = storage
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        factory = f"IVF{params['nlist']},{storage}"
+    else:
+        factory = f"HNSW{params['hnsw_m']},{storage}"
+
+    resolved = {name: params[name] for name in INDEX_TYPE_PARAMS[index_type]}
+    resolved["quantization"] = quantization
+    if quantization == "pq":
+        resolved["pq_m"] = params["pq_m"]
+        resolved["pq_nbits"] = params["pq_nbits"]
+    resolved["factory"] = factory
+    return index_type, resolved
+
+
+def create_index(
+    index_type: str = "flat",
+    dimension: int = 1536,
+    n_vectors: Optional[int] = None,
+    index_params: Optional[Dict[str, Any]] = None
+) -> Tuple[faiss.Index, str, Dict[str, Any]]:
+    """
+    Create an (untrained) FAISS index.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        dimension: Vector dimension
+        n_vectors: Number of vectors the index will be trained on, if known
+        index_params: Overrides for DEFAULT_INDEX_PARAMS
+
+    Returns:
+        Tuple of (index, effective index type, resolved parameters)
+    """
+    index_type, params = resolve_index_params(index_type, dimension, n_vectors, index_params)
+    index = faiss.index_factory(dimension, params["factory"], faiss.METRIC_L2)
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        faiss.extract_index_ivf(index).nprobe = min(params["nprobe"], params["nlist"])
+    elif index_type == "hnsw":
+        hnsw_index = faiss.downcast_index(index)
+        hnsw_index.hnsw.efConstruction = params["ef_construction"]
+        hnsw_index.hnsw.efSearch = params["ef_search"]
+
+    return index, index_type, params
+
+
+def make_search_parameters(
+    index: faiss.Index,
+    selector: Optional[faiss.IDSelector] = None,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None
+) -> Optional[faiss.SearchParameters]:
+    """
+    Build FAISS search parameters for a query.
+
+    Settings that are not given keep the values stored on the index.
+
+    Args:
+        index: Index that will be searched
+        selector: Optional ID selector restricting the candidates
+        nprobe: IVF lists to probe (IVF indexes only)
+        ef_search: HNSW candidate list size (HNSW indexes only)
+
+    Returns:
+        SearchParameters, or None when the index defaults apply unchanged
+    """
+    if selector is None and nprobe is None and ef_search is None:
+        return None
+
+    ivf_index = _extract_ivf(index)
+    if ivf_index is not None:
+        params = faiss.SearchParametersIVF()
+        params.nprobe = nprobe or ivf_index.nprobe
+    else:
+        hnsw_index = _extract_hnsw(index)
+        if hnsw_index is not None:
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = ef_search or hnsw_index.hnsw.efSearch
+        else:
+            params = faiss.SearchParameters()
+
+    if selector is not None:
+        params.sel = selector
+        # Keep Python-side references (e.g. bitmaps) alive with the parameters
+        params.referenced_objects = [selector]
+    return params
+
+
+def _extract_ivf(index: faiss.Index) -> Optional[faiss.IndexIVF]:
+    """Return the IVF index inside index, if any."""
+    try:
+        return faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return None
+
+
+def _extract_hnsw(index: faiss.Index) -> Optional[faiss.IndexHNSW]:
+    """Return the HNSW index inside index, if any."""
+    index = faiss.downcast_index(index)
+    return index if isinstance(index, faiss.IndexHNSW) else None
@@ -0,0 +1,185 @@
+"""Lexical search module.
+
+This module provides the BM25Index class, an in-memory inverted index over
+chunk texts that complements the FAISS index with exact-term matching
+(amounts, product names, acronyms such as KYC). Postings are stored in CSR
+form as numpy arrays so the index persists to .npy files next to the FAISS
+index and can be memory-mapped on load. Lexical search needs no embedding
+call, so it also serves as a fallback when the embedding service is down.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Words, plus currency symbols that carry meaning in amounts like "€100"
+_TOKEN_PATTERN = re.compile(r"\w+|[€$£¥%]")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its "
+    "me my of on or so that the this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into word and currency tokens without stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 inverted index with CSR postings."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.empty(0, dtype=np.int32)
+        self.term_freqs = np.empty(0, dtype=np.float32)
+        self.doc_lengths = np.empty(0, dtype=np.float32)
+
+    @property
+    def num_docs(self) -> int:
+        """Number of indexed documents."""
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts: List[str], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """
+        Build an index over texts, numbering documents from 0.
+
+        Args:
+            texts: Document texts
+            k1: Term frequency saturation
+            b: Document length normalisation
+
+        Returns:
+            BM25Index over the texts
+        """
+        index = cls(k1=k1, b=b)
+        index.add(texts)
+        return index
+
+    def add(self, texts: List[str]):
+        """
+        Append documents, numbering them after the existing ones.
+
+        Args:
+            texts: Document texts
+        """
+        vocabulary = dict(self.vocabulary)
+        terms, doc_ids, term_freqs = [], [], []
+        doc_lengths = np.empty(len(texts), dtype=np.float32)
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[position] = len(tokens)
+            for term, count in Counter(tokens).items():
+                terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_ids.append(self.num_docs + position)
+                term_freqs.append(count)
+
+        # Merge the new postings with the existing ones, grouped by term id
+        existing_terms = np.repeat(np.arange(len(self.vocabulary), dtype=np.int64), np.diff(self.offsets))
+        all_terms = np.concatenate([existing_terms, np.asarray(terms, dtype=np.int64)])
+        order = np.argsort(all_terms, kind="stable")
+        self.doc_ids = np.concatenate([self.doc_ids, np.asarray(doc_ids, dtype=np.int32)])[order]
+        self.term_freqs = np.concatenate([self.term_freqs, np.asarray(term_freqs, dtype=np.float32)])[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(all_terms, minlength=len(vocabulary)))])
+        self.doc_lengths = np.concatenate([self.doc_lengths, doc_lengths])
+        self.vocabulary = vocabulary
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        allowed_ids: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Query text
+            k: Number of results to return
+            allowed_ids: Optional sorted document ids to restrict the search to
+
+        Returns:
+            Tuple of (scores, doc_ids) for the top matches, best first; documents
+            sharing no term with the query are not returned
+        """
+        if self.num_docs == 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        average_length = max(float(self.doc_lengths.mean()), 1.0)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tfs = self.term_freqs[start:end]
+            idf = np.log(1.0 + (self.num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[docs] / average_length)
+            scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+        if allowed_ids is not None:
+            mask = np.zeros(self.num_docs, dtype=bool)
+            mask[allowed_ids] = True
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return scores[candidates], candidates
+
+    def save(self, path: Path):
+        """
+        Save the index to a directory.
+
+        Args:
+            path: Directory to write the index files to
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path / "index.json", "w") as f:
+            json.dump({"k1": self.k1, "b": self.b, "terms": terms}, f)
+        np.save(path / "offsets.npy", self.offsets)
+        np.save(path / "doc_ids.npy", self.doc_ids)
+        np.save(path / "term_freqs.npy", self.term_freqs)
+        np.save(path / "doc_lengths.npy", self.doc_lengths)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = False) -> "BM25Index":
+        """
+        Load an index saved with save.
+
+        Args:
+            path: Directory containing the index files
+            mmap: Memory-map the posting arrays instead of reading them
+
+        Returns:
+            Loaded BM25Index
+        """
+        path = Path(path)
+        with open(path / "index.json", "r") as f:
+            header = json.load(f)
+        mmap_mode = "r" if mmap else None
+        index = cls(k1=header["k1"], b=header["b"])
+        index.vocabulary = {term: term_id for term_id, term in enumerate(header["terms"])}
+        index.offsets = np.load(path / "offsets.npy", mmap_mode=mmap_mode)
+        index.doc_ids = np.load(path / "doc_ids.npy", mmap_mode=mmap_mode)
+        index.term_freqs = np.load(path / "term_freqs.npy", mmap_mode=mmap_mode)
+        index.doc_lengths = np.load(path / "doc_lengths.npy", mmap_mode=mmap_mode)
+        return index
@@ -0,0 +1,385 @@
+"""Shared retrieval registry module.
+
+This module provides the RetrievalRegistry class, a process-wide cache of
+loaded vector stores and embedders. RAG tools use it to share one loaded
+FAISS index per vectorstore path and one embeddings client per model instead
+of re-reading the index from disk on every call. Embedders are created with
+the backend, model and dimension recorded in the store's version_info.json.
+Stores are hot reloaded when their CURRENT snapshot pointer (or, for stores
+without snapshots, their version_info.json) changes on disk; the new store is
+loaded while callers keep being served the previous one, and only the
+registry reference is swapped. Live updates (upserts and deletes) are applied
+to a private copy of the store, published as a new snapshot and swapped in
+the same way. Stores are memory-mapped by default so that worker processes
+share index pages through the OS page cache, and embedders share one query
+embedding cache. Stores with a shard manifest are served as a
+ShardedVectorStore; replaced sharded stores stop their shard workers after a
+grace period, once in-flight searches are done.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar, Union
+
+from .embedder import Embedder
+from .embedding_backends import EMBEDDING_BACKENDS
+from .embedding_cache import EmbeddingCache
+from .sharding import SHARD_MANIFEST, ShardedVectorStore, build_shards, read_shard_manifest
+from .snapshots import read_current, resolve_snapshot_path
+from .vectorstore import VectorStore
+from .retriever import Retriever
+from ..utils.utils import logger
+
+DEFAULT_VECTORSTORE_PATH = "data/vectorstore"
+# Seconds a replaced sharded store keeps its workers for searches still using it
+SHARD_RETIRE_SECONDS = 30.0
+
+T = TypeVar("T")
+
+
+class _StoreEntry:
+    """Loaded vector store together with the on-disk version it was loaded from."""
+
+    def __init__(self, store: Union[VectorStore, ShardedVectorStore], marker: Optional[Tuple], checked_at: float):
+        self.store = store
+        self.marker = marker
+        self.checked_at = checked_at
+
+
+class RetrievalRegistry:
+    """Thread-safe, lazily initialised cache of vector stores and embedders."""
+
+    def __init__(
+        self,
+        reload_check_interval: float = 1.0,
+        mmap: bool = True,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        shard_workers: Optional[str] = None
+    ):
+        """
+        Initialize retrieval registry.
+
+        Args:
+            reload_check_interval: Minimum seconds between on-disk version checks per store
+            mmap: Load stores memory-mapped instead of reading them into process memory
+            embedding_cache: Query embedding cache shared by all embedders
+                (created at data/cache/embeddings.db on first use if None)
+            shard_workers: How sharded stores serve their shards, 'process', 'local' or
+                'off' (ignore shards and serve the unsharded store); defaults to SHARD_WORKERS
+                or 'process'
+        """
+        self.reload_check_interval = reload_check_interval
+        self.mmap = mmap
+        self.embedding_cache = embedding_cache
+        self.shard_workers = shard_workers or os.getenv("SHARD_WORKERS", "process")
+        self._lock = threading.RLock()
+        self._embedders: Dict[Tuple, Embedder] = {}
+        self._stores: Dict[str, _StoreEntry] = {}
+        self._reloading: Set[str] = set()
+        # Serialises live updates so each one starts from the latest snapshot
+        self._update_lock = threading.Lock()
+
+    def get_embedder(
+        self,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        dimension: Optional[int] = None
+    ) -> Embedder:
+        """
+        Get the shared embedder for a model, creating it on first use.
+
+        Args:
+            model_name: Name of the embedding model (defaults to the Embedder default)
+            backend: Embedding backend (defaults to the Embedder default)
+            dimension: Output dimension (hashing backend only)
+
+        Returns:
+            Shared Embedder instance
+        """
+        key = (backend, model_name, dimension)
+        embedder = self._embedders.get(key)
+        if embedder is not None:
+            return embedder
+
+        with self._lock:
+            embedder = self._embedders.get(key)
+            if embedder is None:
+                if self.embedding_cache is None:
+                    self.embedding_cache = EmbeddingCache()
+                embedder = Embedder(
+                    model_name=model_name,
+                    cache=self.embedding_cache,
+                    backend=backend,
+                    dimension=dimension
+                )
+                self._embedders[key] = embedder
+            return embedder
+
+    def get_vectorstore(
+        self,
+        vectorstore_path: str = DEFAULT_VECTORSTORE_PATH
+    ) -> Union[VectorStore, ShardedVectorStore]:
+        """
+        Get the shared, loaded vector store for a path.
+
+        The store is loaded on first use and reloaded when its on-disk version
+        changes. Callers that already hold a previous store keep using it safely,
+        and calls made while a reload is in progress get the previous store; the
+        new store only replaces the registry reference.
+
+        Args:
+            vectorstore_path: Path to the vector store directory
+
+        Returns:
+            Shared VectorStore instance (a ShardedVectorStore for sharded stores)
+        """
+        key = str(Path(vectorstore_path).resolve())
+        entry = self._stores.get(key)
+        if entry is not None and (
+            time.monotonic() - entry.checked_at < self.reload_check_interval or key in self._reloading
+        ):
+            return entry.store
+
+        if entry is None:
+            with self._lock:
+                entry = self._stores.get(key)
+                if entry is None:
+                    entry = self._load_store(key, self._version_marker(Path(key)), previous=None)
+                    self._stores[key] = entry
+                return entry.store
+
+        self._reload_if_changed(key)
+        return self._stores[key].store
+
+    def refresh(self) -> List[str]:
+        """
+        Reload every loaded vector store whose on-disk version changed.
+
+        Intended to be called periodically in the background, so that new
+        versions are picked up without a request paying for the load.
+
+        Returns:
+            Paths of the stores that were reloaded
+        """
+        return [key for key in list(self._stores) if self._reload_if_changed(key)]
+
+    def get_store_version(self, vectorstore_path: str = DEFAULT_VECTORSTORE_PATH) -> Optional[Tuple]:
+        """
+        Get a token identifying the on-disk version of the shared vector store.
+
+        The token changes whenever the store is rebuilt, so caches derived from
+        the store can invalidate themselves.
+
+        Args:
+            vectorstore_path: Path to the vector store directory
+
+        Returns:
+            Version token of the currently loaded store
+        """
+        self.get_vectorstore(vectorstore_path)
+        return self._stores[str(Path(vectorstore_path).resolve())].marker
+
+    def get_retriever(
+        self,
+        document_type: Optional[str] = None,
+        top_k: int = 5,
+        vectorstore_path: str = DEFAULT_VECTORSTORE_PATH,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        mode: str = "vector",
+        context_token_budget: Optional[int] = 1500
+    ) -> Retriever:
+        """
+        Get a retriever backed by the shared vector store.
+
+        Args:
+            document_type: Filter by document type (e.g., 'faq_rag', 'market_analysis')
+            top_k: Number of top results to return
+            vectorstore_path: Path to the vector store directory
+            nprobe: IVF lists to probe per query (IVF indexes only)
+            ef_search: HNSW candidate list size per query (HNSW indexes only)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
+            mode: Retrieval mode, 'vector', 'hybrid' or 'lexical'
+            context_token_budget: Token budget of context strings (None disables packing)
+
+        Returns:
+            Retriever using the shared VectorStore
+        """
+        return Retriever(
+            vectorstore=self.get_vectorstore(vectorstore_path),
+            top_k=top_k,
+            document_type=document_type,
+            nprobe=nprobe,
+            ef_search=ef_search,
+            rerank_factor=rerank_factor,
+            mode=mode,
+            context_token_budget=context_token_budget
+        )
+
+    def update_vectorstore(
+        self,
+        update: Callable[[VectorStore], T],
+        vectorstore_path: str = DEFAULT_VECTORSTORE_PATH
+    ) -> Tuple[T, int]:
+        """
+        Apply a change to the live vector store.
+
+        The change runs on a private, in-memory copy of the current snapshot, which
+        is then saved as a new snapshot and swapped in. Concurrent searches keep
+        using the previous store until the swap and never see a partial update.
+        Sharded stores are re-sharded from the new snapshot before the swap.
+
+        Args:
+            update: Function mutating the store copy (e.g. calling upsert or delete)
+            vectorstore_path: Path to the vector store directory
+
+        Returns:
+            The return value of update and the version of the snapshot it
+            published (the current version if nothing changed)
+        """
+        key = str(Path(vectorstore_path).resolve())
+        path = Path(key)
+        with self._update_lock:
+            embedder = self.get_embedder(**self._stored_embedding_config(path))
+            store = VectorStore(vectorstore_path=key, embedder=embedder)
+            store.load()
+            before = (store.index.ntotal, store.deleted_count)
+            result = update(store)
+            if (store.index.ntotal, store.deleted_count) == before:
+                # Nothing changed, keep the current snapshot
+                return result, store.get_version_info()["version"]
+            store.save()
+            version = store.get_version_info()["version"]
+            manifest = read_shard_manifest(path)
+            if manifest is not None:
+                build_shards(store, manifest["n_shards"], manifest["partition"])
+            entry = _StoreEntry(store, self._version_marker(path), time.monotonic())
+            if manifest is not None and self.shard_workers != "off":
+                entry = self._load_store(key, entry.marker, previous=None)
+            with self._lock:
+                previous = self._stores.get(key)
+                self._stores[key] = entry
+            if previous is not None:
+                self._retire(previous.store)
+            logger.info(f"Published live update of vector store at {key} (version {version})")
+            return result, version
+
+    def _reload_if_changed(self, key: str) -> bool:
+        """Reload a loaded store if its version changed; the load runs without holding the lock."""
+        with self._lock:
+            entry = self._stores[key]
+            entry.checked_at = time.monotonic()
+            marker = self._version_marker(Path(key))
+            if marker == entry.marker or key in self._reloading:
+                return False
+            self._reloading.add(key)
+
+        try:
+            new_entry = self._load_store(key, marker, previous=entry)
+            with self._lock:
+                self._stores[key] = new_entry
+            if new_entry.store is not entry.store:
+                self._retire(entry.store)
+        finally:
+            with self._lock:
+                self._reloading.discard(key)
+        return new_entry.marker == marker
+
+    def clear(self):
+        """Drop all cached stores and embedders, stopping shard workers."""
+        with self._lock:
+            stores = [entry.store for entry in self._stores.values()]
+            self._stores.clear()
+            self._embedders.clear()
+        for store in stores:
+            if isinstance(store, ShardedVectorStore):
+                store.close()
+
+    @staticmethod
+    def _retire(store: Union[VectorStore, ShardedVectorStore]):
+        """Stop the shard workers of a replaced store once searches still holding it are done."""
+        if isinstance(store, ShardedVectorStore):
+            timer = threading.Timer(SHARD_RETIRE_SECONDS, store.close)
+            timer.daemon = True
+            timer.start()
+
+    def _load_store(self, key: str, marker: Optional[Tuple], previous: Optional[_StoreEntry]) -> _StoreEntry:
+        """Load a vector store, keeping the previous one if the new version cannot be read."""
+        path = Path(key)
+        embedder = self.get_embedder(**self._stored_embedding_config(path))
+        if self.shard_workers != "off" and (path / SHARD_MANIFEST).exists():
+            store = ShardedVectorStore(vectorstore_path=key, embedder=embedder, workers=self.shard_workers)
+        else:
+            store = VectorStore(vectorstore_path=key, embedder=embedder)
+        try:
+            if isinstance(store, ShardedVectorStore):
+                store.load()
+            else:
+                store.load(mmap=self.mmap)
+        except FileNotFoundError:
+            pass  # Index not created yet
+        except Exception as e:
+            if previous is None:
+                raise
+            logger.warning(f"Failed to reload vector store at {key}, keeping previous version: {e}")
+            return _StoreEntry(previous.store, previous.marker, time.monotonic())
+
+        if previous is not None:
+            logger.info(f"Reloaded vector store at {key} (version {store.get_version_info().get('version', 'unknown')})")
+        return _StoreEntry(store, marker, time.monotonic())
+
+    @classmethod
+    def _version_marker(cls, path: Path) -> Optional[Tuple]:
+        """Return a cheap fingerprint of the on-disk store version (and shard manifest, if any)."""
+        marker = cls._snapshot_marker(path)
+        try:
+            stat = (path / SHARD_MANIFEST).stat()
+        except FileNotFoundError:
+            return marker
+        return (marker, (SHARD_MANIFEST, stat.st_mtime_ns, stat.st_size))
+
+    @staticmethod
+    def _snapshot_marker(path: Path) -> Optional[Tuple]:
+        """Return a cheap fingerprint of the current snapshot."""
+        current = read_current(path)
+        if current is not None:
+            return ("CURRENT", current)
+        for name in ("version_info.json", "faiss_index.index"):
+            try:
+                stat = (path / name).stat()
+            except FileNotFoundError:
+                continue
+            return (name, stat.st_mtime_ns, stat.st_size)
+        return None
+
+    @staticmethod
+    def _stored_embedding_config(path: Path) -> Dict[str, Optional[object]]:
+        """Read the embedding backend, model and dimension the store was built with, if recorded."""
+        config = {"model_name": None, "backend": None, "dimension": None}
+        version_info_path = resolve_snapshot_path(path) / "version_info.json"
+        if not version_info_path.exists():
+            return config
+        try:
+            with open(version_info_path, 'r') as f:
+                version_info = json.load(f)
+        except (OSError, ValueError):
+            return config
+
+        model_name = version_info.get("embedding_model")
+        # Stores built before backends were configurable used OpenAI
+        backend = version_info.get("embedding_backend", "openai")
+        if not model_name or model_name == "unknown" or backend not in EMBEDDING_BACKENDS:
+            return config
+        config["model_name"] = model_name
+        config["backend"] = backend
+        if backend == "hashing":
+            config["dimension"] = version_info.get("dimension")
+        return config
+
+
+# Global registry instance
+retrieval_registry = RetrievalRegistry()
@@ -1,13 +1,51 @@
 """Retrieval mechanism module.
 
 This module provides the Retriever class that handles document retrieval
-using the vector store. It supports filtering by document type and formats
+using the vector store. It supports metadata filtering and formats
 retrieved documents as context strings for use in RAG applications.
+Retrieval runs in vector, lexical (BM25) or hybrid mode; hybrid mode fuses
+both rankings with reciprocal rank fusion, and vector and hybrid modes fall
+back to lexical search when the embedding service fails. Async variants
+(aretrieve, aretrieve_with_context) keep the event loop free while retrieving.
+Context strings are packed by a ContextPacker: overlapping and near-duplicate
+chunks are collapsed and the context is capped at a token budget.
 """
 
 from typing import List, Dict, Any, Optional
-from .vectorstore import VectorStore
+import numpy as np
+from .vectorstore import VectorStore, run_in_search_pool
+from .context_packer import ContextPacker
 from .extractor import DocumentExtractor
+from ..utils.utils import logger
+
+RETRIEVAL_MODES = ("vector", "hybrid", "lexical")
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Dict[str, Any]]],
+    k: int,
+    rrf_k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion.
+    
+    Each document scores sum(1 / (rrf_k + rank)) over the lists it appears in,
+    so no score normalisation between rankers is needed.
+    
+    Args:
+        result_lists: Ranked result lists, best first, with an "id" per result
+        k: Number of fused results to return
+        rrf_k: Rank damping constant
+    
+    Returns:
+        Top k results, best first, with the fused score as "score"
+    """
+    fused: Dict[int, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, 1):
+            entry = fused.setdefault(result["id"], {**result, "score": 0.0})
+            entry["score"] += 1.0 / (rrf_k + rank)
+    return sorted(fused.values(), key=lambda result: result["score"], reverse=True)[:k]
 
 
 class Retriever:
@@ -17,7 +55,16 @@ class Retriever:
         self,
         vectorstore: Optional[VectorStore] = None,
         top_k: int = 5,
-        document_type: Optional[str] = None
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        mode: str = "vector",
+        fusion_candidates: int = 20,
+        rrf_k: int = 60,
+        lexical_fallback: bool = True,
+        context_token_budget: Optional[int] = 1500
     ):
         """
         Initialize retriever.
@@ -26,7 +73,19 @@ class Retriever:
             vectorstore: VectorStore instance (will load if None)
             top_k: Number of top results to return
             document_type: Filter by document type (e.g., 'faq_rag', 'market_analysis')
+            filters: Default metadata filters (e.g., {'source': 'faq.pdf'})
+            nprobe: IVF lists to probe per query (IVF indexes only)
+            ef_search: HNSW candidate list size per query (HNSW indexes only)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
+            mode: Retrieval mode, 'vector', 'hybrid' (vector + BM25 fused with RRF) or 'lexical'
+            fusion_candidates: Results taken from each ranker before fusion in hybrid mode
+            rrf_k: Reciprocal rank fusion damping constant
+            lexical_fallback: Serve lexical results when embedding the query fails
+            context_token_budget: Token budget of context strings, filled with deduplicated
+                chunks in rank order (None formats all chunks verbatim)
         """
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}', expected one of {RETRIEVAL_MODES}")
         self.vectorstore = vectorstore or VectorStore()
         if vectorstore is None:
             try:
@@ -35,8 +94,23 @@ class Retriever:
                 pass  # Index not created yet
         self.top_k = top_k
         self.document_type = document_type
+        self.filters = filters
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.rerank_factor = rerank_factor
+        self.mode = mode
+        self.fusion_candidates = fusion_candidates
+        self.rrf_k = rrf_k
+        self.lexical_fallback = lexical_fallback
+        self.context_packer = ContextPacker(context_token_budget) if context_token_budget else None
     
-    def retrieve(self, query: str, k: Optional[int] = None, document_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    def retrieve(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant documents for a query.
         
@@ -44,28 +118,210 @@ class Retriever:
             query: Query text
             k: Number of results (defaults to top_k)
             document_type: Filter by document type (overrides instance default)
+            filters: Metadata filters (overrides instance default)
+        
+        Returns:
+            List of retrieved documents with metadata
+        """
+        k = k or self.top_k
+        doc_type = document_type or self.document_type
+        filters = filters or self.filters
+        if self.mode == "lexical":
+            return self.vectorstore.search_lexical(query, k=k, document_type=doc_type, filters=filters)
+        
+        try:
+            query_embeddings = [self.vectorstore.embedder.embed_text(query)]
+        except Exception as e:
+            return self._lexical_fallback([query], k, doc_type, filters, e)[0]
+        return self._search_embedded([query], query_embeddings, k, doc_type, filters)[0]
+    
+    async def aretrieve(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Asynchronously retrieve relevant documents for a query.
+        
+        The query is embedded with the async embeddings client and the searches
+        run on the shared search thread pool, so the event loop is never blocked.
+        
+        Args:
+            query: Query text
+            k: Number of results (defaults to top_k)
+            document_type: Filter by document type (overrides instance default)
+            filters: Metadata filters (overrides instance default)
         
         Returns:
             List of retrieved documents with metadata
         """
         k = k or self.top_k
         doc_type = document_type or self.document_type
-        return self.vectorstore.search(query, k=k, document_type=doc_type)
+        filters = filters or self.filters
+        if self.mode == "lexical":
+            return await run_in_search_pool(
+                self.vectorstore.search_lexical, query, k=k, document_type=doc_type, filters=filters
+            )
+        
+        try:
+            query_embeddings = [await self.vectorstore.embedder.aembed_text(query)]
+        except Exception as e:
+            results = await run_in_search_pool(self._lexical_fallback, [query], k, doc_type, filters, e)
+            return results[0]
+        results = await run_in_search_pool(self._search_embedded, [query], query_embeddings, k, doc_type, filters)
+        return results[0]
+    
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        k: Optional[int] = None,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant documents for several queries at once.
+        
+        Queries are embedded in one embedding call and searched with a single
+        FAISS call, which is much faster than calling retrieve in a loop.
+        
+        Args:
+            queries: Query texts
+            k: Number of results per query (defaults to top_k)
+            document_type: Filter by document type (overrides instance default)
+            filters: Metadata filters (overrides instance default)
+        
+        Returns:
+            One list of retrieved documents per query, in query order
+        """
+        if not queries:
+            return []
+        k = k or self.top_k
+        doc_type = document_type or self.document_type
+        filters = filters or self.filters
+        if self.mode == "lexical":
+            return [
+                self.vectorstore.search_lexical(query, k=k, document_type=doc_type, filters=filters)
+                for query in queries
+            ]
+        
+        try:
+            query_embeddings = self.vectorstore.embedder.embed_queries(queries)
+        except Exception as e:
+            return self._lexical_fallback(queries, k, doc_type, filters, e)
+        return self._search_embedded(queries, query_embeddings, k, doc_type, filters)
+    
+    def _search_embedded(
+        self,
+        queries: List[str],
+        query_embeddings: List[List[float]],
+        k: int,
+        document_type: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Run vector search for embedded queries, fused with lexical search in hybrid mode."""
+        hybrid = self.mode == "hybrid" and self.vectorstore.lexical_index is not None
+        candidates = max(k, self.fusion_candidates) if hybrid else k
+        vector_results = self.vectorstore.search_by_vectors(
+            np.asarray(query_embeddings, dtype='float32'), k=candidates, document_type=document_type,
+            filters=filters, nprobe=self.nprobe, ef_search=self.ef_search, rerank_factor=self.rerank_factor
+        )
+        if not hybrid:
+            return vector_results
+        
+        return [
+            reciprocal_rank_fusion(
+                [results, self.vectorstore.search_lexical(query, k=candidates, document_type=document_type, filters=filters)],
+                k, rrf_k=self.rrf_k
+            )
+            for query, results in zip(queries, vector_results)
+        ]
+    
+    def _lexical_fallback(
+        self,
+        queries: List[str],
+        k: int,
+        document_type: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        error: Exception
+    ) -> List[List[Dict[str, Any]]]:
+        """Serve lexical results after a failed query embedding, or re-raise if that is not possible."""
+        if not (self.lexical_fallback and self.vectorstore.lexical_index is not None):
+            raise error
+        logger.warning(f"Query embedding failed, falling back to lexical search: {error}")
+        return [
+            self.vectorstore.search_lexical(query, k=k, document_type=document_type, filters=filters)
+            for query in queries
+        ]
+    
+    def retrieve_with_context(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Retrieve documents and format as a deduplicated, token-budgeted context string.
+        
+        Args:
+            query: Query text
+            k: Number of results
+            document_type: Filter by document type (overrides instance default)
+            filters: Metadata filters (overrides instance default)
+        
+        Returns:
+            Formatted context string
+        """
+        return self.pack_context(self.retrieve(query, k, document_type, filters))
     
-    def retrieve_with_context(self, query: str, k: Optional[int] = None, document_type: Optional[str] = None) -> str:
+    async def aretrieve_with_context(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        Retrieve documents and format as context string.
+        Asynchronously retrieve documents and format as a deduplicated, token-budgeted context string.
         
         Args:
             query: Query text
             k: Number of results
             document_type: Filter by document type (overrides instance default)
+            filters: Metadata filters (overrides instance default)
+        
+        Returns:
+            Formatted context string
+        """
+        return self.pack_context(await self.aretrieve(query, k, document_type, filters))
+    
+    def pack_context(self, results: List[Dict[str, Any]]) -> str:
+        """
+        Deduplicate results, fit them into the context token budget and format them.
+        
+        Args:
+            results: Retrieved documents, best first
         
         Returns:
             Formatted context string
         """
-        results = self.retrieve(query, k, document_type)
+        if self.context_packer is not None:
+            results = self.context_packer.pack(results)
+        return self.format_context(results)
+    
+    @staticmethod
+    def format_context(results: List[Dict[str, Any]]) -> str:
+        """
+        Format retrieved documents as a context string.
         
+        Args:
+            results: Retrieved documents
+        
+        Returns:
+            Formatted context string
+        """
         if not results:
             return "No relevant information found."
         
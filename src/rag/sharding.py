@@ -0,0 +1,591 @@
+"""Sharded vector search module.
+
+This module splits a built vector store into N shards and serves them with a
+scatter-gather search. Shards are partitioned by a hash of the stable chunk id
+or by document type, and each shard is a regular vector store snapshot under
+<store>/shards/, described by the manifest <store>/shards.json. The manifest
+pins the snapshot of every shard, so a rebuild in progress is never mixed
+with the shards of the previous build.
+
+ShardedVectorStore offers the search interface the Retriever uses: queries
+are embedded once, sent to all shards in parallel and the per-shard top-k
+lists are merged by score. Each shard is served either by a ShardWorker, a
+local worker process with its own memory-mapped copy of the shard (so
+searches spread across cores), or by a LocalShard, an in-process stand-in
+with the same interface. When shards are partitioned by document type,
+queries filtered to one document type only go to the shards holding it.
+Lexical (BM25) scores are computed with per-shard term statistics, so they
+approximate the scores of the unsharded store.
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import faiss
+import numpy as np
+
+from .index_factory import DEFAULT_INDEX_PARAMS
+from .vectorstore import VectorStore, run_in_search_pool
+from ..utils.utils import logger
+
+SHARD_MANIFEST = "shards.json"
+SHARDS_DIR = "shards"
+PARTITIONS = ("hash", "document_type")
+SHARD_WORKER_MODES = ("process", "local")
+# Result ids are (shard << SHARD_ID_BITS) | row, so they stay unique across shards
+SHARD_ID_BITS = 40
+# Methods a shard worker serves
+_SHARD_METHODS = ("search_by_vectors", "search_lexical")
+
+
+def read_shard_manifest(root: Path) -> Optional[Dict[str, Any]]:
+    """
+    Read the shard manifest of a vector store.
+
+    Args:
+        root: Vector store directory
+
+    Returns:
+        Manifest dict, or None if the store is not sharded
+    """
+    try:
+        with open(Path(root) / SHARD_MANIFEST, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def remove_shard_manifest(root: Path) -> bool:
+    """Stop serving a store sharded by removing its manifest and shards; returns whether a manifest existed."""
+    try:
+        os.remove(Path(root) / SHARD_MANIFEST)
+        existed = True
+    except FileNotFoundError:
+        existed = False
+    prune_shards(root, None)
+    return existed
+
+
+def prune_shards(root: Path, manifest: Optional[Dict[str, Any]]):
+    """
+    Delete the shard directories a manifest does not reference.
+
+    Processes that still have files of a deleted shard memory-mapped keep
+    reading them until they unmap (POSIX semantics).
+
+    Args:
+        root: Vector store directory
+        manifest: Current shard manifest (None deletes every shard)
+    """
+    shards_path = Path(root) / SHARDS_DIR
+    referenced = {Path(shard["path"]).parts[1] for shard in (manifest or {}).get("shards", [])}
+    for path in shards_path.glob("shard-*"):
+        if path.name not in referenced:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _write_shard_manifest(root: Path, manifest: Dict[str, Any]):
+    """Atomically replace the shard manifest."""
+    tmp_path = Path(root) / f"{SHARD_MANIFEST}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, Path(root) / SHARD_MANIFEST)
+
+
+def assign_shards(metadata: List[Dict[str, Any]], n_shards: int, partition: str = "hash") -> List[int]:
+    """
+    Assign chunks to shards.
+
+    Args:
+        metadata: Chunk metadata, one dict per chunk
+        n_shards: Number of shards
+        partition: 'hash' (crc32 of the stable chunk id) or 'document_type'
+            (document types are spread over the shards in sorted order)
+
+    Returns:
+        Shard number of each chunk
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"Unknown shard partition '{partition}'. Expected one of: {', '.join(PARTITIONS)}")
+    if n_shards < 1:
+        raise ValueError("n_shards must be at least 1")
+    if partition == "hash":
+        return [
+            zlib.crc32(VectorStore.chunk_id_of(metadata_row).encode("utf-8")) % n_shards
+            for metadata_row in metadata
+        ]
+    document_types = sorted({str(metadata_row.get("document_type")) for metadata_row in metadata})
+    shard_of_type = {document_type: i % n_shards for i, document_type in enumerate(document_types)}
+    return [shard_of_type[str(metadata_row.get("document_type"))] for metadata_row in metadata]
+
+
+def build_shards(source: VectorStore, n_shards: int, partition: str = "hash") -> Dict[str, Any]:
+    """
+    Split a built vector store into shards and publish their manifest.
+
+    Shards are derived from the source store's stored vectors, metadata and
+    texts, so nothing is re-embedded. Deleted chunks are left out and empty
+    shards are skipped. Each shard keeps the source's index type and
+    parameters (IVF list counts are re-sized for the shard).
+
+    Args:
+        source: Loaded or freshly built vector store
+        n_shards: Number of shards
+        partition: 'hash' or 'document_type' (see assign_shards)
+
+    Returns:
+        The published manifest
+    """
+    if source.index is None:
+        raise ValueError("No index to shard. Build or load the vector store first.")
+    if source.vectors is None or len(source.vectors) != source.index.ntotal:
+        raise ValueError("Sharding needs the full-precision vectors (vectors.npy). Rebuild the vector store first.")
+
+    root = source.vectorstore_path
+    rows = [row for row, metadata in enumerate(source.metadata) if metadata is not None]
+    metadata = [source.metadata[row] for row in rows]
+    assignments = np.asarray(assign_shards(metadata, n_shards, partition), dtype=np.int64)
+    rows = np.asarray(rows, dtype=np.int64)
+    index_params = {
+        name: value for name, value in source._resolved_index_params.items()
+        if name in DEFAULT_INDEX_PARAMS and name != "nlist"
+    }
+
+    shards = []
+    for shard in range(n_shards):
+        positions = np.flatnonzero(assignments == shard)
+        if len(positions) == 0:
+            continue
+        shard_rows = rows[positions]
+        store = VectorStore(
+            vectorstore_path=str(root / SHARDS_DIR / f"shard-{shard}"),
+            embedder=source.embedder,
+            dimension=source.dimension,
+            index_type=source._effective_index_type,
+            index_params=index_params,
+            rerank_factor=source.rerank_factor,
+            text_compression=source.text_compression,
+            keep_versions=source.keep_versions
+        )
+        store.create_index(n_vectors=len(shard_rows))
+        store.add_embeddings(
+            np.asarray(source.vectors[shard_rows], dtype='float32'),
+            [dict(metadata[position]) for position in positions],
+            texts=[source.text_store.get(int(row)) if source.text_store is not None else "" for row in shard_rows]
+        )
+        store.save()
+        shards.append({
+            "shard": shard,
+            "path": str(store.snapshot_path.relative_to(root)),
+            "count": len(shard_rows),
+            "document_types": sorted({str(metadata[position].get("document_type")) for position in positions}),
+        })
+
+    manifest = {
+        "partition": partition,
+        "n_shards": n_shards,
+        "source_version": source.get_version_info().get("version"),
+        "embedding_model": source.get_embedding_model_name(),
+        "embedding_backend": source.get_embedding_backend(),
+        "dimension": source.dimension,
+        "document_count": len(rows),
+        "shards": shards,
+        "created_at": datetime.now().isoformat(),
+    }
+    _write_shard_manifest(root, manifest)
+    # Shards of an earlier build with more shards or another partition
+    prune_shards(root, manifest)
+    print(f"✓ Sharded vector store into {len(shards)} shards by {partition}")
+    return manifest
+
+
+class _SearchOnlyEmbedder:
+    """Placeholder embedder for shards, which only ever search precomputed query vectors."""
+
+    def __init__(self, version_info: Dict[str, Any]):
+        self.embeddings = self
+        self.model = version_info.get("embedding_model", "unknown")
+        self.backend = version_info.get("embedding_backend", "unknown")
+        self.dimension = version_info.get("dimension")
+
+    def _refuse(self, *args, **kwargs):
+        raise RuntimeError("Shards search precomputed query vectors; embed queries with the sharded store's embedder")
+
+    embed_text = aembed_text = embed_queries = embed_documents = _refuse
+
+
+def _open_shard(snapshot_path: Path) -> VectorStore:
+    """Load a shard snapshot, memory-mapped, without an embeddings client."""
+    with open(Path(snapshot_path) / "version_info.json", 'r') as f:
+        version_info = json.load(f)
+    # A snapshot directory has no CURRENT pointer, so it loads as-is and stays pinned
+    store = VectorStore(vectorstore_path=str(snapshot_path), embedder=_SearchOnlyEmbedder(version_info))
+    store.load(mmap=True)
+    return store
+
+
+def _shard_info(store: VectorStore) -> Dict[str, Any]:
+    """Summary of a loaded shard reported to the sharded store."""
+    return {"lexical": store.lexical_index is not None, "version_info": store.get_version_info()}
+
+
+def _serve_shard(snapshot_path: str, conn, omp_threads: int):
+    """Worker process loop: load a shard and answer search requests until told to stop."""
+    faiss.omp_set_num_threads(omp_threads)
+    try:
+        store = _open_shard(Path(snapshot_path))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ok", _shard_info(store)))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+        method, args, kwargs = request
+        try:
+            if method not in _SHARD_METHODS:
+                raise ValueError(f"Unknown shard method '{method}'")
+            conn.send(("ok", getattr(store, method)(*args, **kwargs)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class LocalShard:
+    """In-process stand-in for a shard worker, with the same search interface."""
+
+    def __init__(self, snapshot_path: Path):
+        """
+        Load a shard in this process.
+
+        Args:
+            snapshot_path: Shard snapshot directory
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.store = _open_shard(self.snapshot_path)
+        self.info = _shard_info(self.store)
+
+    def search_by_vectors(self, *args, **kwargs) -> List[List[Dict[str, Any]]]:
+        """Search the shard, see VectorStore.search_by_vectors."""
+        return self.store.search_by_vectors(*args, **kwargs)
+
+    def search_lexical(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Search the shard by keywords, see VectorStore.search_lexical."""
+        return self.store.search_lexical(*args, **kwargs)
+
+    def close(self):
+        """Nothing to release; the shard is unmapped when the store is garbage collected."""
+
+
+class ShardWorker:
+    """Shard served by a local worker process over a pipe."""
+
+    def __init__(self, snapshot_path: Path, omp_threads: int = 1, start_timeout: float = 120.0):
+        """
+        Start a worker process and wait until it has loaded its shard.
+
+        Workers are spawned rather than forked, so they never inherit the
+        threads (search pool, OpenMP) of the serving process.
+
+        Args:
+            snapshot_path: Shard snapshot directory
+            omp_threads: OpenMP threads per worker (1 keeps N shards on N cores)
+            start_timeout: Seconds to wait for the shard to load
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.start_timeout = start_timeout
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve_shard,
+            args=(str(self.snapshot_path), child_conn, omp_threads),
+            name=f"shard-worker-{self.snapshot_path.parent.parent.name}",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        # One request in flight per worker; concurrent searches queue here
+        self._lock = threading.Lock()
+        self.info: Optional[Dict[str, Any]] = None
+
+    def wait_ready(self):
+        """Wait for the worker to report its loaded shard, raising if it failed to load."""
+        if not self._conn.poll(self.start_timeout):
+            self.close()
+            raise TimeoutError(f"Shard worker for {self.snapshot_path} did not start in {self.start_timeout}s")
+        status, payload = self._conn.recv()
+        if status != "ok":
+            self.close()
+            raise RuntimeError(f"Shard worker failed to load {self.snapshot_path}: {payload}")
+        self.info = payload
+
+    def _call(self, method: str, *args, **kwargs):
+        """Send a request to the worker and return its result."""
+        with self._lock:
+            try:
+                self._conn.send((method, args, kwargs))
+                status, payload = self._conn.recv()
+            except (EOFError, OSError) as e:
+                raise RuntimeError(f"Shard worker for {self.snapshot_path} is not running: {e}")
+        if status != "ok":
+            raise RuntimeError(f"Shard search failed in {self.snapshot_path}: {payload}")
+        return payload
+
+    def search_by_vectors(self, *args, **kwargs) -> List[List[Dict[str, Any]]]:
+        """Search the shard, see VectorStore.search_by_vectors."""
+        return self._call("search_by_vectors", *args, **kwargs)
+
+    def search_lexical(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Search the shard by keywords, see VectorStore.search_lexical."""
+        return self._call("search_lexical", *args, **kwargs)
+
+    def close(self, timeout: float = 5.0):
+        """Stop the worker process."""
+        with self._lock:
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout)
+            self._conn.close()
+
+
+class ShardedVectorStore:
+    """Scatter-gather search over the shards of a vector store."""
+
+    def __init__(
+        self,
+        vectorstore_path: str = "data/vectorstore",
+        embedder=None,
+        workers: str = "process",
+        omp_threads: int = 1
+    ):
+        """
+        Initialize sharded vector store.
+
+        Args:
+            vectorstore_path: Path of the sharded vector store (holding shards.json)
+            embedder: Embedder for query embeddings (shards only see query vectors)
+            workers: 'process' (one worker process per shard) or 'local' (in-process shards)
+            omp_threads: OpenMP threads per shard worker process
+        """
+        if workers not in SHARD_WORKER_MODES:
+            raise ValueError(f"Unknown shard worker mode '{workers}'. Expected one of: {', '.join(SHARD_WORKER_MODES)}")
+        self.vectorstore_path = Path(vectorstore_path)
+        self.embedder = embedder
+        self.workers = workers
+        self.omp_threads = omp_threads
+        self.manifest: Dict[str, Any] = {}
+        self.shards: List[Any] = []
+        self._shard_numbers: List[int] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def load(self):
+        """Read the shard manifest and start (or load) every shard."""
+        manifest = read_shard_manifest(self.vectorstore_path)
+        if manifest is None:
+            raise FileNotFoundError(f"Shard manifest not found: {self.vectorstore_path / SHARD_MANIFEST}")
+        paths = [self.vectorstore_path / shard["path"] for shard in manifest["shards"]]
+        if self.workers == "process":
+            # Start all workers before waiting, so shards load in parallel
+            shards = [ShardWorker(path, omp_threads=self.omp_threads) for path in paths]
+            try:
+                for shard in shards:
+                    shard.wait_ready()
+            except Exception:
+                for shard in shards:
+                    shard.close()
+                raise
+        else:
+            shards = [LocalShard(path) for path in paths]
+
+        self.close()
+        self.manifest = manifest
+        self.shards = shards
+        self._shard_numbers = [shard["shard"] for shard in manifest["shards"]]
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(shards)), thread_name_prefix="shard-scatter")
+
+    @property
+    def index(self) -> Optional[List[Any]]:
+        """The loaded shards (None before load), so 'no index loaded' checks work as for VectorStore."""
+        return self.shards or None
+
+    @property
+    def lexical_index(self) -> Optional[bool]:
+        """True when every shard has a lexical index, None otherwise (checked by the Retriever)."""
+        if self.shards and all(shard.info["lexical"] for shard in self.shards):
+            return True
+        return None
+
+    def get_version_info(self) -> Dict[str, Any]:
+        """Get version information of the sharded source store."""
+        if not self.manifest:
+            return {}
+        return {
+            "version": self.manifest.get("source_version"),
+            "embedding_model": self.manifest.get("embedding_model"),
+            "embedding_backend": self.manifest.get("embedding_backend"),
+            "dimension": self.manifest.get("dimension"),
+            "document_count": self.manifest.get("document_count"),
+            "partition": self.manifest.get("partition"),
+            "shards": len(self.shards),
+            "shard_workers": self.workers,
+            "created_at": self.manifest.get("created_at"),
+        }
+
+    def _route(self, document_type: Optional[str], filters: Optional[Dict[str, Any]]) -> List[int]:
+        """Positions of the shards that can hold matches for a document type filter."""
+        positions = list(range(len(self.shards)))
+        wanted = document_type or (filters or {}).get("document_type")
+        if self.manifest.get("partition") != "document_type" or not isinstance(wanted, str):
+            return positions
+        return [
+            position for position in positions
+            if wanted in self.manifest["shards"][position]["document_types"]
+        ]
+
+    def _scatter(self, method: str, positions: List[int], *args, **kwargs) -> List[Any]:
+        """Call a search method on shards in parallel, returning results in shard order."""
+        if len(positions) == 1:
+            return [getattr(self.shards[positions[0]], method)(*args, **kwargs)]
+        futures = [
+            self._executor.submit(getattr(self.shards[position], method), *args, **kwargs)
+            for position in positions
+        ]
+        return [future.result() for future in futures]
+
+    def _tag(self, position: int, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Give shard results store-wide ids and record their shard."""
+        shard = self._shard_numbers[position]
+        for result in results:
+            result["shard"] = shard
+            result["id"] = (shard << SHARD_ID_BITS) | result["id"]
+        return results
+
+    def search(self, query: str, k: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """Search for similar documents, see VectorStore.search."""
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        query_vector = np.array([self.embedder.embed_text(query)]).astype('float32')
+        return self.search_by_vector(query_vector, k=k, **kwargs)
+
+    async def asearch(self, query: str, k: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """Asynchronously search for similar documents, see VectorStore.asearch."""
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        query_vector = np.array([await self.embedder.aembed_text(query)]).astype('float32')
+        return await run_in_search_pool(self.search_by_vector, query_vector, k=k, **kwargs)
+
+    def search_batch(self, queries: List[str], k: int = 5, **kwargs) -> List[List[Dict[str, Any]]]:
+        """Search for documents similar to each of several queries, see VectorStore.search_batch."""
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        if not queries:
+            return []
+        query_vectors = np.asarray(self.embedder.embed_queries(queries), dtype='float32')
+        return self.search_by_vectors(query_vectors, k=k, **kwargs)
+
+    def search_by_vector(self, query_vector: np.ndarray, k: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        """Search for documents similar to a precomputed query embedding of shape (1, dimension)."""
+        query_vector = np.asarray(query_vector, dtype='float32').reshape(1, -1)
+        return self.search_by_vectors(query_vector, k=k, **kwargs)[0]
+
+    def search_by_vectors(
+        self,
+        query_vectors: np.ndarray,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search all shards for a matrix of query embeddings and merge their top k.
+
+        Args:
+            query_vectors: Query embeddings of shape (n_queries, dimension)
+            k: Number of results to return per query
+            document_type: Filter by document type (also used to skip shards without it)
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+            nprobe: IVF lists to probe (IVF indexes only, defaults to the index setting)
+            ef_search: HNSW candidate list size (HNSW indexes only, defaults to the index setting)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
+
+        Returns:
+            One result list per query row, by ascending L2 distance, with the shard of each result
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        query_vectors = np.asarray(query_vectors, dtype='float32').reshape(len(query_vectors), -1)
+        positions = self._route(document_type, filters)
+        if not positions:
+            return [[] for _ in range(len(query_vectors))]
+
+        per_shard = self._scatter(
+            "search_by_vectors", positions, query_vectors, k=k, document_type=document_type, filters=filters,
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor
+        )
+        tagged = [[self._tag(position, rows) for rows in results] for position, results in zip(positions, per_shard)]
+        return [
+            sorted((result for results in tagged for result in results[row]), key=lambda result: result["score"])[:k]
+            for row in range(len(query_vectors))
+        ]
+
+    def search_lexical(
+        self,
+        query: str,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search all shards by BM25 keyword match and merge their top k.
+
+        Args:
+            query: Query text
+            k: Number of results to return
+            document_type: Filter by document type (also used to skip shards without it)
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+
+        Returns:
+            Results by descending BM25 score (per-shard term statistics), with the shard of each result
+        """
+        if self.lexical_index is None:
+            raise ValueError("No lexical index loaded. Rebuild the vector store to create one.")
+        positions = self._route(document_type, filters)
+        if not positions:
+            return []
+
+        per_shard = self._scatter("search_lexical", positions, query, k=k, document_type=document_type, filters=filters)
+        merged = [result for position, results in zip(positions, per_shard) for result in self._tag(position, results)]
+        return sorted(merged, key=lambda result: result["score"], reverse=True)[:k]
+
+    def close(self):
+        """Stop the shard workers and the scatter threads."""
+        shards, self.shards = self.shards, []
+        for shard in shards:
+            try:
+                shard.close()
+            except Exception as e:
+                logger.warning(f"Failed to stop shard worker: {e}")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
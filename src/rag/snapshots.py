@@ -0,0 +1,161 @@
+"""Vector store snapshot module.
+
+This module manages versioned vector store snapshots. Each save writes a
+complete snapshot into a temporary directory under versions/, renames it to
+its final name once every file is on disk, and then atomically replaces the
+CURRENT pointer file. Readers resolve CURRENT to the snapshot directory, so
+they only ever see complete snapshots, and previous snapshots are retained
+for rollback. Stores written before snapshots existed (files directly in the
+vector store directory, no CURRENT) are still resolved.
+"""
+
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+CURRENT_POINTER = "CURRENT"
+VERSIONS_DIR = "versions"
+STALE_STAGING_SECONDS = 3600
+
+_SNAPSHOT_NAME = re.compile(r"^v(\d+)$")
+
+
+def snapshot_name(version: int) -> str:
+    """Return the directory name of a snapshot version."""
+    return f"v{version}"
+
+
+def read_current(root: Path) -> Optional[str]:
+    """
+    Read the name of the current snapshot.
+
+    Args:
+        root: Vector store directory
+
+    Returns:
+        Snapshot name, or None if the store has no CURRENT pointer
+    """
+    try:
+        name = (Path(root) / CURRENT_POINTER).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return name or None
+
+
+def resolve_snapshot_path(root: Path) -> Path:
+    """
+    Resolve the directory holding the current snapshot's files.
+
+    Args:
+        root: Vector store directory
+
+    Returns:
+        Current snapshot directory, or root itself for stores without snapshots
+    """
+    root = Path(root)
+    name = read_current(root)
+    if name is None:
+        return root
+    return root / VERSIONS_DIR / name
+
+
+def list_snapshots(root: Path) -> List[str]:
+    """
+    List the published snapshots of a store, oldest first.
+
+    Args:
+        root: Vector store directory
+
+    Returns:
+        Snapshot names
+    """
+    versions_dir = Path(root) / VERSIONS_DIR
+    if not versions_dir.exists():
+        return []
+    names = [path.name for path in versions_dir.iterdir() if path.is_dir() and _SNAPSHOT_NAME.match(path.name)]
+    return sorted(names, key=lambda name: int(_SNAPSHOT_NAME.match(name).group(1)))
+
+
+def latest_snapshot_version(root: Path) -> int:
+    """Return the highest published snapshot version, or 0 if there is none."""
+    snapshots = list_snapshots(root)
+    return int(_SNAPSHOT_NAME.match(snapshots[-1]).group(1)) if snapshots else 0
+
+
+def create_staging_dir(root: Path) -> Path:
+    """
+    Create a private directory to write a new snapshot into.
+
+    Args:
+        root: Vector store directory
+
+    Returns:
+        Staging directory under versions/
+    """
+    staging = Path(root) / VERSIONS_DIR / f".staging-{uuid.uuid4().hex}"
+    staging.mkdir(parents=True)
+    return staging
+
+
+def set_current(root: Path, name: str):
+    """
+    Atomically point CURRENT at a published snapshot.
+
+    Args:
+        root: Vector store directory
+        name: Snapshot name
+    """
+    root = Path(root)
+    if not (root / VERSIONS_DIR / name).is_dir():
+        raise FileNotFoundError(f"Snapshot not found: {root / VERSIONS_DIR / name}")
+    tmp_pointer = root / f"{CURRENT_POINTER}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_pointer, "w") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, root / CURRENT_POINTER)
+
+
+def publish_snapshot(root: Path, staging: Path, version: int) -> Path:
+    """
+    Publish a fully written staging directory as a snapshot and make it current.
+
+    Args:
+        root: Vector store directory
+        staging: Staging directory created with create_staging_dir
+        version: Snapshot version
+
+    Returns:
+        Published snapshot directory
+    """
+    final = Path(root) / VERSIONS_DIR / snapshot_name(version)
+    os.rename(staging, final)
+    set_current(root, final.name)
+    return final
+
+
+def prune_snapshots(root: Path, keep: int):
+    """
+    Delete the oldest snapshots, keeping the newest `keep` and the current one.
+
+    Processes that still have files of a deleted snapshot memory-mapped keep
+    reading them until they unmap (POSIX semantics).
+
+    Args:
+        root: Vector store directory
+        keep: Number of newest snapshots to retain
+    """
+    root = Path(root)
+    current = read_current(root)
+    snapshots = list_snapshots(root)
+    for name in snapshots[:max(0, len(snapshots) - keep)]:
+        if name != current:
+            shutil.rmtree(root / VERSIONS_DIR / name, ignore_errors=True)
+    # Staging directories left behind by crashed saves (recent ones may belong to a running save)
+    for path in (root / VERSIONS_DIR).glob(".staging-*"):
+        if time.time() - path.stat().st_mtime > STALE_STAGING_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,239 @@
+"""Chunk text store module.
+
+This module provides the ChunkTextStore class, which keeps chunk bodies out
+of the metadata in an append-only data file plus an offsets array. Both are
+memory-mapped on load, so fetching the k texts of a search result touches
+only their pages and memory stays flat as the corpus grows. Texts can be
+zstd-compressed in blocks (requires the zstandard package); recently read
+blocks are kept decompressed in a small LRU.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+COMPRESSIONS = ("none", "zstd")
+
+
+def _zstd():
+    """Import zstandard, which is only needed for compressed stores."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd-compressed chunk text stores require the zstandard package") from e
+    return zstandard
+
+
+class ChunkTextStore:
+    """Append-only, memory-mapped store of chunk texts addressed by document id."""
+
+    DATA_FILE = "data.bin"
+
+    def __init__(self, compression: str = "none", block_size: int = 64, cache_blocks: int = 32):
+        """
+        Initialize an empty store.
+
+        Args:
+            compression: 'none' or 'zstd' (per block of block_size texts)
+            block_size: Texts per compressed block
+            cache_blocks: Decompressed blocks kept in memory
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}")
+        self.compression = compression
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.path: Optional[Path] = None
+        # Uncompressed byte offsets of each text (n + 1 entries)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        # Compressed layout: first text id and data file offset of each block (n_blocks + 1 entries)
+        self.block_starts = np.zeros(1, dtype=np.int64)
+        self.block_offsets = np.zeros(1, dtype=np.int64)
+        self._data = np.empty(0, dtype=np.uint8)
+        self._pending: List[bytes] = []
+        self._block_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1 + len(self._pending)
+
+    @property
+    def stored_count(self) -> int:
+        """Number of texts in the data file (excluding appends not saved yet)."""
+        return len(self.offsets) - 1
+
+    def append(self, texts: List[str]):
+        """
+        Append texts; they get the next document ids and are written on save.
+
+        Args:
+            texts: Chunk texts
+        """
+        self._pending.extend(text.encode("utf-8") for text in texts)
+
+    def get(self, doc_id: int) -> str:
+        """
+        Get the text of a document.
+
+        Args:
+            doc_id: Document id
+
+        Returns:
+            Chunk text
+        """
+        if doc_id < 0 or doc_id >= len(self):
+            raise IndexError(f"Document id {doc_id} out of range")
+        if doc_id >= self.stored_count:
+            return self._pending[doc_id - self.stored_count].decode("utf-8")
+
+        start, end = int(self.offsets[doc_id]), int(self.offsets[doc_id + 1])
+        if self.compression == "none":
+            return bytes(self._data[start:end]).decode("utf-8")
+
+        block = int(np.searchsorted(self.block_starts, doc_id, side="right")) - 1
+        block_base = int(self.offsets[self.block_starts[block]])
+        return self._read_block(block)[start - block_base:end - block_base].decode("utf-8")
+
+    def get_many(self, doc_ids: List[int]) -> List[str]:
+        """Get the texts of several documents, in the given order."""
+        return [self.get(int(doc_id)) for doc_id in doc_ids]
+
+    def _read_block(self, block: int) -> bytes:
+        """Decompress a block, serving recently used blocks from the LRU."""
+        with self._lock:
+            data = self._block_cache.get(block)
+            if data is not None:
+                self._block_cache.move_to_end(block)
+                return data
+
+        start, end = int(self.block_offsets[block]), int(self.block_offsets[block + 1])
+        data = _zstd().ZstdDecompressor().decompress(bytes(self._data[start:end]))
+        with self._lock:
+            self._block_cache[block] = data
+            while len(self._block_cache) > self.cache_blocks:
+                self._block_cache.popitem(last=False)
+        return data
+
+    def save(self, path: Path):
+        """
+        Write the store to a directory.
+
+        Saving back to the directory the store was loaded from appends only the
+        new texts to the data file; the offsets are replaced atomically afterwards,
+        so concurrent readers of the old offsets keep seeing consistent texts.
+
+        Args:
+            path: Directory to write the store to
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        appending = (
+            self.path is not None
+            and path.resolve() == self.path.resolve()
+            and self._read_header(path).get("compression") == self.compression
+        )
+
+        if appending:
+            data_path = path / self.DATA_FILE
+            mode = "r+b"
+        else:
+            # Materialise existing texts into a fresh file, swapped in once complete
+            self._pending = [self.get(i).encode("utf-8") for i in range(self.stored_count)] + self._pending
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.block_starts = np.zeros(1, dtype=np.int64)
+            self.block_offsets = np.zeros(1, dtype=np.int64)
+            data_path = path / f"{self.DATA_FILE}.tmp"
+            mode = "wb"
+
+        with open(data_path, mode) as f:
+            # Drop bytes a crashed save may have written past the last published offset
+            data_end = int(self.block_offsets[-1] if self.compression == "zstd" else self.offsets[-1])
+            f.truncate(data_end)
+            f.seek(data_end)
+            offsets, block_starts, block_offsets = [], [], []
+            text_end = int(self.offsets[-1])
+            for start in range(0, len(self._pending), self.block_size):
+                block = self._pending[start:start + self.block_size]
+                for text in block:
+                    text_end += len(text)
+                    offsets.append(text_end)
+                payload = b"".join(block)
+                if self.compression == "zstd":
+                    payload = _zstd().ZstdCompressor(level=3).compress(payload)
+                    block_starts.append(self.stored_count + start + len(block))
+                f.write(payload)
+                data_end += len(payload)
+                block_offsets.append(data_end)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if not appending:
+            os.replace(data_path, path / self.DATA_FILE)
+        self.offsets = np.concatenate([self.offsets, np.asarray(offsets, dtype=np.int64)])
+        if self.compression == "zstd":
+            self.block_starts = np.concatenate([self.block_starts, np.asarray(block_starts, dtype=np.int64)])
+            self.block_offsets = np.concatenate([self.block_offsets, np.asarray(block_offsets, dtype=np.int64)])
+        self._pending = []
+
+        for name, array in (
+            ("offsets", self.offsets), ("block_starts", self.block_starts), ("block_offsets", self.block_offsets)
+        ):
+            np.save(path / f"{name}.tmp.npy", array)
+            os.replace(path / f"{name}.tmp.npy", path / f"{name}.npy")
+        header_tmp = path / "header.tmp.json"
+        with open(header_tmp, "w") as f:
+            json.dump({"compression": self.compression, "block_size": self.block_size, "count": len(self)}, f)
+        os.replace(header_tmp, path / "header.json")
+
+        self.path = path
+        self._map_data()
+
+    @staticmethod
+    def _read_header(path: Path) -> dict:
+        """Read the store header, or an empty dict if there is none."""
+        try:
+            with open(Path(path) / "header.json", "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _map_data(self):
+        """Memory-map the data file."""
+        data_path = self.path / self.DATA_FILE
+        if data_path.stat().st_size == 0:
+            self._data = np.empty(0, dtype=np.uint8)
+        else:
+            self._data = np.memmap(data_path, dtype=np.uint8, mode="r")
+        self._block_cache.clear()
+
+    @classmethod
+    def load(cls, path: Path) -> "ChunkTextStore":
+        """
+        Memory-map a store written with save.
+
+        Args:
+            path: Directory containing the store
+
+        Returns:
+            Loaded ChunkTextStore
+        """
+        path = Path(path)
+        header = cls._read_header(path)
+        if not header:
+            raise FileNotFoundError(f"Chunk text store not found: {path}")
+        store = cls(compression=header["compression"], block_size=header["block_size"])
+        count = header["count"]
+        # Offsets may have been appended to after the header was read; keep the header's view
+        store.offsets = np.load(path / "offsets.npy", mmap_mode="r")[:count + 1]
+        if store.compression == "zstd":
+            block_starts = np.load(path / "block_starts.npy")
+            n_blocks = int(np.searchsorted(block_starts, count, side="left"))
+            store.block_starts = block_starts[:n_blocks + 1]
+            store.block_offsets = np.load(path / "block_offsets.npy")[:n_blocks + 1]
+        store.path = path
+        store._map_data()
+        return store
@@ -1,19 +1,67 @@
 """FAISS vector store module.
 
 This module provides the VectorStore class for managing FAISS-based vector
-storage. It handles creating, saving, loading, and searching vector embeddings
-with support for document type filtering and metadata management.
+storage. It handles building, saving and loading versioned snapshots of the
+index, its metadata, chunk texts and BM25 lexical index, and searching them
+by vector, keyword or both, with metadata filtering and async variants that
+keep the event loop free.
 """
 
 import os
 import json
+import time
+import shutil
+import asyncio
+import hashlib
+import threading
+import functools
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 import faiss
 import numpy as np
 from .embedder import Embedder
+from .filters import MetadataFilterIndex
+from .index_factory import create_index, make_search_parameters
+from .columnar import ColumnarMetadata, write_columnar_metadata
+from .lexical import BM25Index
+from .text_store import ChunkTextStore
+from .context_packer import count_tokens
+from .snapshots import (
+    create_staging_dir,
+    latest_snapshot_version,
+    list_snapshots,
+    prune_snapshots,
+    publish_snapshot,
+    read_current,
+    resolve_snapshot_path,
+    set_current,
+    snapshot_name,
+)
+
+# Threads for searches offloaded from the event loop (FAISS releases the GIL while searching)
+SEARCH_THREADS = int(os.getenv("SEARCH_THREADS", str(min(8, os.cpu_count() or 1))))
+
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def get_search_executor() -> ThreadPoolExecutor:
+    """Get the shared, bounded thread pool for offloaded searches, creating it on first use."""
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(max_workers=SEARCH_THREADS, thread_name_prefix="search")
+    return _search_executor
+
+
+async def run_in_search_pool(func: Callable, *args, **kwargs):
+    """Run a blocking search function on the shared search thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_search_executor(), functools.partial(func, *args, **kwargs))
 
 
 class VectorStore:
@@ -22,7 +70,14 @@ class VectorStore:
     def __init__(
         self,
         vectorstore_path: str = "data/vectorstore",
-        embedder: Optional[Embedder] = None
+        embedder: Optional[Embedder] = None,
+        dimension: Optional[int] = None,
+        index_type: str = "flat",
+        index_params: Optional[Dict[str, Any]] = None,
+        quantization: Optional[str] = None,
+        rerank_factor: Optional[int] = None,
+        text_compression: str = "none",
+        keep_versions: int = 3
     ):
         """
         Initialize vector store.
@@ -30,42 +85,152 @@ class VectorStore:
         Args:
             vectorstore_path: Path to store FAISS index
             embedder: Embedder instance for generating embeddings
+            dimension: Dimension of the embedding vectors (if None, uses the embedder's
+                dimension, falling back to 1536)
+            index_type: FAISS index type ('flat', 'ivf_flat', 'ivf_pq' or 'hnsw')
+            index_params: Index parameters overriding index_factory.DEFAULT_INDEX_PARAMS
+            quantization: Vector storage inside the index ('none', 'fp16', 'sq8' or 'pq')
+            rerank_factor: Re-rank k * rerank_factor candidates with exact distances from the
+                full-precision vectors on disk (0 disables, None uses the stored setting)
+            text_compression: Chunk text storage, 'none' or 'zstd' (block-compressed)
+            keep_versions: Number of saved snapshots retained for rollback
         """
         self.vectorstore_path = Path(vectorstore_path)
         self.vectorstore_path.mkdir(parents=True, exist_ok=True)
+        # Directory of the snapshot this store was loaded from or last saved to
+        self.snapshot_path = self.vectorstore_path
+        self.keep_versions = keep_versions
         self.embedder = embedder or Embedder()
         self.index: Optional[faiss.Index] = None
         self.metadata: List[Dict[str, Any]] = []
-        self.dimension = 1536
+        self.dimension = dimension or getattr(self.embedder, "dimension", None) or 1536
+        self.index_type = index_type
+        self.index_params: Dict[str, Any] = dict(index_params or {})
+        if quantization is not None:
+            self.index_params["quantization"] = quantization
+        self.rerank_factor = rerank_factor
+        self.vectors: Optional[np.ndarray] = None
+        self.index_report: Dict[str, Any] = {}
+        self.embedding_stats: Dict[str, Any] = {"chunks": 0, "seconds": 0.0}
+        self.mmap_loaded = False
+        self._effective_index_type = index_type
+        self._resolved_index_params: Dict[str, Any] = {}
         self.version_info: Dict[str, Any] = {}
+        self._filter_index: Optional[MetadataFilterIndex] = None
+        self.lexical_index: Optional[BM25Index] = None
+        self.text_compression = text_compression
+        self.text_store: Optional[ChunkTextStore] = None
+        # Rows tombstoned by upsert/delete; searches exclude them
+        self.deleted_count = 0
     
-    def create_index(self):
-        """Create a new FAISS index."""
-        self.index = faiss.IndexFlatL2(self.dimension)
+    def create_index(self, n_vectors: Optional[int] = None):
+        """
+        Create a new FAISS index of the configured type.
+        
+        Args:
+            n_vectors: Number of vectors the index will be trained on, used to size
+                IVF indexes (falls back to flat when too small to train)
+        """
+        self.index, index_type, self._resolved_index_params = create_index(
+            self.index_type, self.dimension, n_vectors, self.index_params
+        )
+        self._effective_index_type = index_type
         self.metadata = []
+        self.vectors = np.empty((0, self.dimension), dtype='float32')
+        self.index_report = {}
+        self._filter_index = None
+        self.lexical_index = BM25Index()
+        self.text_store = ChunkTextStore(compression=self.text_compression)
+        self.deleted_count = 0
     
-    def add_documents(self, texts: List[str], metadatas: List[Dict[str, Any]]):
+    def add_documents(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        checkpoint_dir: Optional[str] = None
+    ):
         """
         Add documents to the vector store.
         
         Args:
             texts: List of text chunks
             metadatas: List of metadata dictionaries for each chunk
+            checkpoint_dir: Optional directory checkpointing completed embedding batches
+        """
+        # Generate embeddings
+        embeddings = self.embed_documents(texts, checkpoint_dir=checkpoint_dir)
+        self.add_embeddings(embeddings, metadatas, texts=texts)
+    
+    def embed_documents(self, texts: List[str], checkpoint_dir: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed texts, optionally checkpointing completed batches.
+        
+        With a checkpoint directory, an interrupted run resumes from the
+        checkpoint on the next call with the same texts. Chunk count and time
+        are accumulated in embedding_stats.
+        
+        Args:
+            texts: List of text chunks
+            checkpoint_dir: Optional directory persisting completed batches
+        
+        Returns:
+            List of embedding vectors
+        """
+        start = time.perf_counter()
+        embeddings = self.embedder.embed_documents(texts, checkpoint_dir=checkpoint_dir)
+        self.embedding_stats["chunks"] += len(texts)
+        self.embedding_stats["seconds"] += time.perf_counter() - start
+        return embeddings
+    
+    def add_embeddings(
+        self,
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        texts: Optional[List[str]] = None
+    ):
+        """
+        Add precomputed embeddings to the vector store.
+        
+        Args:
+            embeddings: Embedding vectors, one per document
+            metadatas: List of metadata dictionaries for each vector
+            texts: Document texts for the text store and lexical index (without them the
+                documents get empty texts and the lexical index is dropped)
         """
         if self.index is None:
             self.create_index()
-        
-        # Generate embeddings
-        embeddings = self.embedder.embed_documents(texts)
+        self._make_writable()
         
         # Convert to numpy array
-        embeddings_array = np.array(embeddings).astype('float32')
+        embeddings_array = np.asarray(embeddings, dtype='float32')
+        
+        # Train approximate indexes on the first batch they see
+        if not self.index.is_trained:
+            print(f"   Training {self._effective_index_type} index on {len(embeddings_array)} vectors...")
+            self.index.train(embeddings_array)
         
         # Add to index
+        if self.lexical_index is not None:
+            if texts is not None and self.lexical_index.num_docs == self.index.ntotal:
+                self.lexical_index.add(texts)
+            else:
+                self.lexical_index = None
+        if self.text_store is None:
+            # Stores built before the text store existed have no texts for their documents
+            self.text_store = ChunkTextStore(compression=self.text_compression)
+            self.text_store.append([""] * self.index.ntotal)
+        self.text_store.append(texts if texts is not None else [""] * len(embeddings_array))
+        
+        # Keep full-precision vectors for exact re-ranking, row-aligned with the index
+        if self.vectors is None or len(self.vectors) != self.index.ntotal:
+            self.vectors = self._reconstruct_vectors()
         self.index.add(embeddings_array)
+        if self.vectors is not None:
+            self.vectors = np.vstack([self.vectors, embeddings_array]) if len(self.vectors) else embeddings_array
         
         # Store metadata
         self.metadata.extend(metadatas)
+        self._filter_index = None
     
     def get_embedding_model_name(self) -> str:
         """Get the embedding model name from embedder."""
@@ -74,65 +239,109 @@ class VectorStore:
         except:
             return 'unknown'
     
+    def get_embedding_backend(self) -> str:
+        """Get the embedding backend name from embedder."""
+        return getattr(self.embedder, 'backend', 'unknown')
+    
     def get_next_version(self) -> int:
         """Get next version number."""
-        version_info_path = self.vectorstore_path / "version_info.json"
+        version = latest_snapshot_version(self.vectorstore_path)
+        version_info_path = resolve_snapshot_path(self.vectorstore_path) / "version_info.json"
         if version_info_path.exists():
             with open(version_info_path, 'r') as f:
                 existing_info = json.load(f)
-                return existing_info.get("version", 0) + 1
-        return 1
+                version = max(version, existing_info.get("version", 0))
+        return version + 1
     
     def save(self):
-        """Save the FAISS index and metadata to disk with version info."""
+        """
+        Save the store as a new versioned snapshot and make it current.
+        
+        All files are written to a staging directory that is renamed into
+        versions/ and published by atomically replacing the CURRENT pointer,
+        so readers never observe a partially written store.
+        """
         if self.index is None:
             raise ValueError("No index to save. Create or load an index first.")
         
+        version = self.get_next_version()
+        snapshot_path = create_staging_dir(self.vectorstore_path)
+        try:
+            self._write_snapshot(snapshot_path, version)
+            self.snapshot_path = publish_snapshot(self.vectorstore_path, snapshot_path, version)
+            if self.text_store is not None:
+                self.text_store.path = self.snapshot_path / "texts"
+        except BaseException:
+            shutil.rmtree(snapshot_path, ignore_errors=True)
+            raise
+        prune_snapshots(self.vectorstore_path, self.keep_versions)
+        
+        print(
+            f"✓ Saved vector store (version {version}, model: {self.version_info['embedding_model']}, "
+            f"documents: {self.version_info['document_count']})"
+        )
+    
+    def _write_snapshot(self, snapshot_path: Path, version: int):
+        """Write all store files into a snapshot directory."""
         # Save FAISS index
-        index_path = self.vectorstore_path / "faiss_index.index"
+        index_path = snapshot_path / "faiss_index.index"
         faiss.write_index(self.index, str(index_path))
         
-        # Save metadata
-        metadata_path = self.vectorstore_path / "metadata.json"
+        # Save full-precision vectors
+        if self.vectors is not None and len(self.vectors) == self.index.ntotal:
+            np.save(snapshot_path / "vectors.npy", np.asarray(self.vectors, dtype='float32'))
+        
+        # Save metadata (JSON for readability, columns for memory-mapped loading)
+        metadata_path = snapshot_path / "metadata.json"
         with open(metadata_path, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+            json.dump(list(self.metadata), f, indent=2)
+        write_columnar_metadata(self.metadata, snapshot_path / "metadata_columns")
+        
+        # Save chunk texts
+        if self.text_store is not None:
+            self.text_store.save(snapshot_path / "texts")
+        
+        # Save lexical index
+        if self.lexical_index is not None:
+            self.lexical_index.save(snapshot_path / "lexical_index")
         
         # Save version info
-        version = self.get_next_version()
         model_name = self.get_embedding_model_name()
         self.version_info = {
             "version": version,
             "embedding_model": model_name,
+            "embedding_backend": self.get_embedding_backend(),
             "dimension": self.dimension,
-            "document_count": len(self.metadata),
+            "index_type": self._effective_index_type,
+            "index_params": self._resolved_index_params,
+            "rerank_factor": self.rerank_factor or 0,
+            "index_report": self.index_report,
+            "document_count": len(self.metadata) - self.deleted_count,
+            "deleted_count": self.deleted_count,
             "created_at": datetime.now().isoformat()
         }
         
-        version_info_path = self.vectorstore_path / "version_info.json"
+        version_info_path = snapshot_path / "version_info.json"
         with open(version_info_path, 'w') as f:
             json.dump(self.version_info, f, indent=2)
-        
-        print(f"✓ Saved vector store (version {version}, model: {model_name}, documents: {len(self.metadata)})")
     
-    def load(self):
-        """Load the FAISS index and metadata from disk."""
-        index_path = self.vectorstore_path / "faiss_index.index"
-        metadata_path = self.vectorstore_path / "metadata.json"
-        version_info_path = self.vectorstore_path / "version_info.json"
+    def load(self, mmap: bool = False):
+        """
+        Load the FAISS index and metadata of the current snapshot from disk.
+        
+        Args:
+            mmap: Memory-map the index and columnar metadata instead of reading them
+                into process memory (pages are shared between processes)
+        """
+        self.snapshot_path = resolve_snapshot_path(self.vectorstore_path)
+        index_path = self.snapshot_path / "faiss_index.index"
+        metadata_path = self.snapshot_path / "metadata.json"
+        columns_path = self.snapshot_path / "metadata_columns"
+        version_info_path = self.snapshot_path / "version_info.json"
         
         if not index_path.exists():
             raise FileNotFoundError(f"Index file not found: {index_path}")
         
-        # Load FAISS index
-        self.index = faiss.read_index(str(index_path))
-        
-        # Load metadata
-        if metadata_path.exists():
-            with open(metadata_path, 'r') as f:
-                self.metadata = json.load(f)
-        else:
-            self.metadata = []
-        
         # Load version info
         if version_info_path.exists():
             with open(version_info_path, 'r') as f:
@@ -143,10 +352,134 @@ class VectorStore:
             current_model = self.get_embedding_model_name()
             if stored_model != current_model:
                 print(f"⚠ Warning: Stored model ({stored_model}) differs from current ({current_model})")
+            stored_backend = self.version_info.get("embedding_backend", "openai")
+            current_backend = self.get_embedding_backend()
+            if stored_backend != current_backend:
+                print(f"⚠ Warning: Stored embedding backend ({stored_backend}) differs from current ({current_backend})")
         else:
             self.version_info = {}
+        
+        # Stores built before index types were configurable are flat
+        self._effective_index_type = self.version_info.get("index_type", "flat")
+        self._resolved_index_params = self.version_info.get("index_params", {"factory": "Flat"})
+        self.index_report = self.version_info.get("index_report", {})
+        if self.rerank_factor is None:
+            self.rerank_factor = self.version_info.get("rerank_factor", 0)
+        self.deleted_count = self.version_info.get("deleted_count", 0)
+        
+        # Load FAISS index
+        if mmap:
+            # IVF lists and flat code arrays are mapped through different IO flags
+            is_ivf = self._resolved_index_params.get("factory", "Flat").startswith("IVF")
+            io_flags = faiss.IO_FLAG_MMAP if is_ivf else faiss.IO_FLAG_MMAP_IFC
+            self.index = faiss.read_index(str(index_path), io_flags)
+        else:
+            self.index = faiss.read_index(str(index_path))
+        self.mmap_loaded = mmap
+        self.dimension = self.index.d
+        
+        # Full-precision vectors are only needed for the rows re-ranking touches
+        vectors_path = self.snapshot_path / "vectors.npy"
+        if vectors_path.exists():
+            self.vectors = np.load(vectors_path, mmap_mode='r')
+        else:
+            self.vectors = None if mmap else self._reconstruct_vectors()
+        
+        # Load metadata
+        if mmap and (columns_path / "schema.json").exists():
+            self.metadata = ColumnarMetadata(columns_path)
+        elif metadata_path.exists():
+            with open(metadata_path, 'r') as f:
+                self.metadata = json.load(f)
+        else:
+            self.metadata = []
+        self._filter_index = None
+        
+        # Map chunk texts (stores built before the text store existed have none)
+        texts_path = self.snapshot_path / "texts"
+        self.text_store = None
+        if (texts_path / "header.json").exists():
+            text_store = ChunkTextStore.load(texts_path)
+            if len(text_store) == self.index.ntotal:
+                self.text_store = text_store
+            else:
+                print(f"⚠ Warning: Chunk text store has {len(text_store)} texts for {self.index.ntotal} vectors, ignoring it")
+        
+        # Load lexical index (stores built before it existed have none)
+        lexical_path = self.snapshot_path / "lexical_index"
+        self.lexical_index = None
+        if (lexical_path / "index.json").exists():
+            lexical_index = BM25Index.load(lexical_path, mmap=mmap)
+            if lexical_index.num_docs == self.index.ntotal:
+                self.lexical_index = lexical_index
+    
+    def list_versions(self) -> List[str]:
+        """List the saved snapshots of this store, oldest first."""
+        return list_snapshots(self.vectorstore_path)
+    
+    def rollback(self, version: Optional[int] = None) -> str:
+        """
+        Point CURRENT back at a previous snapshot.
+        
+        Running processes pick the rolled-back version up through their usual
+        reload check; this instance is not reloaded.
+        
+        Args:
+            version: Snapshot version to activate (defaults to the one before the current)
+        
+        Returns:
+            Name of the activated snapshot
+        """
+        if version is not None:
+            name = snapshot_name(version)
+        else:
+            snapshots = self.list_versions()
+            current = read_current(self.vectorstore_path)
+            position = snapshots.index(current) if current in snapshots else len(snapshots)
+            if position == 0:
+                raise ValueError("No previous snapshot to roll back to.")
+            name = snapshots[position - 1]
+        set_current(self.vectorstore_path, name)
+        return name
+    
+    def _reconstruct_vectors(self) -> Optional[np.ndarray]:
+        """
+        Full-precision vectors of stores saved without vectors.npy.
+        
+        Returns:
+            The exact vectors a flat index holds, or None for other index types
+        """
+        if isinstance(faiss.downcast_index(self.index), faiss.IndexFlat):
+            return self.index.reconstruct_n(0, self.index.ntotal)
+        return None
+    
+    def _make_writable(self):
+        """Copy memory-mapped index and metadata into process memory before mutating them."""
+        if self.mmap_loaded:
+            # Mapped storage cannot grow in place, so re-read an owned copy of the index
+            self.index = faiss.read_index(str(self.snapshot_path / "faiss_index.index"))
+            self.mmap_loaded = False
+        if not isinstance(self.metadata, list):
+            self.metadata = list(self.metadata)
     
-    def search(self, query: str, k: int = 5, document_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_filter_index(self) -> MetadataFilterIndex:
+        """Get the metadata filter index, building it on first use."""
+        filter_index = self._filter_index
+        if filter_index is None or filter_index.size != len(self.metadata):
+            filter_index = MetadataFilterIndex(self.metadata)
+            self._filter_index = filter_index
+        return filter_index
+    
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search for similar documents.
         
@@ -154,9 +487,13 @@ class VectorStore:
             query: Query text
             k: Number of results to return
             document_type: Filter by document type (e.g., 'faq_rag', 'market_analysis')
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+            nprobe: IVF lists to probe (IVF indexes only, defaults to the index setting)
+            ef_search: HNSW candidate list size (HNSW indexes only, defaults to the index setting)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
         
         Returns:
-            List of results with text, metadata, and score
+            List of results with id, text, metadata, and score
         """
         if self.index is None:
             raise ValueError("No index loaded. Load or create an index first.")
@@ -165,33 +502,305 @@ class VectorStore:
         query_embedding = self.embedder.embed_text(query)
         query_vector = np.array([query_embedding]).astype('float32')
         
-        # Search (get more results if filtering)
-        search_k = k * 3 if document_type else k
-        distances, indices = self.index.search(query_vector, search_k)
+        return self.search_by_vector(
+            query_vector, k=k, document_type=document_type, filters=filters,
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor
+        )
+    
+    async def asearch(
+        self,
+        query: str,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Asynchronously search for similar documents.
+        
+        The query is embedded with the async embeddings client and the FAISS
+        search runs on the shared search thread pool.
+        
+        Args:
+            query: Query text
+            k: Number of results to return
+            document_type: Filter by document type (e.g., 'faq_rag', 'market_analysis')
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+            nprobe: IVF lists to probe (IVF indexes only, defaults to the index setting)
+            ef_search: HNSW candidate list size (HNSW indexes only, defaults to the index setting)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
+        
+        Returns:
+            List of results with id, text, metadata, and score
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        
+        query_embedding = await self.embedder.aembed_text(query)
+        query_vector = np.array([query_embedding]).astype('float32')
+        return await run_in_search_pool(
+            self.search_by_vector, query_vector, k=k, document_type=document_type, filters=filters,
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor
+        )
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for documents similar to each of several queries.
+        
+        All queries are embedded in one embedding call and searched with a single
+        FAISS call on the query matrix.
+        
+        Args:
+            queries: Query texts
+            k: Number of results to return per query
+            document_type: Filter by document type (applies to every query)
+            filters: Metadata filters (applies to every query)
+            nprobe: IVF lists to probe (IVF indexes only, defaults to the index setting)
+            ef_search: HNSW candidate list size (HNSW indexes only, defaults to the index setting)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
+        
+        Returns:
+            One result list per query, in query order
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        if not queries:
+            return []
+        
+        query_vectors = np.asarray(self.embedder.embed_queries(queries), dtype='float32')
+        return self.search_by_vectors(
+            query_vectors, k=k, document_type=document_type, filters=filters,
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor
+        )
+    
+    def search_by_vector(
+        self,
+        query_vector: np.ndarray,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for documents similar to a precomputed query embedding.
+        
+        Filters are pushed into the FAISS search as an ID selector, so exactly
+        k results are returned whenever at least k documents match.
+        
+        Args:
+            query_vector: Query embedding of shape (1, dimension)
+            k: Number of results to return
+            document_type: Filter by document type (shorthand for filters["document_type"])
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+            nprobe: IVF lists to probe (IVF indexes only, defaults to the index setting)
+            ef_search: HNSW candidate list size (HNSW indexes only, defaults to the index setting)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
         
-        # Format results with optional filtering
+        Returns:
+            List of results with id, text, metadata, and score
+        """
+        query_vector = np.asarray(query_vector, dtype='float32').reshape(1, -1)
+        return self.search_by_vectors(
+            query_vector, k=k, document_type=document_type, filters=filters,
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor
+        )[0]
+    
+    def search_by_vectors(
+        self,
+        query_vectors: np.ndarray,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for documents similar to a matrix of precomputed query embeddings.
+        
+        Args:
+            query_vectors: Query embeddings of shape (n_queries, dimension)
+            k: Number of results to return per query
+            document_type: Filter by document type (shorthand for filters["document_type"])
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+            nprobe: IVF lists to probe (IVF indexes only, defaults to the index setting)
+            ef_search: HNSW candidate list size (HNSW indexes only, defaults to the index setting)
+            rerank_factor: Exact re-ranking oversampling factor (defaults to the store setting)
+        
+        Returns:
+            One result list per query row
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        
+        query_vectors = np.asarray(query_vectors, dtype='float32').reshape(-1, self.index.d)
+        filters = dict(filters or {})
+        if document_type:
+            filters["document_type"] = document_type
+        
+        selector = None
+        n_candidates = self.index.ntotal
+        if filters or self.deleted_count:
+            filter_index = self.get_filter_index()
+            ids = filter_index.select(filters)
+            if len(ids) == 0:
+                return [[] for _ in range(len(query_vectors))]
+            n_candidates = len(ids)
+            k = min(k, n_candidates)
+            selector = filter_index.make_selector(ids)
+        params = make_search_parameters(self.index, selector, nprobe=nprobe, ef_search=ef_search)
+        
+        rerank_factor = self.rerank_factor if rerank_factor is None else rerank_factor
+        has_vectors = self.vectors is not None and len(self.vectors) == self.index.ntotal
+        if rerank_factor and rerank_factor > 1 and has_vectors:
+            candidates = min(k * rerank_factor, n_candidates)
+            _, candidate_indices = self.index.search(query_vectors, candidates, params=params)
+            reranked = [
+                self._rerank(query_vectors[row:row + 1], candidate_indices[row], k)
+                for row in range(len(query_vectors))
+            ]
+            return [self._format_results(distances[0], indices[0]) for distances, indices in reranked]
+        
+        distances, indices = self.index.search(query_vectors, k, params=params)
+        return [self._format_results(distances[row], indices[row]) for row in range(len(query_vectors))]
+    
+    def search_lexical(
+        self,
+        query: str,
+        k: int = 5,
+        document_type: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search documents by BM25 keyword match, without calling the embedding service.
+        
+        Args:
+            query: Query text
+            k: Number of results to return
+            document_type: Filter by document type (shorthand for filters["document_type"])
+            filters: Metadata filters (see MetadataFilterIndex for the supported syntax)
+        
+        Returns:
+            List of results with id, text, metadata, and score (BM25, higher is better);
+            documents sharing no term with the query are not returned
+        """
+        if self.lexical_index is None:
+            raise ValueError("No lexical index loaded. Rebuild the vector store to create one.")
+        
+        filters = dict(filters or {})
+        if document_type:
+            filters["document_type"] = document_type
+        allowed_ids = None
+        if filters or self.deleted_count:
+            allowed_ids = self.get_filter_index().select(filters)
+            if len(allowed_ids) == 0:
+                return []
+        
+        scores, ids = self.lexical_index.search(query, k, allowed_ids=allowed_ids)
+        return self._format_results(scores, ids)
+    
+    def _format_results(self, scores: np.ndarray, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """Build result dicts for document ids, skipping empty (-1) slots and deleted documents."""
         results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.metadata):
-                metadata = self.metadata[idx]
-                
-                # Filter by document type if specified
-                if document_type and metadata.get("document_type") != document_type:
-                    continue
-                
+        for score, idx in zip(scores, indices):
+            metadata = self.metadata[idx] if 0 <= idx < len(self.metadata) else None
+            if metadata is not None:
+                if self.text_store is not None:
+                    text = self.text_store.get(int(idx))
+                else:
+                    text = metadata.get("text", "")
                 results.append({
-                    "text": metadata.get("text", ""),
+                    "id": int(idx),
+                    "text": text,
                     "metadata": {k: v for k, v in metadata.items() if k != "text"},
-                    "score": float(distances[0][i])
+                    "score": float(score)
                 })
-                
-                # Stop when we have enough results
-                if len(results) >= k:
-                    break
-        
         return results
     
-    def build_from_chunks(self, chunks_path: str, document_configs: List[Dict[str, str]]):
+    def _rerank(self, query_vector: np.ndarray, candidate_ids: np.ndarray, k: int) -> tuple:
+        """
+        Re-rank candidates by exact L2 distance using the full-precision vectors.
+        
+        Args:
+            query_vector: Query embedding of shape (1, dimension)
+            candidate_ids: Candidate ids from the (quantized) index, -1 for empty slots
+            k: Number of results to keep
+        
+        Returns:
+            Tuple of (distances, indices) arrays of shape (1, <=k), like index.search
+        """
+        candidate_ids = np.sort(candidate_ids[candidate_ids >= 0])
+        candidates = np.asarray(self.vectors[candidate_ids], dtype='float32')
+        exact_distances = ((candidates - query_vector) ** 2).sum(axis=1)
+        order = np.argsort(exact_distances)[:k]
+        return exact_distances[order].reshape(1, -1), candidate_ids[order].reshape(1, -1)
+    
+    def evaluate_index(self, k: int = 10, sample_size: int = 200, rerank_factor: int = 4) -> Dict[str, Any]:
+        """
+        Measure memory use and recall of the index against exact search.
+        
+        Stored vectors are used as queries; recall@k is the fraction of their exact
+        k nearest neighbours the index returns, with and without exact re-ranking.
+        
+        Args:
+            k: Neighbours per query
+            sample_size: Number of stored vectors used as queries
+            rerank_factor: Oversampling factor used for the re-ranked recall
+        
+        Returns:
+            Report with byte sizes, compression ratio and recall figures
+        """
+        if self.index is None or self.vectors is None or not 0 < len(self.vectors) == self.index.ntotal:
+            return {}
+        
+        n = len(self.vectors)
+        k = min(k, n)
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(n, size=min(sample_size, n), replace=False))
+        queries = np.asarray(self.vectors[sample], dtype='float32')
+        _, exact_ids = faiss.knn(queries, np.asarray(self.vectors, dtype='float32'), k)
+        _, approx_ids = self.index.search(queries, k)
+        _, candidate_ids = self.index.search(queries, min(k * rerank_factor, n))
+        reranked_ids = [self._rerank(queries[i:i + 1], candidate_ids[i], k)[1][0] for i in range(len(sample))]
+        
+        def recall(found) -> float:
+            return float(np.mean([len(np.intersect1d(f, e)) / k for f, e in zip(found, exact_ids)]))
+        
+        float32_bytes = n * self.dimension * 4
+        index_bytes = int(faiss.serialize_index(self.index).nbytes)
+        return {
+            "quantization": self._resolved_index_params.get("quantization", "none"),
+            "float32_bytes": float32_bytes,
+            "index_bytes": index_bytes,
+            "compression_ratio": round(float32_bytes / index_bytes, 2),
+            f"recall_at_{k}": round(recall(approx_ids), 4),
+            f"recall_at_{k}_reranked_x{rerank_factor}": round(recall(reranked_ids), 4),
+        }
+    
+    def content_hash(self, text: str) -> str:
+        """Hash a chunk's text together with the embedding model that embeds it."""
+        return hashlib.sha256(f"{self.get_embedding_model_name()}\x00{text}".encode("utf-8")).hexdigest()
+    
+    def build_from_chunks(
+        self,
+        chunks_path: str,
+        document_configs: List[Dict[str, str]],
+        incremental: bool = False,
+        checkpoint: bool = False
+    ) -> Dict[str, int]:
         """
         Build vector store from chunk YAML files.
         
@@ -201,9 +810,65 @@ class VectorStore:
                 - chunk_file: Name of chunk YAML file
                 - document_name: Name to assign to documents
                 - document_type: Type of document (e.g., 'faq_rag', 'market_analysis')
+            incremental: Reuse embeddings from the store saved at vectorstore_path for
+                chunks whose content hash is unchanged, and embed only the rest
+            checkpoint: Checkpoint completed embedding batches under the store
+                directory, so an interrupted build resumes where it stopped
+        
+        Returns:
+            Diff summary with counts of added, changed, removed and reused chunks
+        """
+        texts, metadatas = self._read_chunks(chunks_path, document_configs)
+        previous = self._load_previous_embeddings() if incremental else None
+        checkpoint_dir = str(self.vectorstore_path / "embedding_checkpoint") if checkpoint else None
+        
+        # Size the index for the full corpus so approximate indexes train on all of it
+        self.create_index(n_vectors=len(texts))
+        self.embedding_stats = {"chunks": 0, "seconds": 0.0}
+        if previous is None:
+            summary = {"added": len(texts), "changed": 0, "removed": 0, "reused": 0}
+            if texts:
+                self.add_documents(texts, metadatas, checkpoint_dir=checkpoint_dir)
+        else:
+            summary = self._add_incrementally(texts, metadatas, *previous, checkpoint_dir=checkpoint_dir)
+        if self.embedding_stats["chunks"]:
+            seconds = self.embedding_stats["seconds"]
+            throughput = self.embedding_stats["chunks"] / seconds if seconds > 0 else float("inf")
+            print(
+                f"   Embedded {self.embedding_stats['chunks']} chunks in {seconds:.2f}s "
+                f"({throughput:.1f} chunks/sec)"
+            )
+        print(
+            f"   Diff: {summary['added']} added, {summary['changed']} changed, "
+            f"{summary['removed']} removed, {summary['reused']} reused"
+        )
+        print(f"   Added {len(texts)} chunks to {self._effective_index_type} index ({self._resolved_index_params['factory']})")
+        
+        # Report memory savings and recall impact of the index configuration
+        self.index_report = self.evaluate_index()
+        if self.index_report:
+            report = self.index_report
+            recalls = ", ".join(f"{key}={value}" for key, value in report.items() if key.startswith("recall"))
+            print(
+                f"   Index memory: {report['index_bytes'] / 2**20:.2f} MiB vs {report['float32_bytes'] / 2**20:.2f} MiB "
+                f"float32 ({report['compression_ratio']}x, quantization: {report['quantization']}); {recalls}"
+            )
+        return summary
+    
+    def _read_chunks(self, chunks_path: str, document_configs: List[Dict[str, str]]) -> tuple:
+        """
+        Read chunk texts and metadata from chunk YAML files.
+        
+        Args:
+            chunks_path: Path to directory containing chunk YAML files
+            document_configs: Document configs as for build_from_chunks
+        
+        Returns:
+            Tuple of (texts, metadatas)
         """
         chunks_dir = Path(chunks_path)
-        self.create_index()
+        texts = []
+        metadatas = []
         
         for config in document_configs:
             chunk_file = chunks_dir / config['chunk_file']
@@ -220,18 +885,238 @@ class VectorStore:
                 continue
             
             # Add metadata to chunks
-            texts = []
-            metadatas = []
             for chunk in chunks:
                 metadata = {k: v for k, v in chunk.items() if k != "text"}
                 metadata["document_name"] = config['document_name']
                 metadata["document_type"] = config['document_type']
+                metadata.setdefault("chunk_id", f"{config['document_name']}:{metadata.get('chunk_index')}")
+                metadata["content_hash"] = self.content_hash(chunk["text"])
+                # Cached for context packing, which would otherwise count tokens on every query
+                metadata["token_count"] = count_tokens(chunk["text"])
                 texts.append(chunk["text"])
                 metadatas.append(metadata)
             
-            # Add to vector store
-            self.add_documents(texts, metadatas)
-            print(f"   Added {len(chunks)} chunks from {config['chunk_file']}")
+            print(f"   Loaded {len(chunks)} chunks from {config['chunk_file']}")
+        
+        return texts, metadatas
+    
+    def backfill_texts(self, chunks_path: str, document_configs: List[Dict[str, str]]) -> int:
+        """
+        Rebuild the chunk text store and lexical index of a loaded store from chunk YAML files.
+        
+        Repairs stores built before chunk texts were stored without re-embedding:
+        texts are matched to documents by (document_name, chunk_index). Call save()
+        afterwards to publish the repaired store as a new snapshot.
+        
+        Args:
+            chunks_path: Path to directory containing chunk YAML files
+            document_configs: Document configs the store was built with
+        
+        Returns:
+            Number of documents whose text could not be found
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        
+        chunk_texts, chunk_metadatas = self._read_chunks(chunks_path, document_configs)
+        by_key = {
+            (metadata.get("document_name"), metadata.get("chunk_index")): text
+            for text, metadata in zip(chunk_texts, chunk_metadatas)
+        }
+        texts = []
+        missing = 0
+        for metadata in self.metadata:
+            if metadata is None:
+                texts.append("")
+                continue
+            text = by_key.get((metadata.get("document_name"), metadata.get("chunk_index")))
+            if text is None:
+                missing += 1
+                text = ""
+            texts.append(text)
+        
+        self.text_store = ChunkTextStore(compression=self.text_compression)
+        self.text_store.append(texts)
+        self.lexical_index = BM25Index.build(texts)
+        print(f"   Backfilled {len(texts) - missing} chunk texts ({missing} not found)")
+        return missing
+    
+    def _load_previous_embeddings(self) -> Optional[tuple]:
+        """
+        Load metadata and full-precision vectors of the store saved at vectorstore_path.
+        
+        Returns:
+            Tuple of (metadata, vectors), or None if there is nothing reusable
+        """
+        previous = VectorStore(vectorstore_path=str(self.vectorstore_path), embedder=self.embedder)
+        try:
+            previous.load(mmap=True)
+        except FileNotFoundError:
+            print("   No existing vector store found, running a full build")
+            return None
+        
+        vectors = previous.vectors if previous.vectors is not None else previous._reconstruct_vectors()
+        if vectors is None or len(vectors) != len(previous.metadata) or vectors.shape[1] != self.dimension:
+            print("   Existing vector store has no reusable full-precision vectors, running a full build")
+            return None
+        return list(previous.metadata), vectors
+    
+    def _add_incrementally(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        previous_metadata: List[Dict[str, Any]],
+        previous_vectors: np.ndarray,
+        checkpoint_dir: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Add chunks, reusing previous embeddings for unchanged content hashes.
+        
+        Args:
+            texts: Chunk texts
+            metadatas: Chunk metadata including content_hash
+            previous_metadata: Metadata of the previous store
+            previous_vectors: Full-precision vectors of the previous store
+            checkpoint_dir: Optional directory checkpointing completed embedding batches
+        
+        Returns:
+            Diff summary with counts of added, changed, removed and reused chunks
+        """
+        def chunk_key(metadata: Dict[str, Any]) -> tuple:
+            return (metadata.get("document_name"), metadata.get("chunk_index"))
+        
+        previous_rows = {}
+        previous_hashes = {}
+        for row, metadata in enumerate(previous_metadata):
+            if metadata is None:
+                continue
+            if metadata.get("content_hash"):
+                previous_rows.setdefault(metadata["content_hash"], row)
+            previous_hashes[chunk_key(metadata)] = metadata.get("content_hash")
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype='float32')
+        missing = []
+        summary = {"added": 0, "changed": 0, "removed": 0, "reused": 0}
+        for position, metadata in enumerate(metadatas):
+            row = previous_rows.get(metadata["content_hash"])
+            if row is not None:
+                embeddings[position] = previous_vectors[row]
+                summary["reused"] += 1
+                continue
+            missing.append(position)
+            summary["changed" if chunk_key(metadata) in previous_hashes else "added"] += 1
+        
+        current_keys = {chunk_key(metadata) for metadata in metadatas}
+        summary["removed"] = sum(1 for key in previous_hashes if key not in current_keys)
+        
+        if missing:
+            print(f"   Embedding {len(missing)} new or changed chunks...")
+            new_embeddings = self.embed_documents(
+                [texts[position] for position in missing], checkpoint_dir=checkpoint_dir
+            )
+            embeddings[missing] = np.asarray(new_embeddings, dtype='float32')
+        
+        if texts:
+            self.add_embeddings(embeddings, metadatas, texts=texts)
+        return summary
+    
+    @staticmethod
+    def chunk_id_of(metadata: Dict[str, Any]) -> str:
+        """Get the stable id of a chunk (stores built before chunk ids existed use document_name:chunk_index)."""
+        return metadata.get("chunk_id") or f"{metadata.get('document_name')}:{metadata.get('chunk_index')}"
+    
+    def get_chunk_rows(self) -> Dict[str, int]:
+        """Map the stable ids of all live (not deleted) chunks to their rows."""
+        return {
+            self.chunk_id_of(metadata): row
+            for row, metadata in enumerate(self.metadata)
+            if metadata is not None
+        }
+    
+    def upsert(self, chunks: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Insert or replace chunks by stable chunk id, without rebuilding the index.
+        
+        Only new and changed chunks are embedded. A replaced chunk's previous row is
+        tombstoned and the new version is appended, so the change is visible to
+        searches immediately and is persisted by the next save().
+        
+        Args:
+            chunks: Chunk dicts as in the chunk YAML files, with 'chunk_id', 'text' and
+                metadata fields (e.g. document_name, document_type); metadata of an
+                existing chunk is kept unless overridden
+        
+        Returns:
+            Counts of inserted, updated and unchanged chunks
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        
+        chunks_by_id = {}
+        for chunk in chunks:
+            if not chunk.get("chunk_id") or not isinstance(chunk.get("text"), str):
+                raise ValueError("Every chunk needs a chunk_id and a text")
+            chunks_by_id[chunk["chunk_id"]] = chunk
+        
+        rows = self.get_chunk_rows()
+        texts = []
+        metadatas = []
+        replaced_rows = []
+        summary = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for chunk_id, chunk in chunks_by_id.items():
+            row = rows.get(chunk_id)
+            previous = {}
+            if row is not None:
+                previous = {key: value for key, value in self.metadata[row].items() if key != "text"}
+            metadata = {**previous, **{key: value for key, value in chunk.items() if key != "text"}}
+            metadata["content_hash"] = self.content_hash(chunk["text"])
+            metadata["token_count"] = count_tokens(chunk["text"])
+            if row is not None and metadata == previous:
+                summary["unchanged"] += 1
+                continue
+            summary["inserted" if row is None else "updated"] += 1
+            if row is not None:
+                replaced_rows.append(row)
+            texts.append(chunk["text"])
+            metadatas.append(metadata)
+        
+        if texts:
+            # Embed before touching the store so a failed embedding call changes nothing
+            embeddings = self.embed_documents(texts)
+            self._mark_deleted(replaced_rows)
+            self.add_embeddings(embeddings, metadatas, texts=texts)
+        return summary
+    
+    def delete(self, chunk_ids: List[str]) -> int:
+        """
+        Delete chunks by stable chunk id, without rebuilding the index.
+        
+        Args:
+            chunk_ids: Ids of the chunks to delete (unknown ids are ignored)
+        
+        Returns:
+            Number of chunks deleted
+        """
+        if self.index is None:
+            raise ValueError("No index loaded. Load or create an index first.")
+        rows = self.get_chunk_rows()
+        deleted_rows = sorted({rows[chunk_id] for chunk_id in chunk_ids if chunk_id in rows})
+        self._mark_deleted(deleted_rows)
+        return len(deleted_rows)
+    
+    def _mark_deleted(self, rows: List[int]):
+        """Tombstone rows: their metadata becomes None and searches skip them."""
+        if not rows:
+            return
+        self._make_writable()
+        for row in rows:
+            self.metadata[row] = None
+        self.deleted_count += len(rows)
+        self._filter_index = None
+    
+    def get_index_info(self) -> Dict[str, Any]:
+        """Get the effective index type and resolved index parameters."""
+        return {"index_type": self._effective_index_type, "index_params": dict(self._resolved_index_params)}
     
     def get_version_info(self) -> Dict[str, Any]:
         """Get current version information."""
@@ -10,6 +10,7 @@ from .trading_tools import (
 )
 from .faq_rag_tool import faq_rag_tool
 from .market_analysis_rag_tool import market_analysis_rag_tool, web_search_tool
+from .handoff_tool import handoff_to_agent
 
 __all__ = [
     "buy_stock",
@@ -21,5 +22,6 @@ __all__ = [
     "faq_rag_tool",
     "market_analysis_rag_tool",
     "web_search_tool",
+    "handoff_to_agent",
 ]
 
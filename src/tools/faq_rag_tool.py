@@ -3,14 +3,21 @@
 This module provides a LangChain tool that uses RAG (Retrieval-Augmented Generation)
 to answer questions about the platform by searching FAQ and user guide documents.
 The tool is used by the FAQ Agent to provide accurate, context-aware responses.
+It has a native async implementation, so agents running on the event loop
+await retrieval instead of blocking on it.
 """
 
-from langchain_core.tools import tool
-from ..rag.retriever import Retriever
+from langchain_core.tools import StructuredTool
+from ..rag.registry import retrieval_registry
 
 
-@tool
-def faq_rag_tool(query: str) -> str:
+def _get_faq_retriever():
+    """Get the shared FAQ retriever."""
+    # FAQ questions hinge on exact terms (amounts, order types), so fuse in keyword matches
+    return retrieval_registry.get_retriever(document_type="faq_rag", top_k=3, mode="hybrid")
+
+
+def faq_rag(query: str) -> str:
     """
     Search FAQ and user guide documents to answer questions.
     
@@ -20,6 +27,12 @@ def faq_rag_tool(query: str) -> str:
     Returns:
         Answer based on FAQ and user guide content
     """
-    retriever = Retriever(document_type="faq_rag", top_k=3)
-    return retriever.retrieve_with_context(query)
+    return _get_faq_retriever().retrieve_with_context(query)
+
+
+async def afaq_rag(query: str) -> str:
+    """Async implementation of faq_rag."""
+    return await _get_faq_retriever().aretrieve_with_context(query)
+
 
+faq_rag_tool = StructuredTool.from_function(func=faq_rag, coroutine=afaq_rag, name="faq_rag_tool")
@@ -0,0 +1,34 @@
+"""Handoff tool for passing a request on to another agent.
+
+This module provides a LangChain tool that agents call when part of the
+user's request belongs to another specialist agent, e.g. placing a trade
+after a market analysis. The tool itself only acknowledges the handoff;
+the agent node records the requested agent in the graph state, and the
+supervisor then runs that agent on the same turn. Without a handoff, a
+turn ends as soon as the first agent has answered.
+"""
+
+from typing import Literal
+from langchain_core.tools import tool
+
+HANDOFF_TOOL_NAME = "handoff_to_agent"
+HANDOFF_AGENTS = ("faq_agent", "task_agent", "market_insights_agent")
+
+
+@tool(HANDOFF_TOOL_NAME)
+def handoff_to_agent(agent: Literal["faq_agent", "task_agent", "market_insights_agent"], reason: str) -> str:
+    """
+    Hand the rest of the user's request to another specialist agent after answering your part.
+    
+    Only use this when the request explicitly needs another agent: faq_agent for platform
+    questions, task_agent for placing trades, closing positions and price alerts,
+    market_insights_agent for market analysis and research.
+    
+    Args:
+        agent: Agent that should handle the rest of the request
+        reason: What the other agent should do
+    
+    Returns:
+        Confirmation that the request will be handed off
+    """
+    return f"The request will be handed off to {agent} after your answer: {reason}"
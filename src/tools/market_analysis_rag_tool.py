@@ -5,15 +5,21 @@ This module provides LangChain tools for market analysis:
 - web_search_tool: Performs web searches for real-time market information
 
 These tools are used by the Market Insights Agent to provide comprehensive
-market analysis and investment advice.
+market analysis and investment advice. The RAG tool has a native async
+implementation, so agents running on the event loop await retrieval.
 """
 
-from langchain_core.tools import tool
-from ..rag.retriever import Retriever
+from langchain_core.tools import tool, StructuredTool
+from ..rag.registry import retrieval_registry
 from langchain_community.tools import TavilySearchResults
 
-@tool
-def market_analysis_rag_tool(query: str) -> str:
+
+def _get_market_analysis_retriever():
+    """Get the shared market analysis retriever."""
+    return retrieval_registry.get_retriever(document_type="market_analysis", top_k=3)
+
+
+def market_analysis_rag(query: str) -> str:
     """
     Search market analysis instructions and internet for stock market analysis and investment advice.
     
@@ -24,8 +30,17 @@ def market_analysis_rag_tool(query: str) -> str:
         Guidance based on market analysis instructions and real-time market information
     """
     # Get guidance from stored documents
-    retriever = Retriever(document_type="market_analysis", top_k=3)
-    return retriever.retrieve_with_context(query)
+    return _get_market_analysis_retriever().retrieve_with_context(query)
+
+
+async def amarket_analysis_rag(query: str) -> str:
+    """Async implementation of market_analysis_rag."""
+    return await _get_market_analysis_retriever().aretrieve_with_context(query)
+
+
+market_analysis_rag_tool = StructuredTool.from_function(
+    func=market_analysis_rag, coroutine=amarket_analysis_rag, name="market_analysis_rag_tool"
+)
 
 
 